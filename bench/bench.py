@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""Benchmarks for cli.py against the local stand-in server in mock_server.py.
+
+Measures send_command latency and throughput for both transports, the cold
+start of a whole `cli.py --status` run, and how long a large EnumerateSessions
+takes to render. Every run is appended to results.jsonl next to this file and
+compared with the previous run, so a regression shows up as soon as it lands.
+results.jsonl is tracked, so the baseline travels with the code:
+
+    python bench/bench.py                 # run everything, compare, record
+    python bench/bench.py --no-record     # try something without recording it
+"""
+import click
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+CLI_SCRIPT = os.path.join(REPO_DIR, "cli.py")
+RESULTS_FILE = os.path.join(BENCH_DIR, "results.jsonl")
+PASSWORD = "bench"
+
+# cli.py reads its config paths from HOME at import time, so keep it away from the real config
+os.environ["HOME"] = tempfile.mkdtemp(prefix="satisfactory-bench-")
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+import cli  # noqa: E402
+from mock_server import make_certificate, start_server  # noqa: E402
+
+# results where a bigger number is better; everything else is a duration
+HIGHER_IS_BETTER = ("calls_per_s",)
+
+
+def summarize(samples):
+    """Median, p95 and max of a list of durations, in milliseconds."""
+    ordered = sorted(samples)
+    return {
+        "p50_ms": round(statistics.median(ordered) * 1000, 3),
+        "p95_ms": round(cli.percentile(ordered, 0.95) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+def login(host):
+    """Point cli at host and store a verified token in the benchmark's config."""
+    cli.SERVER_URL = cli.api_url(host)
+    cli.CLIENT = cli.make_client("asyncio")
+    cli.TOKENS = cli.TokenStore(cli.read_config(), PASSWORD)
+    token = cli.TOKENS.get(host, interactive=False)
+    cli.CLIENT.close()
+    cli.CLIENT = None
+    if not token:
+        raise click.ClickException(f"could not log in to the mock server on {host}")
+    return token
+
+
+def bench_send_command(token, transport, calls, threads):
+    """Uncached QueryServerState calls through send_command, sequential and concurrent."""
+    cli.CLIENT = cli.make_client(transport, pool_size=max(threads, cli.POOL_SIZE))
+    try:
+        cli.send_command(token, "QueryServerState", quiet=True)  # open the connection first
+        samples = []
+        started = time.perf_counter()
+        for _ in range(calls):
+            start = time.perf_counter()
+            cli.send_command(token, "QueryServerState", quiet=True)
+            samples.append(time.perf_counter() - start)
+        results = dict(summarize(samples), calls_per_s=round(calls / (time.perf_counter() - started), 1))
+
+        if threads > 1 and transport == "asyncio":
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                list(pool.map(lambda _: cli.send_command(token, "QueryServerState", quiet=True), range(calls)))
+            results[f"calls_per_s_{threads}_threads"] = round(calls / (time.perf_counter() - started), 1)
+        return results
+    finally:
+        cli.CLIENT.close()
+        cli.CLIENT = None
+
+
+def run_cli(args):
+    """Run cli.py once with its output discarded and return the wall time."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, CLI_SCRIPT] + args, check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def bench_cli(args, runs):
+    run_cli(args)  # warm the page cache and the .pyc files
+    return summarize([run_cli(args) for _ in range(runs)])
+
+
+def previous_results(path):
+    try:
+        with open(path) as f:
+            lines = [line for line in f if line.strip()]
+    except FileNotFoundError:
+        return None
+    return json.loads(lines[-1]) if lines else None
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "-C", REPO_DIR, "describe", "--always", "--dirty"],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, previous, threshold):
+    """Print every result next to the previous run's, flagging changes beyond threshold percent."""
+    old = previous["results"] if previous else {}
+    if previous:
+        click.echo(f"compared with {previous.get('revision') or '?'} from {previous['time']}")
+    click.echo("{:<48} {:>12} {:>12} {:>8}".format("benchmark", "now", "before", "change"))
+    for name, value in current.items():
+        before = old.get(name)
+        if before is None or before == 0:
+            click.echo("{:<48} {:>12} {:>12} {:>8}".format(name, value, "-", ""))
+            continue
+        change = (value - before) / before * 100
+        worse = -change if name.rsplit(".", 1)[-1].startswith(HIGHER_IS_BETTER) else change
+        flag = "  slower" if worse > threshold else ("  faster" if worse < -threshold else "")
+        click.echo("{:<48} {:>12} {:>12} {:>+7.1f}%{}".format(name, value, before, change, flag))
+
+
+@click.command()
+@click.option('--calls', default=300, show_default=True, help='send_command calls per transport')
+@click.option('--threads', default=8, show_default=True, help='threads for the concurrent throughput run')
+@click.option('--runs', default=10, show_default=True, help='cli.py runs per cold start benchmark')
+@click.option('--latency', default=0.0, show_default=True, help='mock server delay per call in milliseconds')
+@click.option('--sessions', default=300, show_default=True, help='sessions in the large EnumerateSessions benchmark')
+@click.option('--saves', default=40, show_default=True, help='saves per session in the large EnumerateSessions benchmark')
+@click.option('--threshold', default=10.0, show_default=True, help='percent change reported as slower/faster')
+@click.option('--results', 'results_file', default=RESULTS_FILE, show_default=True, type=click.Path(dir_okay=False),
+              help='file the results are appended to')
+@click.option('--no-record', is_flag=True, help='compare with the last run without recording this one')
+def main(calls, threads, runs, latency, sessions, saves, threshold, results_file, no_record):
+    """Benchmark cli.py against a local stand-in server."""
+    cert, key = make_certificate(os.environ["HOME"])
+    options = dict(password=PASSWORD, latency=latency / 1000, seed=1)
+    small, _ = start_server(0, cert, key, **options)
+    large, _ = start_server(0, cert, key, sessions=sessions, saves_per_session=saves, **options)
+    small_host = f"127.0.0.1:{small.server_address[1]}"
+    large_host = f"127.0.0.1:{large.server_address[1]}"
+
+    results = {}
+    try:
+        token = login(small_host)
+        login(large_host)
+        for transport in ("asyncio", "urllib"):
+            click.echo(f"send_command over {transport} ...", err=True)
+            for name, value in bench_send_command(token, transport, calls, threads).items():
+                results[f"send_command.{transport}.{name}"] = value
+
+        click.echo("cli.py cold start ...", err=True)
+        for transport in ("asyncio", "urllib"):
+            args = ["--host", small_host, "--status", "--no-cache", "--transport", transport]
+            for name, value in bench_cli(args, runs).items():
+                results[f"cold_start.{transport}.{name}"] = value
+
+        click.echo(f"rendering {sessions}x{saves} sessions ...", err=True)
+        for fmt in ("text", "ndjson", "json"):
+            args = ["--host", large_host, "--enumerate", "--enum-format", fmt, "--no-cache"]
+            for name, value in bench_cli(args, runs).items():
+                results[f"enumerate.{fmt}.{name}"] = value
+    finally:
+        small.shutdown()
+        large.shutdown()
+
+    compare(results, previous_results(results_file), threshold)
+    if not no_record:
+        record = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "options": {"calls": calls, "threads": threads, "runs": runs, "latency": latency,
+                        "sessions": sessions, "saves": saves},
+            "results": results,
+        }
+        with open(results_file, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""Local stand-in for the Satisfactory dedicated server HTTPS API.
+
+Serves /api/v1 with PasswordLogin, VerifyAuthenticationToken, HealthCheck,
+QueryServerState, EnumerateSessions, GetServerOptions, SaveGame and Shutdown,
+with configurable latency, payload size and error rate, and a tick rate that
+can drop as API traffic grows. Run it on its own:
+
+    python bench/mock_server.py --port 7777 --latency 20 --sessions 200
+
+or start it from Python with start_server(), as bench.py does.
+"""
+import click
+import json
+import os
+import random
+import secrets
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# functions that work without a token, like on the real server
+PUBLIC_FUNCTIONS = {"PasswordLogin", "HealthCheck"}
+
+
+def make_certificate(directory):
+    """Create a throwaway self-signed certificate with the openssl command line tool."""
+    cert = os.path.join(directory, "mock-cert.pem")
+    key = os.path.join(directory, "mock-key.pem")
+    subprocess.run(["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-keyout", key, "-out", cert,
+                    "-days", "2", "-subj", "/CN=localhost"], check=True, capture_output=True)
+    return cert, key
+
+
+class MockState:
+    """Game state behind the stand-in server, shared by all request threads."""
+
+    def __init__(self, password="password", sessions=3, saves_per_session=5, latency=0.0, jitter=0.0,
+                 error_rate=0.0, seed=None, tick_cost=0.0, index_last=False):
+        self.password = password
+        # averageTickRate lost per API call per second, to stand in for a server busy answering calls
+        self.tick_cost = tick_cost
+        self.recent = deque()
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.tokens = set()
+        self.requests = 0
+        self.sessions = [self.make_session(i, saves_per_session) for i in range(sessions)]
+        # send currentSessionIndex after the session list instead of before it
+        self.index_last = index_last
+        self.started = time.time()
+        self.shutdown_requested = False
+
+    def make_session(self, index, saves):
+        name = f"Session {index}"
+        return {
+            "sessionName": name,
+            "saveHeaders": [self.make_save(name, f"{name.replace(' ', '_')}_{n}", n) for n in range(saves)],
+        }
+
+    def make_save(self, session_name, save_name, n):
+        return {
+            "saveVersion": 46,
+            "buildVersion": 365306,
+            "saveName": save_name,
+            "mapName": "Persistent_Level",
+            "mapOptions": "",
+            "sessionName": session_name,
+            "playDurationSeconds": 3600 + n * 300,
+            "saveDateTime": time.strftime("%Y.%m.%d-%H.%M.%S", time.gmtime(time.time() - n * 1800)),
+            "isModdedSave": False,
+            "isEditedSave": False,
+            "isCreativeModeEnabled": False,
+        }
+
+    def server_state(self):
+        return {
+            "activeSessionName": self.sessions[0]["sessionName"] if self.sessions else "",
+            "numConnectedPlayers": self.random.randint(0, 4),
+            "playerLimit": 4,
+            "techTier": 5,
+            "activeSchematic": "/Game/FactoryGame/Schematics/Progression/Schematic_5-1.Schematic_5-1_C",
+            "gamePhase": "/Game/FactoryGame/GamePhases/GP_Project_Assembly_Phase_2.GP_Project_Assembly_Phase_2",
+            "isGameRunning": True,
+            "totalGameDuration": int(time.time() - self.started) + 36000,
+            "isGamePaused": False,
+            "averageTickRate": round(max(1.0, self.random.uniform(28.0, 30.0) - self.tick_cost * len(self.recent)), 2),
+            "autoLoadSessionName": self.sessions[0]["sessionName"] if self.sessions else "",
+        }
+
+    def handle(self, function, data, token):
+        """Return (status, body) for one API call."""
+        with self.lock:
+            self.requests += 1
+            if self.tick_cost:
+                now = time.monotonic()
+                self.recent.append(now)
+                while self.recent[0] < now - 1.0:
+                    self.recent.popleft()
+            if self.error_rate and self.random.random() < self.error_rate:
+                return 503, {"errorCode": "server_busy", "errorMessage": "Injected failure"}
+            if function not in PUBLIC_FUNCTIONS and token not in self.tokens:
+                return 401, {"errorCode": "invalid_token", "errorMessage": "Invalid or missing token"}
+
+            if function == "PasswordLogin":
+                if (data or {}).get("Password") != self.password:
+                    return 401, {"errorCode": "wrong_password", "errorMessage": "Wrong password"}
+                token = secrets.token_urlsafe(32)
+                self.tokens.add(token)
+                return 200, {"data": {"authenticationToken": token}}
+            if function == "VerifyAuthenticationToken":
+                return 204, None
+            if function == "HealthCheck":
+                return 200, {"data": {"health": "healthy", "serverCustomData": ""}}
+            if function == "QueryServerState":
+                return 200, {"data": {"serverGameState": self.server_state()}}
+            if function == "EnumerateSessions":
+                if self.index_last:
+                    return 200, {"data": {"sessions": self.sessions, "currentSessionIndex": 0}}
+                return 200, {"data": {"currentSessionIndex": 0, "sessions": self.sessions}}
+            if function == "GetServerOptions":
+                return 200, {"data": {"serverOptions": {"FG.DSAutoPause": "True", "FG.DSAutoSaveOnDisconnect": "True",
+                                                        "FG.AutosaveInterval": "300", "FG.ServerRestartTimeSlot": "1440",
+                                                        "FG.SendGameplayData": "True", "FG.NetworkQuality": "3"},
+                                      "pendingServerOptions": {}}}
+            if function == "SaveGame":
+                name = (data or {}).get("SaveName", "save")
+                if self.sessions:
+                    session = self.sessions[0]
+                    session["saveHeaders"] = [save for save in session["saveHeaders"] if save["saveName"] != name]
+                    session["saveHeaders"].insert(0, self.make_save(session["sessionName"], name, 0))
+                return 204, None
+            if function == "Shutdown":
+                self.shutdown_requested = True
+                return 204, None
+        return 400, {"errorCode": "unknown_function", "errorMessage": f"Unknown function {function}"}
+
+    def delay(self):
+        if self.latency or self.jitter:
+            time.sleep(max(0.0, self.random.gauss(self.latency, self.jitter)))
+
+
+def make_handler(state):
+    class ApiHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            try:
+                request = json.loads(self.rfile.read(length) or b"{}")
+            except ValueError:
+                self.reply(400, {"errorCode": "invalid_request", "errorMessage": "Body is not JSON"})
+                return
+            auth = self.headers.get("Authorization", "")
+            token = auth[len("Bearer "):] if auth.startswith("Bearer ") else None
+            state.delay()
+            status, body = state.handle(request.get("function"), request.get("data"), token)
+            self.reply(status, body)
+
+        def reply(self, status, body):
+            payload = json.dumps(body).encode() if body is not None else b""
+            head = f"HTTP/1.1 {status} {self.responses.get(status, ('',))[0]}\r\n"
+            head += f"Content-Length: {len(payload)}\r\n"
+            if payload:
+                head += "Content-Type: application/json;charset=utf-8\r\n"
+            # one write for headers and body, so Nagle's algorithm does not delay the body
+            self.wfile.write(head.encode() + b"\r\n" + payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ApiHandler
+
+
+def start_server(port=0, cert=None, key=None, **options):
+    """Start the stand-in server on a background thread.
+
+    Returns (server, state); the port is server.server_address[1]. Call
+    server.shutdown() to stop it.
+    """
+    if not cert:
+        cert, key = make_certificate(tempfile.mkdtemp(prefix="satisfactory-mock-"))
+    state = MockState(**options)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state))
+    server.daemon_threads = True
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert, key)
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+@click.command()
+@click.option('--port', default=7777, show_default=True, help='port to listen on')
+@click.option('--password', default='password', show_default=True, help='admin password accepted by PasswordLogin')
+@click.option('--latency', default=0.0, show_default=True, help='mean added delay per call in milliseconds')
+@click.option('--jitter', default=0.0, show_default=True, help='standard deviation of the delay in milliseconds')
+@click.option('--error-rate', default=0.0, show_default=True, help='fraction of calls answered with 503')
+@click.option('--tick-cost', default=0.0, show_default=True, help='averageTickRate lost per API call per second')
+@click.option('--sessions', default=3, show_default=True, help='sessions returned by EnumerateSessions')
+@click.option('--saves', 'saves_per_session', default=5, show_default=True, help='saves per session')
+@click.option('--index-last', is_flag=True, help='send currentSessionIndex after the sessions in EnumerateSessions')
+@click.option('--cert', type=click.Path(exists=True), help='certificate file (default: generate one)')
+@click.option('--key', type=click.Path(exists=True), help='private key file for --cert')
+def main(port, password, latency, jitter, error_rate, tick_cost, sessions, saves_per_session, index_last, cert, key):
+    """Run a stand-in Satisfactory dedicated server API."""
+    server, state = start_server(port, cert, key, password=password, latency=latency / 1000, jitter=jitter / 1000,
+                                 error_rate=error_rate, tick_cost=tick_cost, sessions=sessions,
+                                 saves_per_session=saves_per_session, index_last=index_last)
+    click.echo(f"Mock API on https://127.0.0.1:{server.server_address[1]}/api/v1 (password: {password})")
+    try:
+        while not state.shutdown_requested:
+            time.sleep(0.2)
+        click.echo("Shutdown requested")
+    except KeyboardInterrupt:
+        pass
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
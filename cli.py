@@ -1,35 +1,231 @@
 #!/usr/bin/env python3
+import time
+STARTED = time.perf_counter()  # reported by --startup-profile
+
+# asyncio, configparser, logging and the server/executor modules are
+# imported where they are used, so a simple call does not pay for them
 import click
-import requests
-from requests.auth import HTTPBasicAuth
 import json
-import warnings
-import logging
-import configparser
 import os
+import sys
+import threading
+import hashlib
+import re
+from contextlib import nullcontext
 
-from requests.packages import urllib3
-
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+from satisfactory_api import (CACHE_PASSTHROUGH, CACHE_TTLS, LOGIN_FUNCTIONS, READ_ONLY_FUNCTIONS, TRACE_LOCAL,
+                              BlockingApiClient, CachedResponse, MultipartBody, Response, ResponseCache, SessionStream,
+                              Tracer, TransportError, api_url, current_trace, insecure_context, percentile)
 
+# perf_counter() when the first API request was sent, for --startup-profile
+FIRST_SEND = None
 
-logging.basicConfig()
-logging.getLogger().setLevel(logging.DEBUG)
-requests_log = logging.getLogger("requests.packages.urllib3")
-requests_log.setLevel(logging.DEBUG)
-requests_log.propagate = True
+# collects per-call timings when --trace or --trace-json is given
+TRACER = None
 
 CONFIGFILE=f"{os.environ['HOME']}/.config/satisfactory-cli.ini"
-
-# Suppress only the single InsecureRequestWarning from requests
+CACHEDIR=f"{os.environ['HOME']}/.config/satisfactory-cli-cache"
+BACKUP_DIR=f"{os.environ['HOME']}/.config/satisfactory-backups"
+AGENT_SOCKET=f"{os.environ['HOME']}/.config/satisfactory-cli.sock"
+METRICS_DIR=f"{os.environ['HOME']}/.config/satisfactory-metrics"
+CATALOG_FILE=f"{os.environ['HOME']}/.config/satisfactory-catalog.sqlite"
 
 # abusing a global so we dont have to pass it around every time
 SERVER_URL = 'https://localhost:7777/api/v1'  # Replace with your server URL
 
+# connection settings for the shared client, overridable from the command line
+POOL_SIZE = 4
+CONNECT_TIMEOUT = 5.0
+READ_TIMEOUT = 30.0
+
+# one client per process, created on first use by get_client()
+CLIENT = None
+
+# retries for read-only calls that hit a network error or a busy server, overridable from the command line;
+# the n-th retry waits a random time up to RETRY_BACKOFF * 2**n seconds, capped at RETRY_BACKOFF_MAX
+RETRIES = 2
+RETRY_BACKOFF = 0.25
+RETRY_BACKOFF_MAX = 5.0
+RETRY_STATUSES = {429, 502, 503, 504}
+
+# send a second copy of a read-only call still unanswered after this many seconds (--hedge-after)
+HEDGE_AFTER = None
+
+# per-host circuit breaker shared by every call, set up by cli()
+BREAKER = None
+BREAKER_FAILURES = 5
+BREAKER_COOLDOWN = 30.0
+
+
+class ApiClient(BlockingApiClient):
+    """Keep-alive client reused by every send_command call in the process.
+
+    It is the asyncio client of satisfactory_api running on a background
+    thread, so the CLI shares its connection handling with fleet mode. New
+    connections are checked against the certificate pins, and every call
+    reports its phases to the trace of the thread that made it.
+    """
+
+    def __init__(self, pool_size=POOL_SIZE, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT, cache=None):
+        super().__init__(pool_size, connect_timeout, read_timeout, check_certificate=self.check_certificate,
+                         cache=cache)
+
+    @staticmethod
+    def check_certificate(netloc, der):
+        if PINS is not None:
+            PINS.check(netloc, der)
+
+    def post(self, url, headers=None, **kwargs):
+        return super().post(url, headers, trace=current_trace(), **kwargs)
+
+
+class UrllibClient:
+    """Stdlib-only client for plain JSON calls, used with --transport urllib.
+
+    Starting an event loop costs more than a whole local API call, so short
+    scripted invocations can use http.client directly. Idle keep-alive
+    connections are kept per host for reuse, and a new connection resumes the
+    host's last TLS session. It cannot stream, so save transfers and backups
+    always go through ApiClient.
+    """
+
+    def __init__(self, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT, cache=None):
+        self.cache = cache
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        # same trust as ApiClient: dedicated servers use self-signed certificates,
+        # and skipping create_default_context() also skips loading the system CA bundle
+        self.context = insecure_context()
+        self.lock = threading.Lock()
+        self.idle = {}
+        self.sessions = {}
+        self.num_requests = 0
+        self.num_connections = 0
+
+    def _connect(self, scheme, netloc):
+        import http.client
+        import socket
+
+        if scheme == "https":
+            conn = http.client.HTTPSConnection(netloc, timeout=self.connect_timeout, context=self.context)
+        else:
+            conn = http.client.HTTPConnection(netloc, timeout=self.connect_timeout)
+        # open the socket by hand so each step can be timed for --trace
+        start = time.perf_counter()
+        address = socket.getaddrinfo(conn.host, conn.port, 0, socket.SOCK_STREAM)[0][4]
+        resolved = time.perf_counter()
+        sock = socket.create_connection(address[:2], self.connect_timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        connected = time.perf_counter()
+        if scheme == "https":
+            try:
+                sock = self.context.wrap_socket(sock, server_hostname=conn.host, session=self.sessions.get(netloc))
+                if PINS is not None:
+                    PINS.check(netloc, sock.getpeercert(binary_form=True))
+            except OSError:
+                sock.close()
+                raise
+        sock.settimeout(self.read_timeout)
+        conn.sock = sock
+        trace = current_trace()
+        if trace is not None:
+            trace.add("dns", resolved - start)
+            trace.add("connect", connected - resolved)
+            if scheme == "https":
+                trace.add("tls", time.perf_counter() - connected)
+        with self.lock:
+            self.num_connections += 1
+        return conn
+
+    def post(self, url, headers=None, **kwargs):
+        """POST kwargs["json"]; other requests-style arguments such as stream are ignored."""
+        import http.client
+        from urllib.parse import urlsplit
+
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        body = json.dumps(kwargs["json"]).encode()
+        read_only = kwargs["json"].get("function") in READ_ONLY_FUNCTIONS
+        headers = dict(headers or {}, **{"Content-Type": "application/json"})
+        while True:
+            with self.lock:
+                idle = self.idle.get(key)
+                conn = idle.pop() if idle else None
+            reused = conn is not None
+            written = False
+            try:
+                if conn is None:
+                    conn = self._connect(*key)
+                sent = time.perf_counter()
+                conn.request("POST", parts.path or "/", body, headers)
+                written = True
+                raw = conn.getresponse()
+                received = time.perf_counter()
+                content = raw.read()
+            except (OSError, http.client.HTTPException) as e:
+                if conn is not None:
+                    conn.close()
+                # A kept-alive connection the server had already closed fails before the
+                # request is written, or with RemoteDisconnected before a single byte of the
+                # answer; the server never ran that call. Anything later may have reached
+                # it, so only a read-only call is sent again.
+                unsent = not written or isinstance(e, http.client.RemoteDisconnected)
+                if reused and not isinstance(e, TimeoutError) and (unsent or read_only):
+                    continue
+                raise TransportError.wrap(e) from e
+            with self.lock:
+                self.num_requests += 1
+                if parts.scheme == "https" and conn.sock is not None:
+                    # TLS 1.3 sends the session ticket after the handshake, so it is only known now
+                    self.sessions[parts.netloc] = conn.sock.session
+                if not raw.will_close:
+                    self.idle.setdefault(key, []).append(conn)
+            if raw.will_close:
+                conn.close()
+            trace = current_trace()
+            if trace is not None:
+                trace.add("ttfb", received - sent)
+                trace.add("transfer", time.perf_counter() - received)
+            return Response(raw.status, raw.reason, content, dict(raw.getheaders()))
+
+    def stats(self):
+        """Return (requests, new connections, reused connections) over all hosts."""
+        return self.num_requests, self.num_connections, self.num_requests - self.num_connections
+
+    def close(self):
+        with self.lock:
+            for conns in self.idle.values():
+                for conn in conns:
+                    conn.close()
+            self.idle.clear()
+
+
+def make_client(transport, pool_size=POOL_SIZE, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT, cache=None):
+    if transport == "urllib":
+        return UrllibClient(connect_timeout, read_timeout, cache=cache)
+    return ApiClient(pool_size, connect_timeout, read_timeout, cache=cache)
+
+
+def get_client():
+    global CLIENT
+    if CLIENT is None:
+        CLIENT = ApiClient()
+    return CLIENT
 
-def authenticate(password):
+
+def enable_debug_logging():
+    """Log every request, including new connections, to stderr."""
+    import logging
+    import satisfactory_api
+
+    satisfactory_api.enable_debug_logging()
+    logging.getLogger().setLevel(logging.DEBUG)
+
+
+def authenticate(password, url=None, privilege="Administrator", echo=True):
     """Authenticate with the server and retrieve a Bearer token."""
-    response = send_command(None, "PasswordLogin", {"Password": password, "MinimumPrivilegeLevel":"Administrator"})
+    response = send_command(None, "PasswordLogin", {"Password": password, "MinimumPrivilegeLevel": privilege},
+                            url=url, quiet=not echo)
     if response:
         token_data = response.json()
         return token_data.get("data").get('authenticationToken')
@@ -49,21 +245,2361 @@ def save_game(token, name):
         click.echo("Saved")
     return
 
-def get_server_status(token):
-    """Fetch and display the server status."""
+def get_server_status(token, url=None, echo=True):
+    """Fetch and display the server status, returning the parsed response."""
 
-    response = send_command(token, "QueryServerState")
+    response = send_command(token, "QueryServerState", url=url, quiet=not echo)
     if response:
-        click.echo(json.dumps(response.json(), indent=4))
-    return
+        result = response.json()
+        if echo:
+            click.echo(json.dumps(result, indent=4))
+        return result
+    return None
 
-def enumerate_sessions(token):
-    response = send_command(token, "EnumerateSessions")
+def enumerate_sessions(token, url=None, echo=True):
+    response = send_command(token, "EnumerateSessions", url=url, quiet=not echo)
     if response:
-        click.echo(json.dumps(response.json(), indent=4))
-    return
+        result = response.json()
+        if echo:
+            click.echo(json.dumps(result, indent=4))
+        return result
+    return None
+
+def response_chunks(response, size=64 * 1024):
+    """Iterate over a response body, streaming it when the client allows."""
+    if hasattr(response, "iter_content"):
+        return response.iter_content(size)
+    return [response.content]
+
+# sort orders for --sort-saves: key function and whether it sorts newest/largest first
+SAVE_SORTS = {
+    "date": (lambda save: save.get("saveDateTime", ""), True),
+    "name": (lambda save: save.get("saveName", "").lower(), False),
+    "playtime": (lambda save: save.get("playDurationSeconds", 0), True),
+}
+
+def name_matches(pattern, name):
+    """Case-insensitive glob match; a pattern without wildcards matches as a substring."""
+    from fnmatch import fnmatch
+
+    pattern = pattern.lower()
+    if not any(c in pattern for c in "*?["):
+        pattern = f"*{pattern}*"
+    return fnmatch(str(name).lower(), pattern)
+
+def filter_sessions(sessions, session_match=None, save_match=None, latest=None, sort="date"):
+    """Lazily yield (index, session) with sessions and their saveHeaders filtered and sorted."""
+    key, reverse = SAVE_SORTS[sort]
+    for idx, session in enumerate(sessions):
+        if session_match and not name_matches(session_match, session.get("sessionName", "")):
+            continue
+        saves = session.get("saveHeaders", [])
+        if save_match:
+            saves = [save for save in saves if name_matches(save_match, save.get("saveName", ""))]
+        saves = sorted(saves, key=key, reverse=reverse)
+        if latest:
+            saves = saves[:latest]
+        yield idx, dict(session, saveHeaders=saves)
+
+def format_session(idx, session, current_index):
+    """Render one session and its saves as a block of text."""
+    lines = [f"Session {idx + 1}: {session.get('sessionName', 'Unknown session')}"]
+    saves = session.get("saveHeaders", [])
+    if not saves:
+        lines.append("  No saves for this session.")
+    for save in saves:
+        hours, remainder = divmod(save.get("playDurationSeconds", 0), 3600)
+        minutes, seconds = divmod(remainder, 60)
+        modded = ", modded" if save.get("isModdedSave") else ""
+        lines.append(f"  {save.get('saveName', 'Unknown save')}  {save.get('saveDateTime', 'Unknown date')}  "
+                     f"{hours}h {minutes}m {seconds}s  build {save.get('buildVersion', '?')}{modded}")
+    if idx == current_index:
+        lines.append("  * This is the current active session.")
+    return "\n".join(lines)
+
+def list_sessions(token, fmt="text", session_match=None, save_match=None, latest=None, sort="date", limit=None):
+    """Stream EnumerateSessions and print sessions as they are decoded.
+
+    text prints a block per session, ndjson one JSON line per save and json a
+    single document with the filtered sessions. Returns False if the call failed.
+    """
+    from itertools import islice
+
+    try:
+        response = post_command(token, "EnumerateSessions", stream=True)
+    except TransportError as e:
+        click.echo(f"Failed to enumerate sessions: {e}", err=True)
+        return False
+    if not 200 <= response.status_code < 300:
+        click.echo(f"Failed to enumerate sessions: {response.status_code} {response.reason}", err=True)
+        return False
+
+    stream = SessionStream(response_chunks(response))
+    sessions = iter(stream)
+    selected = islice(filter_sessions(sessions, session_match, save_match, latest, sort), limit)
+    collected = []
+    unmarked = set()
+    try:
+        for idx, session in selected:
+            if fmt == "text":
+                if stream.current_index is None:
+                    unmarked.add(idx)
+                click.echo(format_session(idx, session, stream.current_index))
+            elif fmt == "ndjson":
+                for save in session["saveHeaders"]:
+                    click.echo(json.dumps(dict(save, sessionIndex=idx, sessionName=session.get("sessionName")),
+                                          separators=(",", ":")))
+            else:
+                collected.append(session)
+        if stream.current_index is None and (unmarked or fmt == "json"):
+            # currentSessionIndex comes after the sessions: read past the ones --limit skipped
+            for _ in sessions:
+                pass
+    except TransportError as e:
+        click.echo(f"Failed to enumerate sessions: {e}", err=True)
+        return False
+    finally:
+        # stops reading the body early when --limit was reached
+        if hasattr(response, "close"):
+            response.close()
+
+    if stream.current_index in unmarked:
+        click.echo(f"* Session {stream.current_index + 1} is the current active session.")
+    if fmt == "json":
+        document = {"data": {"currentSessionIndex": stream.current_index, "sessions": collected}}
+        click.echo(json.dumps(document, indent=4))
+    return True
+
+def get_server_options(token, url=None, echo=True):
+    response = send_command(token, "GetServerOptions", url=url, quiet=not echo)
+    if response:
+        result = response.json()
+        if echo:
+            click.echo(json.dumps(result, indent=4))
+        return result
+    return None
+
+# fields whose movement resets the watch interval to its minimum
+WATCH_HOT_FIELDS = ("averageTickRate", "numConnectedPlayers")
+# fields that move on every sample and would otherwise never let the interval back off
+WATCH_IGNORED_FIELDS = ("totalGameDuration",)
+
+def changed_fields(shown, state, tick_delta):
+    """Return {field: (old, new)} for fields that differ from what was last shown.
+
+    averageTickRate jitters on every sample, so it only counts as changed once it
+    has moved by at least tick_delta.
+    """
+    changes = {}
+    for key in shown.keys() | state.keys():
+        old = shown.get(key)
+        new = state.get(key)
+        if old == new or key in WATCH_IGNORED_FIELDS:
+            continue
+        if key == "averageTickRate" and isinstance(old, (int, float)) and isinstance(new, (int, float)):
+            if abs(new - old) < tick_delta:
+                continue
+        changes[key] = (old, new)
+    return changes
+
+def watch_server_status(token, interval, max_interval, tick_delta):
+    """Poll QueryServerState and print only the fields that changed.
+
+    The delay grows by half each time nothing changes, up to max_interval, and
+    drops back to interval as soon as the tick rate or player count moves.
+    """
+    shown = None
+    delay = interval
+    while True:
+        stamp = time.strftime("%H:%M:%S")
+        try:
+            result = get_server_status(token, echo=False)
+        except TransportError as e:
+            click.echo(f"{stamp} unreachable: {e.kind}")
+            result = None
+        state = (result or {}).get("data", {}).get("serverGameState")
+
+        if state is None:
+            delay = min(delay * 1.5, max_interval)
+        elif shown is None:
+            shown = dict(state)
+            for key, value in sorted(state.items()):
+                click.echo(f"{stamp} {key}: {value}")
+        else:
+            changes = changed_fields(shown, state, tick_delta)
+            for key, (old, new) in sorted(changes.items()):
+                click.echo(f"{stamp} {key}: {old} -> {new}")
+                shown[key] = new
+            if any(key in changes for key in WATCH_HOT_FIELDS):
+                delay = interval
+            elif not changes:
+                delay = min(delay * 1.5, max_interval)
+
+        time.sleep(delay)
+
+# exit codes of --probe
+PROBE_EXIT_CODES = {"healthy": 0, "slow": 1, "unreachable": 2, "auth-failed": 3}
+
+def probe_server(url, deadline, min_tick=None, token=None, password=None, privilege="Administrator", agent=None):
+    """Check a server with HealthCheck (and QueryServerState for min_tick) and return (result, details).
+
+    Sends each call once, through the stdlib client or the given AgentClient,
+    with timeouts cut to the time left before the deadline. Nothing is cached
+    or written to the config; a token fetched with password is used for this
+    probe only. Through an agent, QueryServerState without a token uses the
+    agent's token for the host. Otherwise min_tick needs a stored token: without
+    one only HealthCheck is sent, rather than logging in on every probe.
+    """
+    start = time.monotonic()
+    client = agent or UrllibClient(deadline, deadline)
+
+    def call(funcName, data=None, token=None):
+        global FIRST_SEND
+        if FIRST_SEND is None:
+            FIRST_SEND = time.perf_counter()
+        left = deadline - (time.monotonic() - start)
+        if left <= 0:
+            raise TransportError("deadline exceeded", "Deadline")
+        if agent is not None:
+            agent.sock.settimeout(left)
+        else:
+            client.connect_timeout = client.read_timeout = left
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        return client.post(url, headers=headers, json={"function": funcName, "data": data or {}})
+
+    try:
+        response = call("HealthCheck", {"ClientCustomData": ""})
+        if response.status_code != 200:
+            return "unreachable", f"HealthCheck answered {response.status_code} {response.reason}"
+        health = response.json().get("data", {}).get("health")
+        details = f"health={health}"
+        if health != "healthy":
+            return "slow", details
+        if min_tick is None:
+            return "healthy", details
+        if not token and agent is None:
+            return "healthy", details + " tick=unchecked (no stored token)"
+
+        response = call("QueryServerState", token=token)
+        if response.status_code == 401 and password:
+            login = call("PasswordLogin", {"Password": password, "MinimumPrivilegeLevel": privilege})
+            token = login.json().get("data", {}).get("authenticationToken") if login.status_code == 200 else None
+            response = call("QueryServerState", token=token) if token else None
+        if response is None or response.status_code in (401, 403):
+            return "auth-failed", details
+        if response.status_code != 200:
+            return "unreachable", f"QueryServerState answered {response.status_code} {response.reason}"
+        tick = response.json().get("data", {}).get("serverGameState", {}).get("averageTickRate", 0.0)
+        details += f" tick={tick}"
+        return ("slow" if tick < min_tick else "healthy"), details
+    except (TransportError, ValueError) as e:
+        return "unreachable", str(e)
+    finally:
+        client.close()
+
+def run_probe(host, deadline, min_tick, password, privilege, agent_socket=None):
+    """Print one line for --probe and return its exit code.
+
+    The probe runs on a daemon thread so that a hung DNS lookup or TLS
+    handshake cannot keep it past the deadline. When an agent with the same
+    privilege listens on agent_socket, the calls go through it and reuse its
+    open connections.
+    """
+    url = api_url(host)
+
+    def probe():
+        global PINS
+        agent = AgentClient.connect(agent_socket, privilege, deadline) if agent_socket else None
+        token = None
+        if agent is None:
+            config = read_config()
+            # existing pins are checked, but the probe never stores one (--pin-cert and --repin are ignored)
+            PINS = CertificatePins(config)
+            if min_tick is not None:
+                # read only: the probe never logs in for good or marks tokens verified
+                token = TokenStore(config, privilege=privilege).peek(host)
+        try:
+            outcome.append(probe_server(url, deadline, min_tick, token, password, privilege, agent))
+        finally:
+            if agent is not None:
+                agent.close()
+
+    outcome = []
+    start = time.monotonic()
+    worker = threading.Thread(target=probe, daemon=True)
+    worker.start()
+    worker.join(deadline)
+    elapsed = (time.monotonic() - start) * 1000
+    result, details = outcome[0] if outcome else ("unreachable", "Deadline: deadline exceeded")
+    click.echo(f"{result} {elapsed:.1f}ms {details}")
+    return PROBE_EXIT_CODES[result]
+
+def read_inventory(path):
+    """Read a fleet inventory: one 'host[:port] [token]' per line, '#' starts a comment."""
+    hosts = []
+    with click.open_file(path) as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            fields = line.split()
+            hosts.append((fields[0], fields[1] if len(fields) > 1 else None))
+    return hosts
+
+# fleet calls selectable with --fleet-call, mapped to the API function and result key
+FLEET_CALLS = {
+    "status": ("QueryServerState", "serverGameState"),
+    "sessions": ("EnumerateSessions", "sessions"),
+    "options": ("GetServerOptions", "serverOptions"),
+}
+
+def fleet_server(client, host, token, tokens=None):
+    """An async Server for host using its inventory token, or else the stored one, logging in when needed."""
+    url = api_url(host)
+    if not token and tokens is not None:
+        token = tokens.peek(host)
+    on_login = (lambda fresh: tokens.store(url, fresh)) if tokens is not None else None
+    return client.server(url, token, password=tokens.password if tokens else None,
+                         privilege=tokens.privilege if tokens else "Administrator", on_login=on_login)
+
+async def query_host(client, host, token, calls, tokens=None, cache=None):
+    """Run the selected fleet calls against one host and return a result record."""
+    from satisfactory_api import ApiError
+
+    record = {"host": host, "ok": True}
+    start = time.monotonic()
+    url = api_url(host)
+    server = fleet_server(client, host, token, tokens)
+    for call in calls:
+        function, key = FLEET_CALLS[call]
+        cached = cache.lookup(url, function, None) if cache else None
+        try:
+            if cached:
+                data = cached.json().get("data", {})
+            else:
+                data = await server.call(function) or {}
+                if cache:
+                    cache.record(url, function, None,
+                                 Response(200, "OK", json.dumps({"data": data}).encode()))
+        except (ApiError, TransportError) as e:
+            record["ok"] = False
+            record["error"] = str(e) if isinstance(e, TransportError) else f"{call} failed: {e}"
+            break
+        record[key] = data.get(key)
+    record["elapsed"] = round(time.monotonic() - start, 3)
+    return record
+
+FLEET_COLUMNS = "{:<24} {:<6} {:<20} {:>7} {:>4} {:>6} {:>8} {:>8}"
+
+def format_fleet_row(record):
+    state = record.get("serverGameState") or {}
+    players = ""
+    if state:
+        players = f"{state.get('numConnectedPlayers', 0)}/{state.get('playerLimit', '?')}"
+    sessions = record.get("sessions")
+    return FLEET_COLUMNS.format(
+        record["host"][:24],
+        "ok" if record["ok"] else "FAIL",
+        str(state.get("activeSessionName", record.get("error", "").split(":")[0]))[:20],
+        players,
+        state.get("techTier", ""),
+        state.get("averageTickRate", ""),
+        len(sessions) if sessions is not None else "",
+        f"{record['elapsed']:.3f}s",
+    )
+
+def run_fleet(inventory, tokens, calls, workers, fmt, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT,
+              cache=None):
+    """Query every host in the inventory concurrently and print results as they arrive.
+
+    All hosts are queried from one event loop, at most workers at a time.
+    Returns the number of hosts that failed.
+    """
+    import asyncio
+    from satisfactory_api import AsyncApiClient
+
+    hosts = read_inventory(inventory)
+    if fmt == "table":
+        click.echo(FLEET_COLUMNS.format("HOST", "STATE", "SESSION", "PLAYERS", "TIER", "TICK", "SESSIONS", "TIME"))
+
+    async def limited(client, limit, host, host_token):
+        async with limit:
+            return await query_host(client, host, host_token, calls, tokens, cache)
+
+    async def query_all():
+        failed = 0
+        limit = asyncio.Semaphore(workers)
+        async with AsyncApiClient(connect_timeout=connect_timeout, read_timeout=read_timeout,
+                                  check_certificate=PINS and PINS.check) as client:
+            pending = [limited(client, limit, host, host_token) for host, host_token in hosts]
+            for next_record in asyncio.as_completed(pending):
+                record = await next_record
+                if not record["ok"]:
+                    failed += 1
+                if fmt == "ndjson":
+                    click.echo(json.dumps(record))
+                else:
+                    click.echo(format_fleet_row(record))
+        return failed
+
+    return asyncio.run(query_all())
+
+async def save_step(server, context):
+    if "verify" in context["steps"]:
+        # remember the save being replaced, so verify can tell the new one apart
+        context["before"] = find_save(await server.enumerate_sessions(), context["save_name"])
+    await server.save_game(context["save_name"])
+    return context["save_name"]
+
+async def verify_step(server, context):
+    """Poll EnumerateSessions until the new save is listed; the step deadline bounds the wait."""
+    import asyncio
+
+    delay = 0.5
+    while True:
+        header = find_save(await server.enumerate_sessions(), context["save_name"])
+        if header and header != context.get("before"):
+            return header.get("saveDateTime", "")
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 5.0)
+
+async def shutdown_step(server, context):
+    await server.shutdown()
+
+async def status_step(server, context):
+    state = (await server.query_server_state())["serverGameState"]
+    return f"{state.get('numConnectedPlayers', 0)} player(s), tick {state.get('averageTickRate', '?')}"
+
+def find_save(result, save_name):
+    for session in (result or {}).get("sessions", []):
+        for header in session.get("saveHeaders", []):
+            if header.get("saveName") == save_name:
+                return header
+    return None
+
+# steps for --fleet-run, applied to each host in the order given
+FLEET_STEPS = {
+    "status": status_step,
+    "save": save_step,
+    "verify": verify_step,
+    "shutdown": shutdown_step,
+}
+
+def parse_steps(value):
+    steps = [step.strip() for step in value.split(",") if step.strip()]
+    unknown = [step for step in steps if step not in FLEET_STEPS]
+    if unknown or not steps:
+        raise click.BadParameter(f"steps are a comma-separated list of {', '.join(FLEET_STEPS)}")
+    if "verify" in steps and ("save" not in steps or steps.index("verify") < steps.index("save")):
+        raise click.BadParameter("verify checks the save made by an earlier save step")
+    return steps
+
+async def run_host_steps(client, host, token, steps, save_name, step_timeout, tokens=None):
+    """Apply the steps to one host, stopping at the first failed one, and return a result record."""
+    import asyncio
+    from satisfactory_api import ApiError
+
+    record = {"host": host, "ok": True, "steps": []}
+    server = fleet_server(client, host, token, tokens)
+    context = {"steps": steps, "save_name": save_name}
+    started = time.monotonic()
+    for step in steps:
+        step_start = time.monotonic()
+        try:
+            detail = await asyncio.wait_for(FLEET_STEPS[step](server, context), step_timeout)
+            error = None
+        except asyncio.TimeoutError:
+            detail, error = None, f"no result within {step_timeout:g}s"
+        except (ApiError, TransportError) as e:
+            detail, error = None, str(e)
+        elapsed = round(time.monotonic() - step_start, 3)
+        record["steps"].append({"step": step, "ok": error is None, "elapsed": elapsed, "detail": detail or error})
+        click.echo(f"{host:<24} {step:<9} {'ok' if error is None else 'FAIL':<5} {elapsed:>7.2f}s  {detail or error or ''}",
+                   err=True)
+        if error:
+            record.update(ok=False, failed_step=step, error=error)
+            break
+    record["elapsed"] = round(time.monotonic() - started, 3)
+    return record
+
+def run_fleet_steps(inventory, tokens, steps, save_name, workers, step_timeout, fmt,
+                    connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT):
+    """Apply a sequence of steps to every host in the inventory, at most workers hosts at a time.
+
+    Each host goes through the steps in order and stops at its first failure,
+    so e.g. a host whose save could not be verified is never shut down.
+    Progress goes to stderr as steps finish; a summary follows at the end.
+    Returns the number of hosts that failed.
+    """
+    import asyncio
+    from satisfactory_api import AsyncApiClient
+
+    hosts = read_inventory(inventory)
+    click.echo(f"Running {' -> '.join(steps)} on {len(hosts)} host(s), {workers} at a time", err=True)
+
+    async def limited(client, limit, host, host_token):
+        async with limit:
+            return await run_host_steps(client, host, host_token, steps, save_name, step_timeout, tokens)
+
+    async def run_all():
+        limit = asyncio.Semaphore(workers)
+        # a step deadline cuts a slow call short, so the read timeout never needs to be longer
+        async with AsyncApiClient(connect_timeout=connect_timeout, read_timeout=min(read_timeout, step_timeout),
+                                  check_certificate=PINS and PINS.check) as client:
+            return await asyncio.gather(*(limited(client, limit, host, host_token) for host, host_token in hosts))
+
+    started = time.monotonic()
+    records = asyncio.run(run_all())
+    failed = [record for record in records if not record["ok"]]
+    if fmt == "ndjson":
+        for record in records:
+            click.echo(json.dumps(record))
+    else:
+        click.echo(f"{len(records) - len(failed)} of {len(records)} host(s) completed "
+                   f"in {time.monotonic() - started:.1f}s")
+        for record in failed:
+            click.echo(f"  {record['host']}: {record['failed_step']} failed: {record['error']}")
+    return len(failed)
+
+ALERT_OPS = {"<": lambda a, b: a < b, "<=": lambda a, b: a <= b, ">": lambda a, b: a > b,
+             ">=": lambda a, b: a >= b, "==": lambda a, b: a == b, "!=": lambda a, b: a != b}
+ALERT_RULE = re.compile(r"^\s*([\w.-]+)\s*:\s*(.+?)(?:\s+for\s+(\d+)(?:\s+of\s+(\d+))?(?:\s+samples?)?)?\s*$")
+ALERT_TERM = re.compile(r"^\s*(\S+)\s*(<=|>=|==|!=|<|>)\s*(.+?)\s*$")
+
+# serverGameState fields a rule can compare, plus 'up'
+ALERT_FIELDS = ("up", "activeSessionName", "numConnectedPlayers", "playerLimit", "techTier", "activeSchematic",
+                "gamePhase", "isGameRunning", "totalGameDuration", "isGamePaused", "averageTickRate",
+                "autoLoadSessionName")
+
+def alert_operand(name, text, fields):
+    """A function of the server state for one side of a comparison: a literal or a field name."""
+    if text[:1] in "'\"" and text[-1:] == text[:1] and len(text) > 1:
+        value = text[1:-1]
+    elif text.lower() in ("true", "false"):
+        value = text.lower() == "true"
+    else:
+        try:
+            value = float(text)
+        except ValueError:
+            if text not in ALERT_FIELDS:
+                raise click.BadParameter(f"{name}: {text!r} is not a number, true/false, a quoted string "
+                                         f"or one of {', '.join(ALERT_FIELDS)}")
+            fields.append(text)
+            return lambda state: state.get(text)
+    return lambda state: value
+
+class AlertRule:
+    """'name: field op value [and ...] [for N [of M] [samples]]', parsed once and evaluated per sample.
+
+    Operands are serverGameState fields, numbers, true/false or quoted
+    strings; 'up' is false when the server could not be queried. The rule
+    fires when the condition held in N of the last M samples (M defaults to
+    N, and N to 1) and resolves when it no longer does.
+    """
+
+    def __init__(self, text):
+        match = ALERT_RULE.match(text)
+        if not match:
+            raise click.BadParameter(f"expected 'name: condition [for N [of M] [samples]]', got {text!r}")
+        self.text = text.strip()
+        self.name = match.group(1)
+        self.need = int(match.group(3) or 1)
+        self.window = int(match.group(4) or self.need)
+        if not 0 < self.need <= self.window:
+            raise click.BadParameter(f"{self.name}: 'for N of M' needs 0 < N <= M")
+        self.fields = []
+        self.terms = []
+        for term in re.split(r"\s+and\s+", match.group(2)):
+            parts = ALERT_TERM.match(term)
+            if not parts:
+                raise click.BadParameter(f"{self.name}: expected 'field op value', got {term!r}")
+            self.terms.append((alert_operand(self.name, parts.group(1), self.fields), ALERT_OPS[parts.group(2)],
+                               alert_operand(self.name, parts.group(3), self.fields)))
+
+    def matches(self, state):
+        for left, op, right in self.terms:
+            a, b = left(state), right(state)
+            try:
+                if a is None or b is None or not op(a, b):
+                    return False
+            except TypeError:
+                return False
+        return True
+
+class AlertWindow:
+    """The last `size` match results of one rule on one host: a ring of bytes with a running count."""
+
+    __slots__ = ("bits", "pos", "count", "firing")
+
+    def __init__(self, size):
+        self.bits = bytearray(size)
+        self.pos = 0
+        self.count = 0
+        self.firing = False
+
+    def add(self, matched, need):
+        """Record one sample; return True when the rule started or stopped firing."""
+        self.count += matched - self.bits[self.pos]
+        self.bits[self.pos] = matched
+        self.pos = (self.pos + 1) % len(self.bits)
+        firing = self.count >= need
+        if firing == self.firing:
+            return False
+        self.firing = firing
+        return True
+
+def read_alert_rules(path):
+    """Read one rule per line; blank lines and '#' comments are skipped."""
+    with click.open_file(path) as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+class AlertNotifier:
+    """Writes transition events as JSON lines and starts the hook command for each, without waiting for it."""
+
+    def __init__(self, log=None, hook=None):
+        self.out = open(log, "a") if log else sys.stdout
+        self.hook = hook
+        self.running = []
+
+    def notify(self, event):
+        line = json.dumps(event)
+        self.out.write(line + "\n")
+        self.out.flush()
+        if self.hook:
+            import subprocess
+
+            env = dict(os.environ, ALERT_HOST=event["host"], ALERT_RULE=event["rule"], ALERT_STATE=event["state"])
+            process = subprocess.Popen(self.hook, shell=True, stdin=subprocess.PIPE, env=env)
+            process.stdin.write(line.encode() + b"\n")
+            process.stdin.close()
+            self.running.append((process, event))
+
+    def reap(self):
+        """Collect finished hooks, reporting the ones that failed."""
+        still_running = []
+        for process, event in self.running:
+            code = process.poll()
+            if code is None:
+                still_running.append((process, event))
+            elif code:
+                click.echo(f"alert hook failed with exit code {code} for {event['host']} {event['rule']}", err=True)
+        self.running = still_running
+
+def run_alerts(hosts, tokens, rules, interval, workers, notifier, connect_timeout=CONNECT_TIMEOUT,
+               read_timeout=READ_TIMEOUT):
+    """Poll every host each interval and evaluate the rules, reporting only when a rule fires or resolves.
+
+    Each (host, rule) keeps a fixed window of match results, so a sample
+    costs the same per rule however long the windows are.
+    """
+    import asyncio
+    from satisfactory_api import AsyncApiClient
+
+    windows = {(host, rule.name): AlertWindow(rule.window) for host, _ in hosts for rule in rules}
+    click.echo(f"Watching {len(hosts)} host(s) with {len(rules)} rule(s) every {interval:g}s", err=True)
+
+    async def poll(client, limit, host, host_token):
+        async with limit:
+            return await query_host(client, host, host_token, ("status",), tokens)
+
+    async def watch():
+        limit = asyncio.Semaphore(workers)
+        # a poll never runs into the next one
+        async with AsyncApiClient(connect_timeout=min(connect_timeout, interval),
+                                  read_timeout=min(read_timeout, interval),
+                                  check_certificate=PINS and PINS.check) as client:
+            while True:
+                started = time.monotonic()
+                records = await asyncio.gather(*(poll(client, limit, host, host_token) for host, host_token in hosts))
+                now = time.strftime("%Y-%m-%dT%H:%M:%S")
+                for record in records:
+                    state = dict(record.get("serverGameState") or {}, up=record["ok"])
+                    for rule in rules:
+                        window = windows[(record["host"], rule.name)]
+                        if window.add(rule.matches(state), rule.need):
+                            notifier.notify({
+                                "time": now, "host": record["host"], "rule": rule.name,
+                                "state": "firing" if window.firing else "resolved", "condition": rule.text,
+                                "values": {field: state.get(field) for field in rule.fields},
+                            })
+                notifier.reap()
+                await asyncio.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+    try:
+        asyncio.run(watch())
+    except KeyboardInterrupt:
+        pass
+
+# save transfers move the file in pieces of this size so memory use stays flat
+CHUNK_SIZE = 1024 * 1024
+TRANSFER_RETRIES = 3
+
+class TransferProgress:
+    """Throughput line on stderr, redrawn at most a few times per second."""
+
+    def __init__(self, total, done=0):
+        self.total = total
+        self.done = done
+        self.start_done = done
+        self.start = time.monotonic()
+        self.drawn = 0.0
+
+    def update(self, count):
+        self.done += count
+        now = time.monotonic()
+        if now - self.drawn >= 0.25:
+            self.drawn = now
+            self.draw(now)
+
+    def draw(self, now=None):
+        elapsed = max((now or time.monotonic()) - self.start, 1e-6)
+        rate = (self.done - self.start_done) / elapsed / 1e6
+        total = f" / {self.total / 1e6:.1f}" if self.total else ""
+        click.echo(f"\r{self.done / 1e6:.1f}{total} MB  {rate:.1f} MB/s", nl=False, err=True)
+
+    def finish(self):
+        self.draw()
+        click.echo(err=True)
+
+def content_range(value):
+    """Parse a Content-Range header ('bytes 0-99/1000' or 'bytes */1000') into (first byte, total).
+
+    Either part is None when the header is missing or does not give it.
+    """
+    match = re.fullmatch(r"\s*bytes\s+(?:(\d+)-\d+|\*)/(\d+|\*)\s*", value or "")
+    if not match:
+        return None, None
+    first, total = match.groups()
+    return (int(first) if first else None), (int(total) if total != "*" else None)
+
+def download_save(token, name, output, retries=TRANSFER_RETRIES, expect_sha256=None):
+    """Stream a save from the server to output, resuming from output.part if present.
+
+    The server is asked for the remaining bytes with a Range header; if it
+    answers with the whole file instead, the partial file is started over.
+    A 416 only counts as "already complete" when the partial file has the
+    size the server reports; otherwise the download starts over.
+    Returns the sha256 of the file, or None if the download failed.
+    """
+    part = f"{output}.part"
+    headers = {'Authorization': f'Bearer {token}', 'Content-Type': 'application/json'}
+    jsonreq = {"function": "DownloadSaveGame", "data": {"SaveName": name}}
+    # full size of the save, once any answer has told us
+    expected = None
+
+    for attempt in range(retries + 1):
+        offset = os.path.getsize(part) if os.path.exists(part) else 0
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+        else:
+            headers.pop("Range", None)
+        try:
+            with get_client().post(SERVER_URL, headers=headers, json=jsonreq, stream=True) as response:
+                first, total = content_range(response.headers.get("Content-Range"))
+                if response.status_code == 416:
+                    total = total or expected
+                    if total is not None and offset == total:
+                        break
+                    # the partial file is longer than the save, or its size cannot be checked
+                    click.echo(f"\nPartial download {part} does not match the save "
+                               f"({offset} of {total if total is not None else 'unknown'} bytes), starting over",
+                               err=True)
+                    os.remove(part)
+                    raise TransportError("partial download does not match the save", "RangeNotSatisfiable")
+                if response.status_code not in (200, 206):
+                    click.echo(f"Failed to download save: {response.status_code} {response.reason}")
+                    click.echo(response.text)
+                    return None
+                if response.status_code == 200:
+                    offset = 0
+                    length = response.headers.get("Content-Length")
+                    total = int(length) if length else None
+                elif first != offset:
+                    os.remove(part)
+                    raise TransportError(f"asked for bytes from {offset}, got them from {first}", "BadContentRange")
+                expected = total or expected
+                progress = TransferProgress(expected, offset)
+                received = 0
+                with open(part, "ab" if offset else "wb") as f:
+                    for chunk in response.iter_content(CHUNK_SIZE):
+                        f.write(chunk)
+                        received += len(chunk)
+                        progress.update(len(chunk))
+                progress.finish()
+                if expected is not None and offset + received != expected:
+                    raise TransportError(f"got {offset + received} of {expected} bytes", "IncompleteRead")
+                break
+        except TransportError as e:
+            click.echo(f"\nTransfer interrupted ({e}), attempt {attempt + 1} of {retries + 1}", err=True)
+            if attempt == retries:
+                click.echo(f"Giving up, partial download kept in {part}")
+                return None
+            time.sleep(min(2 ** attempt, 10))
+
+    sha256 = hashlib.sha256()
+    with open(part, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            sha256.update(chunk)
+    digest = sha256.hexdigest()
+    if expect_sha256 and digest != expect_sha256.lower():
+        click.echo(f"Checksum mismatch: got {digest}, expected {expect_sha256}")
+        return None
+    os.replace(part, output)
+    click.echo(f"Downloaded {name} to {output} ({os.path.getsize(output)} bytes, sha256 {digest})")
+    return digest
+
+def upload_save(token, path, name, load=False, retries=TRANSFER_RETRIES):
+    """Stream a save file to the server as multipart/form-data.
+
+    Returns the sha256 of the uploaded file, or None if the upload failed.
+    """
+    request = {"function": "UploadSaveGame",
+               "data": {"SaveName": name, "LoadSaveGame": load, "EnableAdvancedGameSettings": False}}
+    for attempt in range(retries + 1):
+        progress = TransferProgress(os.path.getsize(path))
+        body = MultipartBody(request, path, CHUNK_SIZE, progress.update)
+        headers = {'Authorization': f'Bearer {token}', 'Content-Type': body.content_type}
+        try:
+            response = get_client().post(SERVER_URL, headers=headers, data=body)
+        except TransportError as e:
+            click.echo(f"\nTransfer interrupted ({e}), attempt {attempt + 1} of {retries + 1}", err=True)
+            if attempt == retries:
+                return None
+            time.sleep(min(2 ** attempt, 10))
+            continue
+        finally:
+            body.close()
+        progress.finish()
+        client = get_client()
+        if client.cache:
+            client.cache.record(SERVER_URL, "UploadSaveGame", request["data"], response)
+        if not 200 <= response.status_code < 300:
+            click.echo(f"Failed to upload save: {response.status_code} {response.reason}")
+            click.echo(response.text)
+            return None
+        digest = body.sha256.hexdigest()
+        click.echo(f"Uploaded {path} as {name} ({body.size} bytes, sha256 {digest})")
+        return digest
+    return None
+
+# compressed chunks in a save body start with the Unreal package tag, which makes
+# them natural cut points. The body is one stream compressed in fixed 128 KiB
+# blocks, so a change only leaves the blocks before it intact: anything that
+# shifts the stream changes every later block. Pieces are still shared between
+# identical saves and between saves that differ only near the end.
+SAVE_CHUNK_TAG = b"\xc1\x83\x2a\x9e"
+MIN_PIECE = 64 * 1024
+MAX_PIECE = 4 * 1024 * 1024
+
+def split_save(f):
+    """Yield pieces of a save file, cut at compressed chunk boundaries."""
+    buf = b""
+    while True:
+        data = f.read(CHUNK_SIZE)
+        buf += data
+        while True:
+            cut = buf.find(SAVE_CHUNK_TAG, MIN_PIECE)
+            if cut == -1:
+                if len(buf) < MAX_PIECE:
+                    break
+                cut = MAX_PIECE
+            yield buf[:cut]
+            buf = buf[cut:]
+        if not data:
+            if buf:
+                yield buf
+            return
+
+def safe_name(name):
+    return "".join(c if c.isalnum() or c in "-_.+" else "_" for c in str(name))
+
+class BackupStore:
+    """Content-addressed store of save files.
+
+    Files are split with split_save and every piece is written once under
+    chunks/<sha256>; manifests/<host>/<session>/<save>__<date>.json lists the
+    pieces that make up each backed-up save. Saves are downloaded into
+    downloads/<host>/<session>/<save>__<date>.sav, a name that stays the same
+    across runs so an interrupted download is resumed by the next one, and
+    that keeps saves of the same name in different sessions apart.
+
+    Pieces are the game's compressed blocks, so only identical saves, and the
+    unchanged start of a save, are stored once; consecutive autosaves of a
+    running game are stored almost in full.
+    """
+
+    def __init__(self, root=BACKUP_DIR):
+        self.root = root
+        self.chunk_dir = os.path.join(root, "chunks")
+        self.manifest_dir = os.path.join(root, "manifests")
+        self.download_dir = os.path.join(root, "downloads")
+
+    def chunk_path(self, digest):
+        return os.path.join(self.chunk_dir, digest[:2], digest)
+
+    def download_path(self, host, header):
+        name = f"{safe_name(header['saveName'])}__{safe_name(header.get('saveDateTime', ''))}.sav"
+        return os.path.join(self.download_dir, safe_name(host), safe_name(header.get("sessionName", "")), name)
+
+    def manifest_path(self, host, header):
+        name = f"{safe_name(header['saveName'])}__{safe_name(header.get('saveDateTime', ''))}.json"
+        return os.path.join(self.manifest_dir, safe_name(host), safe_name(header.get("sessionName", "")), name)
+
+    def has(self, host, header):
+        return os.path.exists(self.manifest_path(host, header))
+
+    def put_file(self, path):
+        """Store a file's pieces and return (piece digests, size, sha256, bytes newly written)."""
+        digests = []
+        size = 0
+        written = 0
+        sha256 = hashlib.sha256()
+        with open(path, "rb") as f:
+            for piece in split_save(f):
+                digest = hashlib.sha256(piece).hexdigest()
+                digests.append(digest)
+                size += len(piece)
+                sha256.update(piece)
+                target = self.chunk_path(digest)
+                if not os.path.exists(target):
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    tmp = f"{target}.{os.getpid()}.tmp"
+                    with open(tmp, "wb") as out:
+                        out.write(piece)
+                    os.replace(tmp, target)
+                    written += len(piece)
+        return digests, size, sha256.hexdigest(), written
+
+    def write_manifest(self, host, header, digests, size, digest):
+        path = self.manifest_path(host, header)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        manifest = dict(header, host=host, size=size, sha256=digest, chunks=digests,
+                        stored=time.strftime("%Y-%m-%dT%H:%M:%S"))
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp, path)
+
+    def manifests(self, host=None):
+        """Yield (path, manifest) for every stored save, optionally of one host."""
+        top = os.path.join(self.manifest_dir, safe_name(host)) if host else self.manifest_dir
+        for dirpath, _, filenames in os.walk(top):
+            for filename in filenames:
+                if filename.endswith(".json"):
+                    path = os.path.join(dirpath, filename)
+                    with open(path) as f:
+                        yield path, json.load(f)
+
+    def prune(self, host, keep):
+        """Keep the newest `keep` backups of each save name of a host; return how many were removed."""
+        by_save = {}
+        for path, manifest in self.manifests(host):
+            key = (manifest.get("sessionName"), manifest["saveName"])
+            by_save.setdefault(key, []).append((manifest.get("saveDateTime", ""), path))
+        removed = 0
+        for versions in by_save.values():
+            versions.sort(reverse=True)
+            for _, path in versions[keep:]:
+                os.remove(path)
+                removed += 1
+        return removed
+
+    def collect_garbage(self):
+        """Delete pieces no manifest refers to; return (pieces, bytes) removed."""
+        live = set()
+        for _, manifest in self.manifests():
+            live.update(manifest["chunks"])
+        removed = 0
+        freed = 0
+        for dirpath, _, filenames in os.walk(self.chunk_dir):
+            for filename in filenames:
+                if filename not in live:
+                    path = os.path.join(dirpath, filename)
+                    freed += os.path.getsize(path)
+                    os.remove(path)
+                    removed += 1
+        return removed, freed
+
+    def restore(self, manifest, output):
+        """Reassemble a stored save into output, checking its sha256."""
+        sha256 = hashlib.sha256()
+        tmp = f"{output}.part"
+        with open(tmp, "wb") as out:
+            for digest in manifest["chunks"]:
+                with open(self.chunk_path(digest), "rb") as f:
+                    piece = f.read()
+                sha256.update(piece)
+                out.write(piece)
+        if sha256.hexdigest() != manifest["sha256"]:
+            os.remove(tmp)
+            return False
+        os.replace(tmp, output)
+        return True
+
+def run_backup(token, host, store, save_name=None, keep=0):
+    """Save the game, then store every save of the host that is not backed up yet.
+
+    Returns False if any save failed to download.
+    """
+    if save_name:
+        save_game(token, save_name)
+
+    result = enumerate_sessions(token, echo=False)
+    if result is None:
+        return False
+    pending = []
+    for session in result.get("data", {}).get("sessions", []):
+        for header in session.get("saveHeaders", []):
+            header = dict(header, sessionName=header.get("sessionName") or session.get("sessionName", ""))
+            if not store.has(host, header):
+                pending.append(header)
+    click.echo(f"{len(pending)} save(s) to back up")
+
+    # partial downloads of saves that are no longer pending can never be resumed
+    directory = os.path.join(store.download_dir, safe_name(host))
+    os.makedirs(directory, exist_ok=True)
+    wanted = {f"{store.download_path(host, header)}.part" for header in pending}
+    for dirpath, _, filenames in os.walk(directory):
+        for name in filenames:
+            if os.path.join(dirpath, name) not in wanted:
+                os.remove(os.path.join(dirpath, name))
+
+    ok = True
+    transferred = 0
+    written = 0
+    for header in pending:
+        tmp = store.download_path(host, header)
+        os.makedirs(os.path.dirname(tmp), exist_ok=True)
+        if not download_save(token, header["saveName"], tmp):
+            ok = False
+            continue
+        try:
+            digests, size, digest, new_bytes = store.put_file(tmp)
+        finally:
+            os.remove(tmp)
+        store.write_manifest(host, header, digests, size, digest)
+        transferred += size
+        written += new_bytes
+        click.echo(f"Stored {header['saveName']} ({header.get('saveDateTime', '')}): "
+                   f"{size / 1e6:.1f} MB, {new_bytes / 1e6:.1f} MB new")
+
+    if keep:
+        removed = store.prune(host, keep)
+        pieces, freed = store.collect_garbage()
+        click.echo(f"Pruned {removed} backup(s), freed {pieces} chunk(s) / {freed / 1e6:.1f} MB")
+
+    summary = f"Transferred {transferred / 1e6:.1f} MB, wrote {written / 1e6:.1f} MB"
+    if written:
+        summary += f", dedup ratio {transferred / written:.2f}x"
+    elif transferred:
+        summary += ", all data was already stored"
+    click.echo(summary)
+    return ok
+
+def restore_backup(host, store, save_name, output, date=None):
+    """Rebuild the newest stored copy of save_name (or the one from `date`) into output."""
+    candidates = [m for _, m in store.manifests(host)
+                  if m["saveName"] == save_name and (date is None or m.get("saveDateTime") == date)]
+    if not candidates:
+        click.echo(f"No backup of {save_name} for {host}")
+        return False
+    manifest = max(candidates, key=lambda m: m.get("saveDateTime", ""))
+    if not store.restore(manifest, output):
+        click.echo(f"Backup of {save_name} is damaged: checksum mismatch")
+        return False
+    click.echo(f"Restored {save_name} ({manifest.get('saveDateTime', '')}) to {output}")
+    return True
+
+
+# chunk headers with this archive version carry a compression algorithm byte
+SAVE_ARCHIVE_V2 = 0x22222222
+SAVE_COMPRESSION = {3: "zlib"}
+# .NET ticks (100 ns since year 1) at the Unix epoch, for saveDateTime
+TICKS_AT_EPOCH = 621355968000000000
+
+def unpack_at(fmt, buf, pos, what):
+    """struct.unpack_from that raises ValueError naming what was cut off when the file ends too early."""
+    import struct
+
+    if pos + struct.calcsize(fmt) > len(buf):
+        raise ValueError(f"file ends inside the {what} at offset {pos}")
+    return struct.unpack_from(fmt, buf, pos)
+
+def read_fstring(buf, pos):
+    """Read an Unreal FString at pos: int32 length, then latin-1 (length > 0) or UTF-16 (length < 0) with a NUL."""
+    (length,) = unpack_at("<i", buf, pos, "header")
+    pos += 4
+    size = length if length >= 0 else -2 * length
+    if size > 1 << 20 or pos + size > len(buf):
+        raise ValueError(f"bad string length {length} at offset {pos - 4}")
+    raw = bytes(buf[pos:pos + size])
+    text = raw[:-1].decode("latin-1") if length > 0 else raw[:-2].decode("utf-16-le")
+    return text, pos + size
+
+def parse_save_header(buf):
+    """Parse the header of a save; return (header dict named like saveHeaders, offset of the first chunk).
+
+    Fields appear in the order the header version introduced them. A file
+    that ends inside the header raises ValueError.
+    """
+    version, save_version, build_version = unpack_at("<iii", buf, 0, "header")
+    pos = 12
+    header = {"saveHeaderVersion": version, "saveVersion": save_version, "buildVersion": build_version}
+    if version >= 14:
+        header["saveName"], pos = read_fstring(buf, pos)
+    header["mapName"], pos = read_fstring(buf, pos)
+    header["mapOptions"], pos = read_fstring(buf, pos)
+    header["sessionName"], pos = read_fstring(buf, pos)
+    (header["playDurationSeconds"], ticks) = unpack_at("<iq", buf, pos, "header")
+    pos += 12
+    header["saveDateTime"] = time.strftime(SAVE_TIME_FORMAT, time.gmtime((ticks - TICKS_AT_EPOCH) / 1e7))
+    if version >= 5:
+        (header["sessionVisibility"],) = unpack_at("<B", buf, pos, "header")
+        pos += 1
+    if version >= 7:
+        (header["editorObjectVersion"],) = unpack_at("<i", buf, pos, "header")
+        pos += 4
+    if version >= 8:
+        header["modMetadata"], pos = read_fstring(buf, pos)
+        (modded,) = unpack_at("<i", buf, pos, "header")
+        header["isModdedSave"] = bool(modded)
+        pos += 4
+    if version >= 10:
+        header["saveIdentifier"], pos = read_fstring(buf, pos)
+    if version >= 11:
+        (partitioned,) = unpack_at("<i", buf, pos, "header")
+        header["isPartitionedWorld"] = bool(partitioned)
+        pos += 4
+    if version >= 12:
+        # FMD5Hash: an int32 "is set" flag and the 16 byte digest
+        unpack_at("<i16s", buf, pos, "header")
+        header["saveDataHash"] = bytes(buf[pos + 4:pos + 20]).hex()
+        pos += 20
+    if version >= 13:
+        (creative,) = unpack_at("<i", buf, pos, "header")
+        header["isCreativeModeEnabled"] = bool(creative)
+        pos += 4
+    if bytes(buf[pos:pos + 4]) != SAVE_CHUNK_TAG:
+        # a header version newer than this parser: the body starts at the first chunk tag
+        found = buf.find(SAVE_CHUNK_TAG, pos, pos + 64 * 1024)
+        if found == -1:
+            raise ValueError(f"no compressed chunk after the header (header version {version})")
+        pos = found
+    return header, pos
+
+class SaveFile:
+    """A .sav file mapped into memory: the header is parsed on open, everything else on demand.
+
+    chunks() walks the chunk table reading only the 48 or 49 byte chunk
+    headers, so even a multi-GB save is summarised without touching most of
+    its pages; verify() is the only method that decompresses anything.
+    """
+
+    def __init__(self, path):
+        import mmap
+
+        self.path = path
+        self.file = open(path, "rb")
+        self.size = os.fstat(self.file.fileno()).st_size
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            # the chunk table walk hops from header to header; readahead would pull in the whole file
+            self.advise("MADV_RANDOM")
+            self.header, self.body_offset = parse_save_header(self.map)
+        except (ValueError, OSError) as e:
+            self.file.close()
+            raise click.ClickException(f"{path} is damaged or not a save file: {e}")
+        except Exception:
+            self.file.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+    def advise(self, name, start=0, length=None):
+        """madvise() where the platform has it; a hint only, so failures are ignored."""
+        import mmap
+
+        if hasattr(self.map, "madvise") and hasattr(mmap, name):
+            try:
+                self.map.madvise(getattr(mmap, name), start, self.size - start if length is None else length)
+            except (OSError, ValueError):
+                pass
+
+    def chunks(self, release=False):
+        """Yield a dict per compressed chunk: index, offset, data offset, compressed and uncompressed size.
+
+        With release, the pages walked past are handed back every 64 MB, for
+        walks that never read the chunk data.
+        """
+        import mmap
+
+        pos = self.body_offset
+        index = 0
+        released = 0
+        while pos < self.size:
+            if release and pos - released >= 64 << 20:
+                end = pos // mmap.PAGESIZE * mmap.PAGESIZE
+                self.advise("MADV_DONTNEED", released, end - released)
+                released = end
+            if self.map[pos:pos + 4] != SAVE_CHUNK_TAG:
+                raise ValueError(f"chunk {index} at offset {pos} does not start with the package tag")
+            what = f"header of chunk {index}"
+            archive, max_size = unpack_at("<Iq", self.map, pos + 4, what)
+            data = pos + 16
+            algorithm = 3
+            if archive == SAVE_ARCHIVE_V2:
+                (algorithm,) = unpack_at("<B", self.map, data, what)
+                data += 1
+            # a summary pair followed by the single block's pair; the block's sizes are the ones used
+            _, _, compressed, uncompressed = unpack_at("<qqqq", self.map, data, what)
+            data += 32
+            if compressed < 0 or data + compressed > self.size:
+                raise ValueError(f"chunk {index} at offset {pos} runs past the end of the file")
+            yield {"index": index, "offset": pos, "data": data, "compressed": compressed,
+                   "uncompressed": uncompressed, "algorithm": SAVE_COMPRESSION.get(algorithm, f"unknown ({algorithm})"),
+                   "max_size": max_size}
+            pos = data + compressed
+            index += 1
+
+    def verify(self, workers=None):
+        """Decompress every chunk on a thread pool and check its size; return (chunks, bytes, failures).
+
+        zlib releases the GIL while it inflates, so the threads use several
+        cores. Only a few chunks per worker are in flight at once, so memory
+        stays flat however large the file is.
+        """
+        import mmap
+        import zlib
+        from concurrent.futures import ThreadPoolExecutor
+
+        workers = workers or os.cpu_count() or 1
+        failures = []
+        total = 0
+        count = 0
+        released = 0
+        self.advise("MADV_SEQUENTIAL")
+
+        def inflate(chunk):
+            with memoryview(self.map) as view:
+                return len(zlib.decompress(view[chunk["data"]:chunk["data"] + chunk["compressed"]]))
+
+        def finish(chunk, future):
+            nonlocal total, count, released
+            count += 1
+            try:
+                size = future.result()
+            except zlib.error as e:
+                size = None
+                failures.append(dict(chunk, error=str(e)))
+            # hand back the pages of inflated chunks, so resident memory stays flat
+            end = (chunk["data"] + chunk["compressed"]) // mmap.PAGESIZE * mmap.PAGESIZE
+            if end > released:
+                self.advise("MADV_DONTNEED", released, end - released)
+                released = end
+            if size is None:
+                return
+            total += size
+            if size != chunk["uncompressed"]:
+                failures.append(dict(chunk, error=f"inflated to {size} bytes instead of {chunk['uncompressed']}"))
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pending = []
+            try:
+                for chunk in self.chunks():
+                    pending.append((chunk, pool.submit(inflate, chunk)))
+                    if len(pending) >= workers * 4:
+                        finish(*pending.pop(0))
+            except ValueError as e:
+                failures.append({"index": len(pending) + count, "error": str(e)})
+            for chunk, future in pending:
+                finish(chunk, future)
+        return count, total, failures
+
+def inspect_save(path, list_chunks=False, verify=False, workers=None, fmt="text"):
+    """Print the header and chunk layout of a save file; returns False if verification found damage."""
+    with SaveFile(path) as save:
+        layout = {"chunks": 0, "compressed": 0, "uncompressed": 0, "algorithms": [], "max_size": 0}
+        chunk_list = []
+        try:
+            for chunk in save.chunks(release=True):
+                layout["chunks"] += 1
+                layout["compressed"] += chunk["compressed"]
+                layout["uncompressed"] += chunk["uncompressed"]
+                layout["max_size"] = max(layout["max_size"], chunk["max_size"])
+                if chunk["algorithm"] not in layout["algorithms"]:
+                    layout["algorithms"].append(chunk["algorithm"])
+                if list_chunks:
+                    chunk_list.append(chunk)
+        except ValueError as e:
+            layout["error"] = str(e)
+        result = {"file": path, "size": save.size, "header": save.header, "layout": layout}
+        if list_chunks:
+            result["chunk_list"] = chunk_list
+        if verify:
+            started = time.perf_counter()
+            count, total, failures = save.verify(workers)
+            elapsed = time.perf_counter() - started
+            result["verify"] = {"chunks": count, "bytes": total, "failures": failures, "seconds": round(elapsed, 3)}
+
+    ok = "error" not in layout and not (verify and result["verify"]["failures"])
+    if fmt == "json":
+        click.echo(json.dumps(result, indent=4))
+        return ok
+
+    header = save.header
+    click.echo(f"{path}  {save.size / 1e6:.1f} MB")
+    for key in ("saveName", "sessionName", "mapName", "saveDateTime"):
+        if key in header:
+            click.echo(f"  {key:<22} {header[key]}")
+    hours, remainder = divmod(header["playDurationSeconds"], 3600)
+    click.echo(f"  {'playDurationSeconds':<22} {header['playDurationSeconds']} ({hours}h {remainder // 60}m)")
+    click.echo(f"  {'version':<22} save {header['saveVersion']}, build {header['buildVersion']}, "
+               f"header {header['saveHeaderVersion']}")
+    for key in ("isModdedSave", "isCreativeModeEnabled", "isPartitionedWorld"):
+        if key in header:
+            click.echo(f"  {key:<22} {header[key]}")
+    if layout["chunks"]:
+        ratio = layout["uncompressed"] / max(layout["compressed"], 1)
+        click.echo(f"  {'chunks':<22} {layout['chunks']} {'/'.join(layout['algorithms'])}, "
+                   f"{layout['compressed'] / 1e6:.1f} MB -> {layout['uncompressed'] / 1e6:.1f} MB ({ratio:.2f}x), "
+                   f"up to {layout['max_size']} bytes each")
+    if "error" in layout:
+        click.echo(f"  chunk table damaged: {layout['error']}")
+    for chunk in chunk_list:
+        click.echo(f"    #{chunk['index']:<6} at {chunk['offset']:>12}  {chunk['compressed']:>9} -> {chunk['uncompressed']:>9}")
+    if verify:
+        check = result["verify"]
+        rate = check["bytes"] / 1e6 / check["seconds"] if check["seconds"] else 0.0
+        click.echo(f"  {'verify':<22} {check['chunks']} chunk(s) inflated to {check['bytes'] / 1e6:.1f} MB "
+                   f"in {check['seconds']:.2f}s ({rate:.0f} MB/s), {len(check['failures'])} damaged")
+        for failure in check["failures"]:
+            click.echo(f"    #{failure['index']}: {failure['error']}")
+    return ok
+
+# saveDateTime as the server sends it, in UTC
+SAVE_TIME_FORMAT = "%Y.%m.%d-%H.%M.%S"
+
+CATALOG_SCHEMA = """
+CREATE TABLE IF NOT EXISTS saves (
+    host TEXT NOT NULL,
+    session_name TEXT NOT NULL COLLATE NOCASE,
+    save_name TEXT NOT NULL COLLATE NOCASE,
+    save_date_time TEXT NOT NULL,
+    save_time REAL,
+    play_duration_seconds INTEGER,
+    build_version INTEGER,
+    is_modded_save INTEGER,
+    PRIMARY KEY (host, session_name, save_name)
+);
+CREATE INDEX IF NOT EXISTS saves_by_session ON saves (session_name, save_time);
+CREATE INDEX IF NOT EXISTS saves_by_name ON saves (save_name);
+CREATE INDEX IF NOT EXISTS saves_by_time ON saves (save_time);
+CREATE TABLE IF NOT EXISTS hosts (
+    host TEXT PRIMARY KEY,
+    synced REAL NOT NULL
+);
+"""
+
+CATALOG_COLUMNS = ("host", "session_name", "save_name", "save_date_time", "save_time", "play_duration_seconds",
+                   "build_version", "is_modded_save")
+
+# --sort-saves orders in SQL, each followed by the save name to keep the order stable
+CATALOG_SORTS = {
+    "date": "save_time DESC, save_name",
+    "name": "save_name",
+    "playtime": "play_duration_seconds DESC, save_name",
+}
+
+def save_time(value):
+    """Epoch seconds of a saveDateTime, or None when it cannot be read."""
+    import calendar
+    from datetime import datetime
+
+    try:
+        return float(calendar.timegm(time.strptime(value, SAVE_TIME_FORMAT)))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except (AttributeError, ValueError):
+        return None
+
+def like_pattern(pattern):
+    """Turn a --session-match/--save-match glob into a LIKE pattern, or None for [character classes]."""
+    if "[" in pattern:
+        return None
+    escaped = pattern.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    if not any(c in pattern for c in "*?"):
+        return f"%{escaped}%"
+    return escaped.replace("*", "%").replace("?", "_")
+
+class SaveCatalog:
+    """SQLite catalog of the saveHeaders of every synced host.
+
+    Names compare case-insensitively, so a match pattern with a literal
+    prefix ('Session 1*') and time ranges are answered from the indexes
+    instead of a scan. Syncing a host only writes the saves that were added,
+    changed or removed since its last sync.
+    """
+
+    def __init__(self, path=CATALOG_FILE):
+        import sqlite3
+
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(CATALOG_SCHEMA)
+        self.db.create_function("name_matches", 2, name_matches, deterministic=True)
+
+    def close(self):
+        # keeps the planner statistics current, so time ranges use saves_by_time
+        self.db.execute("PRAGMA optimize")
+        self.db.close()
+
+    def synced(self):
+        """Return {host: epoch of its last sync}."""
+        return dict(self.db.execute("SELECT host, synced FROM hosts"))
+
+    def sync(self, host, sessions, now=None):
+        """Bring the saves of host in line with an EnumerateSessions session list.
+
+        Returns (added, changed, removed).
+        """
+        fresh = {}
+        for session in sessions:
+            for header in session.get("saveHeaders", []):
+                session_name = header.get("sessionName") or session.get("sessionName", "")
+                date = header.get("saveDateTime", "")
+                fresh[(session_name.lower(), header.get("saveName", "").lower())] = (
+                    host, session_name, header.get("saveName", ""), date, save_time(date),
+                    header.get("playDurationSeconds"), header.get("buildVersion"), int(bool(header.get("isModdedSave"))))
+        stored = {(row[1].lower(), row[2].lower()): row
+                  for row in self.db.execute(f"SELECT {', '.join(CATALOG_COLUMNS)} FROM saves WHERE host = ?", (host,))}
+
+        added = [row for key, row in fresh.items() if key not in stored]
+        changed = [row for key, row in fresh.items() if key in stored and stored[key] != row]
+        removed = [stored[key][1:3] for key in stored.keys() - fresh.keys()]
+        with self.db:
+            self.db.executemany(f"INSERT OR REPLACE INTO saves ({', '.join(CATALOG_COLUMNS)}) "
+                                f"VALUES ({', '.join('?' * len(CATALOG_COLUMNS))})", added + changed)
+            self.db.executemany("DELETE FROM saves WHERE host = ? AND session_name = ? AND save_name = ?",
+                                [(host,) + key for key in removed])
+            self.db.execute("INSERT OR REPLACE INTO hosts (host, synced) VALUES (?, ?)",
+                            (host, time.time() if now is None else now))
+        return len(added), len(changed), len(removed)
+
+    def query(self, hosts=None, session_match=None, save_match=None, latest=None, sort="date",
+              older_than=None, newer_than=None, limit=None):
+        """Return matching saves as saveHeader-like dicts with a host key, ordered by host and session."""
+        where, params = [], []
+        if hosts:
+            where.append(f"host IN ({', '.join('?' * len(hosts))})")
+            params.extend(hosts)
+        for column, pattern in (("session_name", session_match), ("save_name", save_match)):
+            if not pattern:
+                continue
+            like = like_pattern(pattern)
+            if like is None:
+                where.append(f"name_matches(?, {column})")
+            else:
+                where.append(f"{column} LIKE ? ESCAPE '\\'")
+            params.append(pattern if like is None else like)
+        if older_than is not None:
+            where.append("save_time < ?")
+            params.append(older_than)
+        if newer_than is not None:
+            where.append("save_time >= ?")
+            params.append(newer_than)
+
+        order = CATALOG_SORTS[sort]
+        sql = f"SELECT {', '.join(CATALOG_COLUMNS)} FROM saves"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        if latest:
+            sql = (f"SELECT {', '.join(CATALOG_COLUMNS)} FROM (SELECT *, ROW_NUMBER() OVER "
+                   f"(PARTITION BY host, session_name ORDER BY {order}) AS rank FROM ({sql})) WHERE rank <= ?")
+            params.append(latest)
+        sql += f" ORDER BY host, session_name, {order}"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        for row in self.db.execute(sql, params):
+            yield {
+                "host": row[0],
+                "sessionName": row[1],
+                "saveName": row[2],
+                "saveDateTime": row[3],
+                "playDurationSeconds": row[5],
+                "buildVersion": row[6],
+                "isModdedSave": bool(row[7]),
+            }
+
+def sync_catalog(catalog, hosts, tokens, workers, max_age=0.0, connect_timeout=CONNECT_TIMEOUT,
+                 read_timeout=READ_TIMEOUT):
+    """Fetch EnumerateSessions from every host not synced within max_age seconds and update the catalog.
+
+    Hosts are fetched concurrently like --fleet; progress goes to stderr.
+    Returns the number of hosts that failed.
+    """
+    import asyncio
+    from satisfactory_api import AsyncApiClient
+
+    now = time.time()
+    synced = catalog.synced()
+    due = [(host, token) for host, token in hosts if now - synced.get(host, 0) >= max_age]
+    if len(due) < len(hosts):
+        click.echo(f"{len(hosts) - len(due)} host(s) synced less than {max_age:g}s ago", err=True)
+
+    async def fetch(client, limit, host, token):
+        async with limit:
+            return await query_host(client, host, token, ("sessions",), tokens)
+
+    async def fetch_all():
+        failed = 0
+        limit = asyncio.Semaphore(workers)
+        async with AsyncApiClient(connect_timeout=connect_timeout, read_timeout=read_timeout,
+                                  check_certificate=PINS and PINS.check) as client:
+            for next_record in asyncio.as_completed([fetch(client, limit, host, token) for host, token in due]):
+                record = await next_record
+                if not record["ok"]:
+                    click.echo(f"{record['host']}: {record['error']}", err=True)
+                    failed += 1
+                    continue
+                added, changed, removed = catalog.sync(record["host"], record.get("sessions") or [])
+                click.echo(f"{record['host']}: {added} new, {changed} changed, {removed} removed", err=True)
+        return failed
+
+    return asyncio.run(fetch_all())
+
+CATALOG_ROW = "{:<22} {:<24} {:<32} {:<19} {:>10} {:>7}"
+
+def list_catalog(saves, fmt):
+    """Print catalog query results; returns how many saves were printed."""
+    count = 0
+    collected = []
+    if fmt == "text":
+        click.echo(CATALOG_ROW.format("HOST", "SESSION", "SAVE", "DATE", "PLAYTIME", "BUILD"))
+    for save in saves:
+        count += 1
+        if fmt == "ndjson":
+            click.echo(json.dumps(save, separators=(",", ":")))
+        elif fmt == "json":
+            collected.append(save)
+        else:
+            hours, remainder = divmod(save["playDurationSeconds"] or 0, 3600)
+            click.echo(CATALOG_ROW.format(save["host"][:22], save["sessionName"][:24], save["saveName"][:32],
+                                          save["saveDateTime"][:19], f"{hours}h {remainder // 60:02d}m",
+                                          save["buildVersion"] or "?"))
+    if fmt == "json":
+        click.echo(json.dumps({"saves": collected}, indent=4))
+    return count
+
+def read_batch(path):
+    """Yield (line number, command) for each JSON line of a batch file, skipping blanks."""
+    with click.open_file(path) as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield lineno, line
+
+def run_batch_command(token, lineno, line):
+    """Run one batch line and return its result record."""
+    record = {"line": lineno}
+    start = time.monotonic()
+    try:
+        command = json.loads(line)
+        record["id"] = command.get("id", lineno)
+        record["function"] = command["function"]
+        response = post_command(token, command["function"], command.get("data"))
+        record["status"] = response.status_code
+        record["ok"] = 200 <= response.status_code < 300
+        if response.text:
+            try:
+                record["response"] = response.json()
+            except ValueError:
+                record["response"] = response.text
+        record["cached"] = isinstance(response, CachedResponse)
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        record["ok"] = False
+        record["error"] = f"bad command: {e}"
+    except TransportError as e:
+        record["ok"] = False
+        record["error"] = str(e)
+    record["elapsed"] = round(time.monotonic() - start, 3)
+    return record
+
+def batch_function(line):
+    try:
+        return json.loads(line).get("function")
+    except (ValueError, AttributeError):
+        return None
+
+def run_batch(path, token, parallel):
+    """Run every command of a batch file and stream one JSON result line per command.
+
+    With parallel > 1, consecutive read-only commands run concurrently; any other
+    command waits for them and runs on its own, so mutating calls keep their order.
+    Results are printed in input order. Returns the number of failed commands.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    failed = 0
+    group = []
+
+    def flush(pool):
+        nonlocal failed
+        if pool and len(group) > 1:
+            records = pool.map(lambda item: run_batch_command(token, *item), group)
+        else:
+            records = (run_batch_command(token, *item) for item in group)
+        for record in records:
+            if not record["ok"]:
+                failed += 1
+            click.echo(json.dumps(record))
+        group.clear()
+
+    with ThreadPoolExecutor(max_workers=parallel) if parallel > 1 else nullcontext() as pool:
+        for lineno, line in read_batch(path):
+            read_only = batch_function(line) in READ_ONLY_FUNCTIONS
+            if group and not (pool and read_only):
+                flush(pool)
+            group.append((lineno, line))
+            if not (pool and read_only):
+                flush(pool)
+        flush(pool)
+    return failed
+
+# calls --load-mix can name, mapped to their API function
+LOAD_CALLS = {"status": "QueryServerState", "sessions": "EnumerateSessions", "options": "GetServerOptions"}
+# upper bounds of the latency histogram buckets, in milliseconds
+LOAD_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, float("inf"))
+
+def parse_mix(value):
+    """'status=8,sessions=1,options=1' -> {'status': 8, 'sessions': 1, 'options': 1}."""
+    mix = {}
+    for part in value.split(","):
+        call, _, weight = part.strip().partition("=")
+        if call not in LOAD_CALLS or not (weight or "1").isdigit():
+            raise click.BadParameter(f"expected e.g. status=8,sessions=1,options=1 with calls {', '.join(LOAD_CALLS)}")
+        if int(weight or 1):
+            mix[call] = int(weight or 1)
+    if not mix:
+        raise click.BadParameter("at least one call needs a weight above 0")
+    return mix
+
+class LoadStep:
+    """Latencies and errors of the calls made during one load step, per call.
+
+    Each call has two latencies: from sending it, and from the time it was
+    due. The second includes the time it waited for a free client, which is
+    what a client on a fixed schedule actually sees once the server falls
+    behind.
+    """
+
+    def __init__(self, rate, mix):
+        self.rate = rate
+        self.lock = threading.Lock()
+        self.latencies = {call: [] for call in mix}
+        self.from_due = {call: [] for call in mix}
+        self.errors = {call: {} for call in mix}
+        self.lag = 0.0
+        self.start = self.end = None
+
+    def add(self, call, latency, lag, error=None):
+        with self.lock:
+            self.latencies[call].append(latency)
+            self.from_due[call].append(max(lag, 0.0) + latency)
+            if error:
+                self.errors[call][error] = self.errors[call].get(error, 0) + 1
+            self.lag = max(self.lag, lag)
+
+    def summary(self, latencies, from_due, errors):
+        import bisect
+
+        ordered = sorted(latencies)
+        histogram = [0] * len(LOAD_BUCKETS)
+        for latency in ordered:
+            histogram[bisect.bisect_left(LOAD_BUCKETS, latency * 1000)] += 1
+        result = {"calls": len(ordered), "errors": sum(errors.values()), "error_kinds": errors,
+                  "histogram": {str(bound): count for bound, count in zip(LOAD_BUCKETS, histogram) if count}}
+        for prefix, values in (("", ordered), ("due_", sorted(from_due))):
+            if values:
+                result.update({f"{prefix}{name}_ms": round(percentile(values, fraction) * 1000, 2)
+                               for name, fraction in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))})
+                result[f"{prefix}max_ms"] = round(values[-1] * 1000, 2)
+        return result
+
+    def report(self):
+        every = [latency for latencies in self.latencies.values() for latency in latencies]
+        every_from_due = [latency for latencies in self.from_due.values() for latency in latencies]
+        errors = {}
+        for kinds in self.errors.values():
+            for kind, count in kinds.items():
+                errors[kind] = errors.get(kind, 0) + count
+        report = dict(self.summary(every, every_from_due, errors), target_rate=self.rate,
+                      achieved_rate=round(len(every) / (self.end - self.start), 1), max_lag_ms=round(self.lag * 1000, 1))
+        report["per_call"] = {call: self.summary(self.latencies[call], self.from_due[call], self.errors[call])
+                              for call in self.latencies}
+        return report
+
+def run_load_step(token, step, mix, clients, duration):
+    """Send the mix at step.rate calls per second (as fast as possible at 0) from `clients` threads.
+
+    Calls are scheduled open-loop: slot i is due at start + i / rate whether
+    or not earlier calls have returned, and a slot that starts late because
+    every client was busy shows up as lag instead of silently lowering the rate.
+    """
+    import random
+
+    sequence = [call for call, weight in mix.items() for _ in range(weight)]
+    random.Random(1).shuffle(sequence)
+    slots = iter(range(sys.maxsize))
+    slot_lock = threading.Lock()
+    step.start = time.perf_counter()
+    end = step.start + duration
+
+    def client():
+        while True:
+            with slot_lock:
+                slot = next(slots)
+            due = step.start + slot / step.rate if step.rate else time.perf_counter()
+            if due >= end:
+                return
+            time.sleep(max(0.0, due - time.perf_counter()))
+            call = sequence[slot % len(sequence)]
+            sent = time.perf_counter()
+            try:
+                response = post_command(token, LOAD_CALLS[call])
+                error = None if 200 <= response.status_code < 300 else f"http_{response.status_code}"
+            except TransportError as e:
+                error = e.kind
+            step.add(call, time.perf_counter() - sent, sent - due, error)
+
+    threads = [threading.Thread(target=client, daemon=True) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    step.end = time.perf_counter()
+
+def sample_ticks(token, interval, samples, stop):
+    """Append (time, averageTickRate) every interval seconds until stop is set."""
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            response = send_command(token, "QueryServerState", quiet=True)
+        except TransportError:
+            response = None
+        if response is not None:
+            state = response.json().get("data", {}).get("serverGameState", {})
+            samples.append((started, state.get("averageTickRate")))
+        stop.wait(max(0.0, interval - (time.perf_counter() - started)))
+
+def tick_summary(samples, start, end):
+    ticks = [tick for when, tick in samples if start <= when < end and tick is not None]
+    if not ticks:
+        return {"samples": 0}
+    return {"samples": len(ticks), "avg": round(sum(ticks) / len(ticks), 2), "min": round(min(ticks), 2)}
+
+LOAD_COLUMNS = "{:>8} {:>9} {:>7} {:>7} {:>8} {:>8} {:>8} {:>8} {:>9} {:>9} {:>8} {:>8} {:>8}"
+
+def run_load_test(token, rates, mix, clients, duration, baseline, sample_interval, fmt):
+    """Measure a baseline, then run one load step per rate while sampling the tick rate, and print a report.
+
+    Retries, hedging and the circuit breaker are off so every call the
+    server answers is counted once. Returns the report.
+    """
+    global RETRIES, HEDGE_AFTER, BREAKER
+    RETRIES, HEDGE_AFTER, BREAKER = 0, None, None
+
+    samples = []
+    stop = threading.Event()
+    sampler = threading.Thread(target=sample_ticks, args=(token, sample_interval, samples, stop), daemon=True)
+    started = time.perf_counter()
+    sampler.start()
+    click.echo(f"Baseline for {baseline:g}s ...", err=True)
+    time.sleep(baseline)
+    report = {"clients": clients, "duration": duration, "mix": mix,
+              "baseline": tick_summary(samples, started, time.perf_counter()), "steps": []}
+    for rate in rates:
+        click.echo(f"{rate:g} calls/s from {clients} client(s) for {duration:g}s ...", err=True)
+        step = LoadStep(rate, mix)
+        run_load_step(token, step, mix, clients, duration)
+        result = step.report()
+        result["tick_rate"] = tick_summary(samples, step.start, step.end)
+        report["steps"].append(result)
+    stop.set()
+
+    if fmt == "json":
+        click.echo(json.dumps(report, indent=4))
+        return report
+    base = report["baseline"]
+    click.echo(f"Baseline tick rate: avg {base.get('avg', '-')} min {base.get('min', '-')} ({base['samples']} samples)")
+    click.echo(LOAD_COLUMNS.format("TARGET", "ACHIEVED", "CALLS", "ERRORS", "P50 MS", "P95 MS", "P99 MS", "MAX MS",
+                                   "DUE P50", "DUE P99", "LAG MS", "TICK AVG", "TICK MIN"))
+    for step in report["steps"]:
+        ticks = step["tick_rate"]
+        click.echo(LOAD_COLUMNS.format(f"{step['target_rate']:g}/s" if step["target_rate"] else "max",
+                                       f"{step['achieved_rate']:g}/s", step["calls"],
+                                       f"{100 * step['errors'] / max(step['calls'], 1):.1f}%",
+                                       step.get("p50_ms", "-"), step.get("p95_ms", "-"), step.get("p99_ms", "-"),
+                                       step.get("max_ms", "-"), step.get("due_p50_ms", "-"),
+                                       step.get("due_p99_ms", "-"), step["max_lag_ms"],
+                                       ticks.get("avg", "-"), ticks.get("min", "-")))
+    for step in report["steps"]:
+        label = f"{step['target_rate']:g}/s" if step["target_rate"] else "max"
+        buckets = "  ".join(f"<={bound}ms:{count}" if bound != "inf" else f">5000ms:{count}"
+                            for bound, count in step["histogram"].items())
+        click.echo(f"{label:>8} {buckets}")
+        if step["error_kinds"]:
+            click.echo(f"{'':>8} errors: " + ", ".join(f"{kind} {count}" for kind, count in step["error_kinds"].items()))
+    return report
+
+# QueryServerState fields exported as gauges: field -> (metric name, help text)
+EXPORTER_GAUGES = {
+    "averageTickRate": ("satisfactory_average_tick_rate", "Average server tick rate."),
+    "numConnectedPlayers": ("satisfactory_connected_players", "Number of connected players."),
+    "playerLimit": ("satisfactory_player_limit", "Maximum number of players."),
+    "techTier": ("satisfactory_tech_tier", "Highest unlocked tech tier."),
+    "totalGameDuration": ("satisfactory_total_game_duration_seconds", "Total play time of the session."),
+    "isGamePaused": ("satisfactory_game_paused", "1 if the game is paused."),
+}
+
+class StateCache:
+    """QueryServerState results per host, refreshed in the background once older than ttl.
+
+    get() never waits on the game server: it returns whatever is cached and, if
+    that is stale, starts a single refresh thread for the host. Concurrent
+    scrapes of a stale host share the refresh already in flight.
+    """
+
+    def __init__(self, hosts, ttl):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.tokens = dict(hosts)
+        self.entries = {host: {"state": None, "ok": False, "fetched": None, "refreshing": False, "calls": 0}
+                        for host in self.tokens}
+
+    def get(self, host):
+        with self.lock:
+            entry = self.entries[host]
+            stale = entry["fetched"] is None or time.monotonic() - entry["fetched"] >= self.ttl
+            if stale and not entry["refreshing"]:
+                entry["refreshing"] = True
+                threading.Thread(target=self.refresh, args=(host,), daemon=True).start()
+            return dict(entry)
+
+    def refresh(self, host):
+        try:
+            result = get_server_status(self.tokens[host], url=api_url(host), echo=False)
+        except TransportError:
+            result = None
+        state = (result or {}).get("data", {}).get("serverGameState")
+        with self.lock:
+            if TOKENS is not None:
+                # keep the token a 401 replaced, or the first one a login stored
+                self.tokens[host] = TOKENS.current(self.tokens[host]) or TOKENS.peek(host)
+            entry = self.entries[host]
+            entry["calls"] += 1
+            entry["fetched"] = time.monotonic()
+            entry["refreshing"] = False
+            entry["ok"] = state is not None
+            if state is not None:
+                entry["state"] = state
+
+def label_value(value):
+    """Escape a Prometheus label value: backslash, double quote and newline."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def render_metrics(cache):
+    """Render every cached host in the Prometheus text exposition format."""
+    snapshots = {host: cache.get(host) for host in cache.entries}
+    lines = []
+
+    def family(name, kind, help_text, samples):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for host, value in samples:
+            lines.append(f'{name}{{host="{label_value(host)}"}} {value}')
+
+    family("satisfactory_up", "gauge", "1 if the last QueryServerState call succeeded.",
+           [(host, int(entry["ok"])) for host, entry in snapshots.items()])
+    family("satisfactory_state_age_seconds", "gauge", "Seconds since the last refresh attempt.",
+           [(host, round(time.monotonic() - entry["fetched"], 3))
+            for host, entry in snapshots.items() if entry["fetched"] is not None])
+    family("satisfactory_upstream_requests_total", "counter", "QueryServerState calls made by this exporter.",
+           [(host, entry["calls"]) for host, entry in snapshots.items()])
+    for field, (name, help_text) in EXPORTER_GAUGES.items():
+        samples = []
+        for host, entry in snapshots.items():
+            value = (entry["state"] or {}).get(field)
+            if value is not None:
+                samples.append((host, float(value)))
+        family(name, "gauge", help_text, samples)
+    return "\n".join(lines) + "\n"
+
+def run_exporter(hosts, port, ttl):
+    """Serve /metrics on the given port until interrupted."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    cache = StateCache(hosts, ttl)
+    for host in cache.entries:
+        cache.get(host)
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render_metrics(cache).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("", port), MetricsHandler)
+    click.echo(f"Serving metrics for {len(cache.entries)} host(s) on :{port}/metrics")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+# one raw sample: time, averageTickRate, numConnectedPlayers, techTier, game phase number
+METRIC_SAMPLE = "<dfHBB"
+# one rollup bucket: start time, samples, tick rate min/avg/max, players avg/max, last techTier and game phase
+METRIC_ROLLUP = "<dIffffHBB"
+# rollup resolutions in seconds
+METRIC_ROLLUPS = {"1m": 60, "1h": 3600}
+# days each resolution is kept; raw can be changed with --metrics-raw-days
+METRIC_RETENTION_DAYS = {"raw": 31, "1m": 180, "1h": 1825}
+
+def phase_number(name):
+    """GP_Project_Assembly_Phase_2 -> 2, or 255 when the phase carries no number."""
+    match = re.search(r"Phase_(\d+)", name or "")
+    return min(int(match.group(1)), 254) if match else 255
+
+class MetricSeries:
+    """Append-only file of fixed-size records, ordered by the timestamp each record starts with."""
+
+    def __init__(self, path, fmt):
+        import struct
+
+        self.path = path
+        self.record = struct.Struct(fmt)
+
+    def append(self, *records):
+        if not records:
+            return
+        size = self.record.size
+        with open(self.path, "ab") as f:
+            # drop a record cut short by a crash, so later ones stay aligned
+            end = f.tell()
+            if end % size:
+                f.truncate(end - end % size)
+            f.write(b"".join(self.record.pack(*record) for record in records))
+
+    def last(self):
+        size = self.record.size
+        try:
+            with open(self.path, "rb") as f:
+                end = os.fstat(f.fileno()).st_size // size * size
+                if not end:
+                    return None
+                f.seek(end - size)
+                return self.record.unpack(f.read(size))
+        except FileNotFoundError:
+            return None
+
+    def _bisect(self, mm, count, when):
+        size = self.record.size
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.record.unpack_from(mm, mid * size)[0] < when:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _mapped(self, f):
+        import mmap
+
+        count = os.fstat(f.fileno()).st_size // self.record.size
+        return (mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if count else None), count
+
+    def read(self, start=None, end=None):
+        """Return the records with start <= time < end, located by binary search in the mapped file."""
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return []
+        with f:
+            mm, count = self._mapped(f)
+            if mm is None:
+                return []
+            with mm:
+                lo = self._bisect(mm, count, start) if start is not None else 0
+                hi = self._bisect(mm, count, end) if end is not None else count
+                size = self.record.size
+                return list(self.record.iter_unpack(mm[lo * size:hi * size]))
+
+    def prune(self, before):
+        """Drop the records older than before by rewriting the file."""
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return
+        with f:
+            mm, count = self._mapped(f)
+            if mm is None:
+                return
+            with mm:
+                lo = self._bisect(mm, count, before)
+                if lo == 0:
+                    return
+                tmp = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp, "wb") as out:
+                    out.write(mm[lo * self.record.size:count * self.record.size])
+        os.replace(tmp, self.path)
+
+class MetricsStore:
+    """Server state samples per host under root/<host>/: raw.bin plus the 1m.bin and 1h.bin rollups.
+
+    Rollups are computed from the raw samples once their bucket is over, so
+    a recorder that was stopped fills in the missing buckets when it starts
+    again. Each series is cut to its retention once an hour.
+    """
+
+    def __init__(self, root, raw_days=METRIC_RETENTION_DAYS["raw"]):
+        self.root = root
+        self.retention = dict(METRIC_RETENTION_DAYS, raw=raw_days)
+        self.pruned = {}
+
+    def series(self, host, resolution):
+        directory = os.path.join(self.root, safe_name(host))
+        os.makedirs(directory, exist_ok=True)
+        return MetricSeries(os.path.join(directory, f"{resolution}.bin"),
+                            METRIC_SAMPLE if resolution == "raw" else METRIC_ROLLUP)
+
+    def record(self, host, state, now=None):
+        now = time.time() if now is None else now
+        sample = (now, float(state.get("averageTickRate", 0.0)), min(int(state.get("numConnectedPlayers", 0)), 65535),
+                  min(int(state.get("techTier", 0)), 255), phase_number(state.get("gamePhase")))
+        self.series(host, "raw").append(sample)
+        self.roll_up(host, now)
+        if now - self.pruned.get(host, 0) >= 3600:
+            self.prune(host, now)
+
+    def roll_up(self, host, now):
+        """Append every finished rollup bucket that is not written yet."""
+        raw = self.series(host, "raw")
+        for resolution, seconds in METRIC_ROLLUPS.items():
+            series = self.series(host, resolution)
+            last = series.last()
+            begin = last[0] + seconds if last else None
+            current = now - now % seconds
+            if begin is not None and begin >= current:
+                continue
+            buckets = {}
+            for sample in raw.read(begin, current):
+                buckets.setdefault(sample[0] - sample[0] % seconds, []).append(sample)
+            series.append(*(rollup(start, samples) for start, samples in sorted(buckets.items())))
+
+    def prune(self, host, now):
+        for resolution, days in self.retention.items():
+            self.series(host, resolution).prune(now - days * 86400)
+        self.pruned[host] = now
+
+def rollup(start, samples):
+    ticks = [sample[1] for sample in samples]
+    players = [sample[2] for sample in samples]
+    return (start, len(samples), min(ticks), sum(ticks) / len(ticks), max(ticks),
+            sum(players) / len(players), max(players), samples[-1][3], samples[-1][4])
+
+def run_recorder(hosts, tokens, store, interval, workers, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT):
+    """Sample QueryServerState for every host each interval seconds until interrupted.
+
+    Like run_alerts, all hosts are polled at the same time on the asyncio
+    client, so one slow server does not delay the samples of the others.
+    """
+    import asyncio
+    from satisfactory_api import AsyncApiClient
+
+    click.echo(f"Recording {len(hosts)} host(s) every {interval:g}s into {store.root}")
+
+    async def poll(client, limit, host, host_token):
+        async with limit:
+            return await query_host(client, host, host_token, ("status",), tokens)
+
+    async def record():
+        limit = asyncio.Semaphore(workers)
+        # a poll never runs into the next one
+        async with AsyncApiClient(connect_timeout=min(connect_timeout, interval),
+                                  read_timeout=min(read_timeout, interval),
+                                  check_certificate=PINS and PINS.check) as client:
+            while True:
+                started = time.monotonic()
+                records = await asyncio.gather(*(poll(client, limit, host, host_token) for host, host_token in hosts))
+                for result in records:
+                    if result.get("serverGameState"):
+                        store.record(result["host"], result["serverGameState"])
+                    else:
+                        click.echo(f"{result['host']}: {result.get('error', 'no server state')}", err=True)
+                await asyncio.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+    try:
+        asyncio.run(record())
+    except KeyboardInterrupt:
+        pass
+
+def parse_when(value, now):
+    """Turn '90m', '24h', '7d' (ago) or a local 'YYYY-MM-DD[ HH:MM]' into epoch seconds."""
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+    if value[-1:] in units and value[:-1].replace(".", "", 1).isdigit():
+        return now - float(value[:-1]) * units[value[-1]]
+    from datetime import datetime
+
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise click.BadParameter(f"expected e.g. 24h, 7d or 2024-05-01 12:00, got {value!r}")
+
+def metrics_resolution(start, end):
+    """Raw samples for windows up to 6 hours, minute rollups up to 14 days, hour rollups beyond."""
+    if end - start <= 6 * 3600:
+        return "raw"
+    return "1m" if end - start <= 14 * 86400 else "1h"
+
+def summarize_metrics(records, resolution, below=None):
+    """Summarise samples or rollup buckets: tick rate and player statistics, slow periods and changes."""
+    if resolution == "raw":
+        ticks = [r[1] for r in records]
+        players = [r[2] for r in records]
+        tick_min, tick_max = (min(ticks), max(ticks)) if ticks else (None, None)
+        players_max = max(players) if players else None
+        samples = len(records)
+        ends = [(r[0], r[1], r[3], r[4]) for r in records]
+    else:
+        # rollup statistics are over the bucket averages, apart from the extremes
+        ticks = [r[3] for r in records]
+        players = [r[5] for r in records]
+        tick_min = min(r[2] for r in records) if records else None
+        tick_max = max(r[4] for r in records) if records else None
+        players_max = max(r[6] for r in records) if records else None
+        samples = sum(r[1] for r in records)
+        ends = [(r[0], r[3], r[7], r[8]) for r in records]
+
+    summary = {"resolution": resolution, "points": len(records), "samples": samples}
+    if ticks:
+        ordered = sorted(ticks)
+        summary["tick_rate"] = {"min": round(tick_min, 2), "avg": round(sum(ticks) / len(ticks), 2),
+                                "p95": round(percentile(ordered, 0.95), 2), "max": round(tick_max, 2)}
+        ordered = sorted(players)
+        summary["players"] = {"min": round(ordered[0], 2), "avg": round(sum(players) / len(players), 2),
+                              "p95": round(percentile(ordered, 0.95), 2), "max": players_max}
+
+    if below is not None:
+        # a point at or above the threshold closes the running period
+        periods, current = [], None
+        for when, tick, _, _ in ends:
+            if tick < below:
+                if current is None:
+                    current = {"start": when, "end": when, "lowest": round(tick, 2)}
+                current.update(end=when, lowest=round(min(current["lowest"], tick), 2))
+            elif current is not None:
+                periods.append(current)
+                current = None
+        if current is not None:
+            periods.append(current)
+        summary["below"] = {"threshold": below, "periods": periods}
+
+    changes = []
+    for (_, _, tier, phase), (when, _, new_tier, new_phase) in zip(ends, ends[1:]):
+        if new_tier != tier:
+            changes.append({"time": when, "field": "techTier", "from": tier, "to": new_tier})
+        if new_phase != phase:
+            changes.append({"time": when, "field": "gamePhase", "from": phase, "to": new_phase})
+    summary["changes"] = changes
+    return summary
+
+def format_time(when):
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(when))
+
+def query_metrics(hosts, store, since, until, resolution, below, fmt):
+    """Print a summary of the recorded metrics of every host over [since, until)."""
+    now = time.time()
+    start = parse_when(since, now)
+    end = parse_when(until, now) if until else now
+    chosen = resolution if resolution != "auto" else metrics_resolution(start, end)
+    for host in hosts:
+        summary = summarize_metrics(store.series(host, chosen).read(start, end), chosen, below)
+        summary.update(host=host, start=start, end=end)
+        if fmt == "json":
+            click.echo(json.dumps(summary))
+            continue
+        counts = f"{summary['samples']} samples"
+        if chosen != "raw":
+            counts = f"{summary['points']} {chosen} rollups of {counts}"
+        click.echo(f"{host}  {format_time(start)} .. {format_time(end)}  ({counts})")
+        if not summary["points"]:
+            continue
+        for key, title in (("tick_rate", "tick rate"), ("players", "players")):
+            stats = summary[key]
+            click.echo(f"  {title:<10} min {stats['min']:>7}  avg {stats['avg']:>7}  "
+                       f"p95 {stats['p95']:>7}  max {stats['max']:>7}")
+        if below is not None:
+            click.echo(f"  tick rate below {below:g}: {len(summary['below']['periods'])} period(s)")
+            for period in summary["below"]["periods"]:
+                click.echo(f"    {format_time(period['start'])} .. {format_time(period['end'])}  "
+                           f"lowest {period['lowest']}")
+        for change in summary["changes"]:
+            click.echo(f"  {format_time(change['time'])}  {change['field']} {change['from']} -> {change['to']}")
+
+# calls the agent forwards without adding a stored token
+AGENT_LOGIN_FUNCTIONS = {"PasswordLogin", "PasswordlessLogin"}
+
+class AgentClient:
+    """Client that forwards calls to a running --agent over its Unix socket.
+
+    The agent adds the stored token for the host and keeps its connections
+    to the servers open between runs, so a call costs one local round trip.
+    Like UrllibClient it cannot stream, so transfers and backups never use it.
+    """
+
+    def __init__(self, sock, cache=None):
+        self.sock = sock
+        self.file = sock.makefile("rb")
+        self.cache = cache
+        self.lock = threading.Lock()
+
+    @classmethod
+    def connect(cls, path=AGENT_SOCKET, privilege=None, timeout=READ_TIMEOUT):
+        """Return a client for the agent listening on path, or None when there is none to use."""
+        import socket
+
+        if not os.path.exists(path):
+            return None
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        try:
+            sock.connect(path)
+            client = cls(sock)
+            hello = client.request({"hello": True})
+        except (OSError, ValueError):
+            sock.close()
+            return None
+        if privilege and hello.get("privilege") != privilege:
+            client.close()
+            return None
+        return client
+
+    def request(self, message):
+        with self.lock:
+            try:
+                self.sock.sendall(json.dumps(message).encode() + b"\n")
+                line = self.file.readline()
+            except OSError as e:
+                raise TransportError.wrap(e) from e
+        if not line:
+            raise TransportError("the agent closed the connection", "AgentGone")
+        return json.loads(line)
+
+    def post(self, url, headers=None, **kwargs):
+        """Forward kwargs["json"]; the agent supplies the token unless headers carry one."""
+        auth = (headers or {}).get("Authorization", "")
+        reply = self.request({"url": url, "json": kwargs["json"], "token": auth[len("Bearer "):] or None})
+        if "error" in reply:
+            raise TransportError(reply["error"], reply["kind"])
+        return Response(reply["status"], reply["reason"], reply["body"].encode("utf-8", "surrogateescape"))
+
+    def stats(self):
+        """Return the agent's (requests, new connections, reused connections) since it started."""
+        return tuple(self.request({"stats": True})["stats"])
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+
+def agent_reply(message):
+    """Answer one request from an AgentClient using this process's client and tokens."""
+    from urllib.parse import urlsplit
+
+    if message.get("hello"):
+        return {"privilege": TOKENS.privilege}
+    if message.get("stats"):
+        return {"stats": list(CLIENT.stats())}
+
+    url = message["url"]
+    body = message["json"]
+    function = body.get("function")
+    token = message.get("token")
+    try:
+        if not token and function not in AGENT_LOGIN_FUNCTIONS:
+            token = TOKENS.get(urlsplit(url).netloc, interactive=False)
+        response = _post_command(token, function, body.get("data"), url, False)
+    except TransportError as e:
+        return {"error": str(e).partition(": ")[2], "kind": e.kind}
+    return {"status": response.status_code, "reason": response.reason,
+            "body": response.content.decode("utf-8", "surrogateescape")}
+
+def run_agent(path):
+    """Serve AgentClient requests on a Unix socket until interrupted."""
+    import signal
+    import socketserver
+
+    running = AgentClient.connect(path)
+    if running is not None:
+        running.close()
+        raise click.ClickException(f"an agent is already listening on {path}")
+    if os.path.exists(path):
+        os.unlink(path)
+
+    class AgentHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                try:
+                    reply = agent_reply(json.loads(line))
+                except (ValueError, KeyError, AttributeError) as e:
+                    reply = {"error": f"bad request: {e}", "kind": "AgentRequest"}
+                self.wfile.write(json.dumps(reply).encode() + b"\n")
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # the agent hands out admin access, so only this user may connect
+    umask = os.umask(0o177)
+    try:
+        server = socketserver.ThreadingUnixStreamServer(path, AgentHandler)
+    finally:
+        os.umask(umask)
+    server.daemon_threads = True
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    click.echo(f"Agent listening on {path}", err=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        os.unlink(path)
 
 def read_config():
+    import configparser
+
     config = configparser.ConfigParser()
     config.read(CONFIGFILE)
     if "server" not in config.sections():
@@ -76,40 +2612,445 @@ def read_config():
 
 
 def save_config(config):
-    with open(CONFIGFILE, "w+") as f:
+    """Write the config to a temporary file and rename it over the old one."""
+    os.makedirs(os.path.dirname(CONFIGFILE), exist_ok=True)
+    tmp = f"{CONFIGFILE}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
         config.write(f)
+    os.replace(tmp, CONFIGFILE)
 
 
-def send_command(token, funcName, data=None):
-    try:
-        headers = {}
+class ConfigLock:
+    """Exclusive lock on the config file so concurrent invocations don't lose each other's writes."""
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(CONFIGFILE), exist_ok=True)
+        self.file = open(f"{CONFIGFILE}.lock", "a")
+        try:
+            import fcntl
+            fcntl.flock(self.file, fcntl.LOCK_EX)
+        except ImportError:
+            pass
+        return self
+
+    def __exit__(self, *exc):
+        # closing the file releases the flock
+        self.file.close()
+
+
+def update_config(change):
+    """Re-read the config under the lock, apply change(config) and save it."""
+    with ConfigLock():
+        config = read_config()
+        change(config)
+        save_config(config)
+
+
+# seconds a verified token is trusted before VerifyAuthenticationToken is called again
+TOKEN_CHECK_AFTER = 3600
+
+# set by cli() so post_command can log in again when a token is rejected
+TOKENS = None
+
+
+class TokenStore:
+    """Tokens per host and privilege level, kept in '[host <host:port>]' config sections.
+
+    A token is re-checked with VerifyAuthenticationToken once it has not been
+    verified for check_after seconds, and replaced by a fresh PasswordLogin
+    when the server rejects it. The old single '[server] token' is used as an
+    unverified fallback for hosts that have no token of their own yet.
+    interactive (by default: whether stdin is a terminal) allows refresh() to
+    prompt for the password.
+    """
+
+    def __init__(self, config, password=None, privilege="Administrator", check_after=TOKEN_CHECK_AFTER,
+                 interactive=None):
+        self.config = config
+        self.password = password
+        self.privilege = privilege
+        self.check_after = check_after
+        self.interactive = sys.stdin.isatty() if interactive is None else interactive
+        self.lock = threading.Lock()
+        # one login at a time, so threads that all got a 401 share a single prompt
+        self.login_lock = threading.Lock()
+        # rejected token -> the token that replaced it
+        self.replaced = {}
+
+    @staticmethod
+    def section(url):
+        from urllib.parse import urlsplit
+
+        return f"host {urlsplit(url).netloc}"
+
+    def lookup(self, url):
+        """Return (token, last verified epoch) for the host of url."""
+        key = self.privilege.lower()
+        section = self.section(url)
+        if self.config.has_section(section) and self.config.get(section, key, fallback=""):
+            return self.config.get(section, key), self.config.getfloat(section, f"{key}.verified", fallback=0.0)
+        return self.config.get("server", "token", fallback="") or None, 0.0
+
+    def store(self, url, token):
+        key = self.privilege.lower()
+        section = self.section(url)
+        now = str(time.time())
+
+        def change(config):
+            if not config.has_section(section):
+                config.add_section(section)
+            config.set(section, key, token)
+            config.set(section, f"{key}.verified", now)
+
+        with self.lock:
+            update_config(change)
+            change(self.config)
+
+    def verify(self, url, token):
+        """Ask the server whether token is still valid; network errors count as valid."""
+        try:
+            response = post_command(token, "VerifyAuthenticationToken", url=url)
+        except TransportError:
+            return True
+        return 200 <= response.status_code < 300
+
+    def login(self, url, interactive=True):
+        password = self.password
+        if not password and interactive:
+            password = click.prompt("password", hide_input=True)
+            self.password = password
+        if not password:
+            return None
+        token = authenticate(password, url=url, privilege=self.privilege, echo=interactive)
         if token:
-            headers = {
-                'Authorization': f'Bearer {token}',
-                'Content-Type': 'application/json'
+            self.store(url, token)
+        return token
+
+    def get(self, host, interactive=True):
+        """Return a usable token for host, verifying or logging in only when needed."""
+        url = api_url(host)
+        token, verified = self.lookup(url)
+        if token and time.time() - verified < self.check_after:
+            return token
+        if token and self.verify(url, token):
+            self.store(url, token)
+            return token
+        return self.login(url, interactive)
+
+    def peek(self, host):
+        """Return the stored token for host without contacting the server."""
+        return self.lookup(api_url(host))[0]
+
+    def current(self, token):
+        """Return the token that replaced token after the server rejected it, or token itself."""
+        with self.lock:
+            return self.replaced.get(token, token)
+
+    def refresh(self, url, rejected):
+        """Return a replacement for a token the server rejected, or None.
+
+        Without --password this prompts for it when the store is interactive.
+        The replacement is remembered, so callers still holding the rejected
+        token get the new one from current() instead of another 401.
+        """
+        with self.login_lock:
+            with self.lock:
+                token, _ = self.lookup(url)
+            if not token or token == rejected:
+                token = self.login(url, self.interactive)
+            if token and rejected:
+                with self.lock:
+                    for old, new in list(self.replaced.items()):
+                        if new == rejected:
+                            self.replaced[old] = token
+                    self.replaced[rejected] = token
+        return token
+
+
+# set by cli(); every client checks new TLS connections against it
+PINS = None
+
+
+def certificate_fingerprint(der):
+    """sha256 of a DER certificate as colon-separated hex, the way openssl x509 -fingerprint prints it."""
+    digest = hashlib.sha256(der).hexdigest().upper()
+    return ":".join(digest[i:i + 2] for i in range(0, len(digest), 2))
+
+
+class CertificatePins:
+    """Certificate fingerprints per host, kept as 'certificate' in the '[host <host:port>]' config sections.
+
+    Dedicated servers use self-signed certificates that no CA can vouch for,
+    so the first certificate seen is trusted instead: with learn (--pin-cert)
+    it is stored, and from then on every connection to that host must
+    present the same certificate. replace (--repin) stores a changed one.
+    Hosts without a pin are not checked.
+    """
+
+    def __init__(self, config, learn=False, replace=False):
+        self.config = config
+        self.learn = learn
+        self.replace = replace
+        self.lock = threading.Lock()
+
+    def pinned(self, netloc):
+        return self.config.get(f"host {netloc}", "certificate", fallback="") or None
+
+    def wants(self, netloc):
+        """True when connections to netloc have to be checked or their certificate stored."""
+        return self.learn or self.replace or self.pinned(netloc) is not None
+
+    def check(self, netloc, der):
+        """Raise ssl.SSLCertVerificationError unless der is the pinned certificate; pin it when allowed."""
+        import ssl
+
+        fingerprint = certificate_fingerprint(der)
+        with self.lock:
+            pinned = self.pinned(netloc)
+            if pinned == fingerprint or not (pinned or self.learn or self.replace):
+                return
+            if pinned and not self.replace:
+                raise ssl.SSLCertVerificationError(
+                    ssl.SSL_ERROR_SSL, f"certificate of {netloc} changed: pinned {pinned}, got {fingerprint} (--repin accepts it)")
+            section = f"host {netloc}"
+
+            def change(config):
+                if not config.has_section(section):
+                    config.add_section(section)
+                config.set(section, "certificate", fingerprint)
+
+            update_config(change)
+            change(self.config)
+        click.echo(f"Pinned the certificate of {netloc}: {fingerprint}", err=True)
+
+
+class CircuitBreaker:
+    """Fails calls to a host fast while it is unresponsive.
+
+    After `failures` calls in a row failed even after their retries
+    (network errors or busy statuses), the host's circuit opens and calls
+    fail at once for `cooldown` seconds. Then a single trial call is let
+    through, and its outcome closes the circuit or keeps it open for
+    another cooldown.
+    """
+
+    def __init__(self, failures=BREAKER_FAILURES, cooldown=BREAKER_COOLDOWN):
+        self.failures = failures
+        self.cooldown = cooldown
+        self.hosts = {}
+        self.lock = threading.Lock()
+
+    def allow(self, url):
+        with self.lock:
+            state = self.hosts.get(url)
+            if state is None or state["failed"] < self.failures:
+                return True
+            if time.monotonic() - state["opened"] < self.cooldown:
+                return False
+            # half open: this call is the trial, later ones wait for its outcome or another cooldown
+            state["opened"] = time.monotonic()
+            return True
+
+    def record(self, url, ok):
+        with self.lock:
+            if ok:
+                self.hosts.pop(url, None)
+                return
+            state = self.hosts.setdefault(url, {"failed": 0, "opened": 0.0})
+            state["failed"] += 1
+            if state["failed"] >= self.failures:
+                state["opened"] = time.monotonic()
+
+
+def hedged_post(client, url, headers, jsonreq):
+    """POST a read-only call, sending a second copy when the first is slower than HEDGE_AFTER.
+
+    The first copy to succeed wins; the other is left to finish on its own
+    thread. Only the first copy's phases are traced.
+    """
+    from concurrent.futures import FIRST_COMPLETED, Future, wait
+
+    trace = current_trace()
+
+    def start(traced):
+        future = Future()
+
+        def run():
+            TRACE_LOCAL.current = trace if traced else None
+            try:
+                future.set_result(client.post(url, headers=headers, json=jsonreq))
+            except BaseException as e:
+                future.set_exception(e)
+
+        # daemon threads, so a copy that never answers does not keep the process alive
+        threading.Thread(target=run, daemon=True).start()
+        return future
+
+    first = start(True)
+    if wait([first], timeout=HEDGE_AFTER).done:
+        return first.result()
+    second = start(False)
+    if trace is not None:
+        trace.hedged = True
+    pending = {first, second}
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                if trace is not None and future is second:
+                    trace.hedge_won = True
+                return future.result()
+    return first.result()
+
+
+def post_with_policy(client, url, funcName, headers, jsonreq, stream):
+    """Send one call through client with retries, hedging and the circuit breaker.
+
+    Only read-only calls are retried or hedged. A retry happens after a
+    network error or a RETRY_STATUSES answer, following a jittered
+    exponential backoff. Calls to a host whose circuit is open fail at once
+    with a CircuitOpen TransportError.
+    """
+    import random
+
+    kwargs = {"stream": True} if stream else {}
+    if isinstance(client, AgentClient):
+        # the agent applies its own policy
+        return client.post(url, headers=headers, json=jsonreq, **kwargs)
+
+    read_only = funcName in READ_ONLY_FUNCTIONS
+    retries = RETRIES if read_only else 0
+    if BREAKER is not None and not BREAKER.allow(url):
+        raise TransportError(f"{url} failed {BREAKER.failures} calls in a row, skipping calls for "
+                             f"{BREAKER.cooldown:.0f}s", "CircuitOpen")
+    trace = current_trace()
+    for attempt in range(retries + 1):
+        if trace is not None:
+            trace.attempts += 1
+        try:
+            if HEDGE_AFTER is not None and read_only and not stream:
+                response = hedged_post(client, url, headers, jsonreq)
+            else:
+                response = client.post(url, headers=headers, json=jsonreq, **kwargs)
+        except TransportError:
+            if attempt == retries:
+                if BREAKER is not None:
+                    BREAKER.record(url, False)
+                raise
+        else:
+            busy = response.status_code in RETRY_STATUSES
+            if not busy or attempt == retries:
+                if BREAKER is not None:
+                    BREAKER.record(url, not busy)
+                return response
+            if hasattr(response, "close"):
+                response.close()
+        delay = random.uniform(0, min(RETRY_BACKOFF_MAX, RETRY_BACKOFF * 2 ** attempt))
+        if trace is not None:
+            trace.add("backoff", delay)
+        time.sleep(delay)
+
+
+def post_command(token, funcName, data=None, url=None, stream=False):
+    """Send one API call through the shared client and return the raw response.
+
+    Read-only calls may be answered from the response cache. With stream=True
+    the body is left unread (see response_chunks) and is not cached.
+    Retries, hedging and the circuit breaker are applied by post_with_policy;
+    network errors left after that are raised. With --trace each call's timings are recorded.
+    """
+    if TRACER is None:
+        return _post_command(token, funcName, data, url, stream)
+
+    trace = TRACER.start(funcName, url or SERVER_URL)
+    start = time.perf_counter()
+    try:
+        response = _post_command(token, funcName, data, url, stream)
+        trace.status = response.status_code
+        trace.cached = isinstance(response, CachedResponse)
+        return response
+    except TransportError as e:
+        trace.error = e.kind
+        raise
+    finally:
+        trace.add("total", time.perf_counter() - start)
+        TRACER.finish(trace)
+
+
+def _post_command(token, funcName, data, url, stream):
+    if token and TOKENS is not None:
+        # a caller may still hold a token an earlier call had to replace
+        token = TOKENS.current(token)
+    headers = {}
+    if token:
+        headers = {
+            'Authorization': f'Bearer {token}',
+            'Content-Type': 'application/json'
+        }
+
+    jsonreq = {
+            "function": funcName
             }
 
-        jsonreq = {
-                "function": funcName
-                }
+    if data:
+        jsonreq["data"] = data
+
+    url = url or SERVER_URL
+    client = get_client()
+    if client.cache:
+        cached = client.cache.lookup(url, funcName, data)
+        if cached:
+            return cached
 
-        if data:
-            jsonreq["data"] = data
+    global FIRST_SEND
+    if FIRST_SEND is None:
+        FIRST_SEND = time.perf_counter()
+    response = post_with_policy(client, url, funcName, headers, jsonreq, stream)
+    if response.status_code == 401 and TOKENS is not None and funcName not in LOGIN_FUNCTIONS:
+        fresh = TOKENS.refresh(url, token)
+        if fresh:
+            headers['Authorization'] = f'Bearer {fresh}'
+            headers['Content-Type'] = 'application/json'
+            response = post_with_policy(client, url, funcName, headers, jsonreq, stream)
+    if client.cache and not stream:
+        client.cache.record(url, funcName, data, response)
+    return response
 
-        response = requests.post(SERVER_URL, headers=headers, verify=False, json=jsonreq)
+
+def send_command(token, funcName, data=None, url=None, quiet=False):
+    try:
+        response = post_command(token, funcName, data, url)
 
         if response.status_code >= 200 and response.status_code < 300:
-            click.echo(f"Command success: {response.status_code}")
+            if not quiet:
+                if isinstance(response, CachedResponse):
+                    click.echo(f"Command success: {response.status_code} (cached {response.age:.0f}s ago)")
+                else:
+                    click.echo(f"Command success: {response.status_code}")
             return response
         else:
-            click.echo(f"Failed to get server status: {response.status_code} {response.reason}")
-            click.echo(response.text)
+            if not quiet:
+                click.echo(f"Failed to get server status: {response.status_code} {response.reason}")
+                click.echo(response.text)
             return None
-    except requests.exceptions.RequestException as e:
-        click.echo(f"An error occurred: {e}")
+    except TransportError as e:
+        if not quiet:
+            click.echo(f"An error occurred: {e}")
         raise(e)
 
 
+def report_startup():
+    """Print where the time went since the script started (--startup-profile)."""
+    now = time.perf_counter()
+    heavy = [name for name in ("asyncio", "configparser", "logging", "concurrent.futures") if name in sys.modules]
+    if FIRST_SEND is None:
+        click.echo(f"startup-profile: no request sent, total {(now - STARTED) * 1000:.1f} ms", err=True)
+    else:
+        click.echo(f"startup-profile: first request after {(FIRST_SEND - STARTED) * 1000:.1f} ms, "
+                   f"total {(now - STARTED) * 1000:.1f} ms", err=True)
+    click.echo(f"startup-profile: heavy modules loaded: {', '.join(heavy) or 'none'}", err=True)
+
+
 @click.command()
 @click.option('--host', 'host', default="localhost:7777", help='host:port to connect to')
 @click.option('--password', hide_input=True, help='Password for server authentication.')
@@ -117,25 +3058,269 @@ def send_command(token, funcName, data=None):
 @click.option('--save', 'save', help='save game with name')
 @click.option('--shutdown', is_flag=True, help='shutdown the server')
 @click.option('--enumerate', 'enums', is_flag=True, help='enumerate sessions')
-def cli(host, password, status,save, shutdown, enums):
+@click.option('--enum-format', type=click.Choice(['json', 'text', 'ndjson']), default='json', show_default=True,
+              help='--enumerate output: full JSON document, one block per session, or one JSON line per save')
+@click.option('--session-match', help='only sessions whose name matches (glob, or substring)')
+@click.option('--save-match', help='only saves whose name matches (glob, or substring)')
+@click.option('--latest', type=int, help='show at most this many saves per session')
+@click.option('--sort-saves', type=click.Choice(list(SAVE_SORTS)), default='date', show_default=True, help='order of saves within a session')
+@click.option('--limit', type=int, help='stop after this many sessions')
+@click.option('--pool-size', default=POOL_SIZE, show_default=True, help='keep-alive connections kept per host')
+@click.option('--connect-timeout', default=CONNECT_TIMEOUT, show_default=True, help='seconds to wait for a connection')
+@click.option('--read-timeout', default=READ_TIMEOUT, show_default=True, help='seconds to wait for a response')
+@click.option('--conn-stats', is_flag=True, help='print how many connections were opened and reused')
+@click.option('--privilege', type=click.Choice(['Administrator', 'Client']), default='Administrator', show_default=True,
+              help='privilege level to log in with; tokens are stored per host and level')
+@click.option('--token-check-after', default=TOKEN_CHECK_AFTER, show_default=True,
+              help='seconds before a stored token is verified with the server again')
+@click.option('--pin-cert', is_flag=True, help="trust and store a server's certificate on first use; pinned certificates are always checked")
+@click.option('--repin', is_flag=True, help='accept and store a changed server certificate')
+@click.option('--transport', type=click.Choice(['asyncio', 'urllib']), default='asyncio', show_default=True,
+              help='HTTP client; urllib avoids starting an event loop for plain JSON calls')
+@click.option('--retries', default=RETRIES, show_default=True, help='retries for read-only calls after a network error or a busy server')
+@click.option('--retry-backoff', default=RETRY_BACKOFF, show_default=True, help='first retry delay in seconds, doubled for each retry, with jitter')
+@click.option('--hedge-after', type=float, help='send a second copy of a read-only call unanswered after this many seconds')
+@click.option('--breaker-failures', default=BREAKER_FAILURES, show_default=True, help='failed calls in a row before a host is skipped (0 disables)')
+@click.option('--breaker-cooldown', default=BREAKER_COOLDOWN, show_default=True, help='seconds a failing host is skipped before it is tried again')
+@click.option('--debug', is_flag=True, help='log every HTTP request to stderr')
+@click.option('--trace', is_flag=True, help='print per-call timings (DNS, connect, TLS, TTFB, transfer, decode) on stderr')
+@click.option('--trace-json', is_flag=True, help='like --trace, as one JSON document')
+@click.option('--startup-profile', is_flag=True, help='report how long startup took before the first request')
+@click.option('--no-cache', is_flag=True, help='always ask the server instead of using cached responses')
+@click.option('--max-age', type=float, help='accept cached responses up to this many seconds old')
+@click.option('--probe', is_flag=True, help='check the server with HealthCheck and exit 0 healthy, 1 slow, 2 unreachable, 3 auth failed')
+@click.option('--probe-deadline', default=2.0, show_default=True, help='seconds the whole --probe may take')
+@click.option('--probe-min-tick', type=float, help='also report slow when averageTickRate is below this (needs a stored token or --password)')
+@click.option('--watch', is_flag=True, help='keep polling the server state and print only what changed')
+@click.option('--watch-interval', default=2.0, show_default=True, help='shortest delay between polls in seconds')
+@click.option('--watch-max-interval', default=30.0, show_default=True, help='longest delay between polls when nothing changes')
+@click.option('--watch-tick-delta', default=1.0, show_default=True, help='smallest averageTickRate change that is reported')
+@click.option('--exporter', 'exporter_port', type=int, help='serve Prometheus metrics on this port (all --fleet hosts, or --host)')
+@click.option('--exporter-ttl', default=15.0, show_default=True, help='seconds a server state is reused before it is refreshed')
+@click.option('--record', is_flag=True, help='sample the server state of --host (or every --fleet host) into the metrics store')
+@click.option('--record-interval', default=5.0, show_default=True, help='seconds between --record samples')
+@click.option('--metrics', 'metrics_query', is_flag=True, help='summarise the recorded metrics of --host (or every --fleet host)')
+@click.option('--since', default='24h', show_default=True, help="start of the --metrics window: '90m', '24h', '7d' ago or 'YYYY-MM-DD HH:MM'")
+@click.option('--until', help='end of the --metrics window (default: now)')
+@click.option('--metrics-resolution', type=click.Choice(['auto', 'raw', '1m', '1h']), default='auto', show_default=True,
+              help='samples or rollups to summarise; auto picks by window length')
+@click.option('--metrics-below', type=float, help='also list the periods the tick rate was below this')
+@click.option('--metrics-format', type=click.Choice(['text', 'json']), default='text', show_default=True, help='--metrics output format')
+@click.option('--metrics-dir', default=METRICS_DIR, show_default=True, type=click.Path(file_okay=False), help='metrics store location')
+@click.option('--metrics-raw-days', default=METRIC_RETENTION_DAYS["raw"], show_default=True, help='days raw samples are kept')
+@click.option('--catalog-sync', is_flag=True, help='update the local save catalog from --host (or every --fleet host)')
+@click.option('--catalog', 'catalog_query', is_flag=True, help='list saves from the local save catalog instead of the servers')
+@click.option('--catalog-file', default=CATALOG_FILE, show_default=True, type=click.Path(dir_okay=False), help='save catalog location')
+@click.option('--catalog-max-age', default=0.0, show_default=True, help='--catalog-sync skips hosts synced less than this many seconds ago')
+@click.option('--catalog-format', type=click.Choice(['text', 'ndjson', 'json']), default='text', show_default=True, help='--catalog output format')
+@click.option('--older-than', help="only --catalog saves older than '7d', '12h' or a date")
+@click.option('--newer-than', help="only --catalog saves from the last '7d', '12h' or since a date")
+@click.option('--download', 'download_name', help='download the save with this name')
+@click.option('--output', type=click.Path(dir_okay=False), help='where to write --download (default: <name>.sav)')
+@click.option('--upload', 'upload_path', type=click.Path(exists=True, dir_okay=False), help='upload this save file')
+@click.option('--upload-name', help='save name to upload as (default: file name without .sav)')
+@click.option('--load-upload', is_flag=True, help='load the uploaded save right away')
+@click.option('--expect-sha256', help='fail the download unless the file has this sha256')
+@click.option('--transfer-retries', default=TRANSFER_RETRIES, show_default=True, help='retries for an interrupted transfer')
+@click.option('--backup', is_flag=True, help='save the game and back up every save not stored yet')
+@click.option('--backup-dir', default=BACKUP_DIR, show_default=True, type=click.Path(file_okay=False), help='backup store location')
+@click.option('--backup-save-name', default='backup', show_default=True, help="save name used by --backup ('' to skip saving)")
+@click.option('--backup-keep', default=0, show_default=True, help='backups kept per save name, 0 keeps all')
+@click.option('--restore', 'restore_name', help='rebuild the newest backup of this save name into --output')
+@click.option('--restore-date', help='restore the backup with this saveDateTime instead of the newest')
+@click.option('--inspect', 'inspect_path', type=click.Path(exists=True, dir_okay=False), help='show the header and chunk layout of a local .sav file')
+@click.option('--inspect-chunks', is_flag=True, help='with --inspect, list every compressed chunk')
+@click.option('--verify-chunks', is_flag=True, help='with --inspect, decompress every chunk to check the file')
+@click.option('--inspect-workers', type=int, help='threads decompressing for --verify-chunks (default: one per CPU)')
+@click.option('--inspect-format', type=click.Choice(['text', 'json']), default='text', show_default=True, help='--inspect output format')
+@click.option('--batch', type=click.Path(allow_dash=True), help="run JSON-lines commands from this file ('-' for stdin)")
+@click.option('--batch-parallel', default=1, type=click.IntRange(min=1), show_default=True,
+              help='run up to this many consecutive read-only batch commands at once (grows --pool-size to match)')
+@click.option('--fleet', 'fleet', type=click.Path(allow_dash=True), help="query every host in this inventory file ('-' for stdin)")
+@click.option('--fleet-call', 'fleet_calls', multiple=True, type=click.Choice(list(FLEET_CALLS)), help='API calls to run per host (repeatable, default: status)')
+@click.option('--fleet-workers', default=8, show_default=True, help='hosts queried at the same time')
+@click.option('--fleet-format', type=click.Choice(['table', 'ndjson']), default='table', show_default=True, help='fleet output format')
+@click.option('--fleet-run', type=parse_steps, help='apply these steps to every --fleet host, e.g. save,verify,shutdown (also status)')
+@click.option('--step-timeout', default=60.0, show_default=True, help='seconds each --fleet-run step may take per host')
+@click.option('--load-test', 'load_rates', type=click.FloatRange(min=0), multiple=True,
+              help='load test the server at this many calls per second, 0 for as fast as possible (repeat for steps)')
+@click.option('--load-clients', default=8, show_default=True, help='concurrent virtual clients in --load-test')
+@click.option('--load-mix', type=parse_mix, default='status=8,sessions=1,options=1', show_default=True,
+              help='weights of the calls made by --load-test')
+@click.option('--load-duration', default=30.0, show_default=True, help='seconds each --load-test step runs')
+@click.option('--load-baseline', default=10.0, show_default=True, help='seconds the tick rate is sampled before loading')
+@click.option('--load-sample-interval', default=1.0, show_default=True, help='seconds between tick rate samples')
+@click.option('--load-format', type=click.Choice(['text', 'json']), default='text', show_default=True, help='--load-test report format')
+@click.option('--alert', 'alerts', multiple=True, help="alert rule for --host (or every --fleet host), e.g. 'slow: averageTickRate < 20 for 5' (repeatable)")
+@click.option('--alert-rules', type=click.Path(exists=True, dir_okay=False, allow_dash=True), help='file with one --alert rule per line')
+@click.option('--alert-interval', default=2.0, show_default=True, help='seconds between alert polls')
+@click.option('--alert-hook', help='shell command run for every alert transition, with the event as JSON on stdin')
+@click.option('--alert-log', type=click.Path(dir_okay=False), help='append alert events to this file instead of stdout')
+@click.option('--agent', is_flag=True, help='stay running and serve other cli.py runs over a Unix socket')
+@click.option('--agent-socket', default=AGENT_SOCKET, show_default=True, type=click.Path(dir_okay=False), help='socket of the --agent')
+@click.option('--no-agent', is_flag=True, help='talk to the server directly even if an agent is running')
+def cli(host, password, status,save, shutdown, enums, enum_format, session_match, save_match, latest, sort_saves, limit,
+        pool_size, connect_timeout, read_timeout, conn_stats,
+        privilege, token_check_after, pin_cert, repin, transport, retries, retry_backoff, hedge_after, breaker_failures, breaker_cooldown,
+        debug, trace, trace_json, startup_profile, no_cache, max_age,
+        probe, probe_deadline, probe_min_tick,
+        watch, watch_interval, watch_max_interval, watch_tick_delta, exporter_port, exporter_ttl,
+        record, record_interval, metrics_query, since, until, metrics_resolution, metrics_below, metrics_format,
+        metrics_dir, metrics_raw_days,
+        catalog_sync, catalog_query, catalog_file, catalog_max_age, catalog_format, older_than, newer_than,
+        download_name, output, upload_path, upload_name, load_upload, expect_sha256, transfer_retries,
+        backup, backup_dir, backup_save_name, backup_keep, restore_name, restore_date,
+        inspect_path, inspect_chunks, verify_chunks, inspect_workers, inspect_format,
+        batch, batch_parallel, fleet, fleet_calls, fleet_workers, fleet_format,
+        fleet_run, step_timeout, load_rates, load_clients, load_mix, load_duration, load_baseline, load_sample_interval,
+        load_format, alerts, alert_rules, alert_interval, alert_hook, alert_log,
+        agent, agent_socket, no_agent):
     """CLI tool to authenticate and interact with the Satisfactory Dedicated Server API."""
-    config = read_config()
-    token = config.get("server", "token")
+    global CLIENT, TOKENS, PINS, TRACER, RETRIES, RETRY_BACKOFF, HEDGE_AFTER, BREAKER
+    RETRIES = retries
+    RETRY_BACKOFF = retry_backoff
+    HEDGE_AFTER = hedge_after
+    BREAKER = CircuitBreaker(breaker_failures, breaker_cooldown) if breaker_failures > 0 else None
+    if debug:
+        enable_debug_logging()
+    if trace or trace_json:
+        import atexit
+        TRACER = Tracer()
+        atexit.register(TRACER.report, trace_json)
+    if startup_profile:
+        import atexit
+        atexit.register(report_startup)
+    if probe:
+        sys.exit(run_probe(host, probe_deadline, probe_min_tick, password, privilege, None if no_agent else agent_socket))
+    if inspect_path:
+        # a local file: no server, token or config needed
+        sys.exit(0 if inspect_save(inspect_path, inspect_chunks, verify_chunks, inspect_workers, inspect_format) else 1)
+    if transport == "urllib" and (upload_path or download_name or backup):
+        raise click.UsageError("save transfers and backups need --transport asyncio")
 
-    if not token:
-        password = click.prompt("password", hide_input=True)
+    # transfers, backups and the multi-host modes always talk to the servers themselves
+    forward = not (agent or no_agent or upload_path or download_name or backup or restore_name or exporter_port or fleet
+                   or record or metrics_query or catalog_sync or catalog_query or alerts or alert_rules or load_rates)
+    agent_client = AgentClient.connect(agent_socket, privilege, read_timeout) if forward else None
 
-        print("token")
-        token = authenticate(password)
-        config['server']['token'] = token
-        save_config(config)
+    if agent_client is None:
+        config = read_config()
+        # modes that run unattended never stop at a password prompt when a token is rejected
+        unattended = agent or exporter_port or record or alerts or alert_rules
+        TOKENS = TokenStore(config, password, privilege, token_check_after, interactive=False if unattended else None)
+        PINS = CertificatePins(config, pin_cert, repin)
+
+    if agent:
+        # no cache in the agent: each forwarding run checks and updates the cache file itself
+        CLIENT = make_client(transport, pool_size, connect_timeout, read_timeout)
+        run_agent(agent_socket)
+        return
+
+    if restore_name:
+        store = BackupStore(backup_dir)
+        target = output or f"{restore_name}.sav"
+        sys.exit(0 if restore_backup(host, store, restore_name, target, restore_date) else 1)
+
+    if metrics_query:
+        hosts = [h for h, _ in read_inventory(fleet)] if fleet else [host]
+        query_metrics(hosts, MetricsStore(metrics_dir), since, until, metrics_resolution, metrics_below, metrics_format)
+        return
+
+    if catalog_sync or catalog_query:
+        catalog = SaveCatalog(catalog_file)
+        inventory = read_inventory(fleet) if fleet else [(host, None)]
+        failed = 0
+        if catalog_sync:
+            failed = sync_catalog(catalog, inventory, TOKENS, fleet_workers, catalog_max_age,
+                                  connect_timeout, read_timeout)
+        if catalog_query:
+            now = time.time()
+            # without --fleet or an explicit --host, the query covers every host in the catalog
+            source = click.get_current_context().get_parameter_source("host")
+            hosts = None if not fleet and source == click.core.ParameterSource.DEFAULT else [h for h, _ in inventory]
+            saves = catalog.query(hosts, session_match, save_match, latest,
+                                  sort_saves, parse_when(older_than, now) if older_than else None,
+                                  parse_when(newer_than, now) if newer_than else None, limit)
+            list_catalog(saves, catalog_format)
+        catalog.close()
+        sys.exit(1 if failed else 0)
+
+    if record:
+        # like the alerts: stored tokens are used as they are, and a missing or rejected one is
+        # replaced by a login with --password
+        hosts = read_inventory(fleet) if fleet else [(host, None)]
+        run_recorder(hosts, TOKENS, MetricsStore(metrics_dir, metrics_raw_days), record_interval, fleet_workers,
+                     connect_timeout, read_timeout)
+        return
+
+    if exporter_port:
+        # stored tokens are used as they are; a rejected one is replaced on the first 401
+        hosts = [(h, t or TOKENS.peek(h)) for h, t in read_inventory(fleet)] if fleet else [(host, TOKENS.peek(host))]
+        CLIENT = make_client(transport, max(pool_size, len(hosts)), connect_timeout, read_timeout)
+        run_exporter(hosts, exporter_port, exporter_ttl)
+        return
+
+    if alerts or alert_rules:
+        rules = [AlertRule(text) for text in list(alerts) + (read_alert_rules(alert_rules) if alert_rules else [])]
+        names = [rule.name for rule in rules]
+        if len(set(names)) < len(names):
+            raise click.UsageError("alert rule names must be unique")
+        hosts = read_inventory(fleet) if fleet else [(host, None)]
+        run_alerts(hosts, TOKENS, rules, alert_interval, fleet_workers, AlertNotifier(alert_log, alert_hook),
+                   connect_timeout, read_timeout)
+        return
+
+    if fleet_run:
+        if not fleet:
+            raise click.UsageError("--fleet-run needs a --fleet inventory")
+        save_name = save or f"fleet_{time.strftime('%Y%m%d_%H%M%S')}"
+        failed = run_fleet_steps(fleet, TOKENS, fleet_run, save_name, fleet_workers, step_timeout, fleet_format,
+                                 connect_timeout, read_timeout)
+        sys.exit(1 if failed else 0)
+
+    if fleet:
+        cache = ResponseCache(CACHEDIR, max_age=max_age, enabled=not no_cache, privilege=privilege)
+        failed = run_fleet(fleet, TOKENS, fleet_calls or ("status",), fleet_workers, fleet_format,
+                           connect_timeout, read_timeout, cache)
+        sys.exit(1 if failed else 0)
+
+    # watch polls for fresh state by design, so it never reads from the cache
+    cache = ResponseCache(CACHEDIR, max_age=max_age, enabled=not (no_cache or watch), privilege=privilege)
+    if agent_client is not None:
+        agent_client.cache = cache
+        CLIENT = agent_client
+    else:
+        # parallel batch commands each need a connection, or they would just queue for the pool
+        CLIENT = make_client(transport, max(pool_size, batch_parallel if batch else 0), connect_timeout, read_timeout,
+                             cache=cache)
 
     if host:
         global SERVER_URL
-        SERVER_URL = f'https://{host}/api/v1'
+        SERVER_URL = api_url(host)
+
+    if agent_client is not None:
+        # the agent adds the token it holds for the host
+        token = None
+    else:
+        token = TOKENS.get(host)
+        if not token:
+            click.echo("Authentication failed. Cannot proceed.")
+            sys.exit(1)
 
-    if not token:
-        click.echo("Authentication failed. Cannot proceed.")
+    if load_rates:
+        # every call has to reach the server, and each virtual client needs its own connection
+        CLIENT.close()
+        CLIENT = make_client(transport, max(pool_size, load_clients + 1), connect_timeout, read_timeout)
+        run_load_test(token, load_rates, load_mix, load_clients, load_duration, load_baseline, load_sample_interval,
+                      load_format)
+        return
+
+    if batch:
+        failed = run_batch(batch, token, batch_parallel)
+        if conn_stats:
+            num_requests, num_connections, reused = CLIENT.stats()
+            click.echo(f"Connections: {num_requests} requests, {num_connections} opened, {reused} reused", err=True)
+        sys.exit(1 if failed else 0)
 
     if status:
         get_server_status(token)
@@ -147,7 +3332,33 @@ def cli(host, password, status,save, shutdown, enums):
         save_game(token, save)
 
     if enums:
-        enumerate_sessions(token)
+        if enum_format == "json" and not (session_match or save_match or latest or limit):
+            enumerate_sessions(token)
+        elif not list_sessions(token, enum_format, session_match, save_match, latest, sort_saves, limit):
+            sys.exit(1)
+
+    if upload_path:
+        name = upload_name or os.path.splitext(os.path.basename(upload_path))[0]
+        if not upload_save(token, upload_path, name, load_upload, transfer_retries):
+            sys.exit(1)
+
+    if backup:
+        if not run_backup(token, host, BackupStore(backup_dir), backup_save_name, backup_keep):
+            sys.exit(1)
+
+    if download_name:
+        if not download_save(token, download_name, output or f"{download_name}.sav", transfer_retries, expect_sha256):
+            sys.exit(1)
+
+    if watch:
+        try:
+            watch_server_status(token, watch_interval, watch_max_interval, watch_tick_delta)
+        except KeyboardInterrupt:
+            pass
+
+    if conn_stats:
+        num_requests, num_connections, reused = CLIENT.stats()
+        click.echo(f"Connections: {num_requests} requests, {num_connections} opened, {reused} reused")
 
 
 
@@ -0,0 +1,1140 @@
+"""asyncio client for the Satisfactory dedicated server HTTPS API.
+
+Uses only the standard library. One AsyncApiClient keeps keep-alive
+connections for any number of servers, and limits how many calls run at
+the same time on each of them. Calls return the parsed "data" member of
+the response instead of printing anything:
+
+    async with AsyncApiClient(limit_per_host=4) as client:
+        server = client.server("game.example.com:7777", password="secret")
+        state = await server.query_server_state()
+        print(state["serverGameState"]["averageTickRate"])
+
+Code that is not async itself uses BlockingApiClient, which runs an
+AsyncApiClient on an event loop in a background thread. cli.py and the
+winCLI menus are built on it, together with the response cache and the
+streaming session decoder below.
+
+Cancelling a call, or a call running past its timeout, closes its
+connection instead of handing it back to the pool.
+"""
+from __future__ import annotations
+
+# asyncio and ssl are imported where they are used: cli.py imports this module for its
+# error types and cache on every run, and its urllib fast path needs neither
+import collections
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+CONNECT_TIMEOUT = 5.0
+READ_TIMEOUT = 30.0
+LIMIT_PER_HOST = 4
+
+# bytes read from a response body or an upload body at a time
+PIECE_SIZE = 64 * 1024
+
+LOGIN_FUNCTIONS = {"PasswordLogin", "PasswordlessLogin", "VerifyAuthenticationToken"}
+
+# read-only API functions whose responses are cached, with their TTL in seconds
+CACHE_TTLS = {
+    "QueryServerState": 5,
+    "EnumerateSessions": 60,
+    "GetServerOptions": 300,
+    "GetAdvancedGameSettings": 300,
+}
+# functions that neither get cached nor change server state; anything else drops the host's cache
+CACHE_PASSTHROUGH = {"PasswordLogin", "PasswordlessLogin", "HealthCheck", "VerifyAuthenticationToken", "DownloadSaveGame"}
+CACHE_MAX_ENTRIES = 64
+
+# functions without side effects, which may be sent again when a connection fails under them
+READ_ONLY_FUNCTIONS = set(CACHE_TTLS) | {"HealthCheck", "VerifyAuthenticationToken"}
+
+# set by enable_debug_logging()
+LOG = None
+
+
+def enable_debug_logging():
+    """Log every request and every new connection to stderr."""
+    import logging
+
+    global LOG
+    logging.basicConfig()
+    LOG = logging.getLogger("satisfactory_api")
+    LOG.setLevel(logging.DEBUG)
+
+
+class ApiError(Exception):
+    """The server answered a call with an error status."""
+
+    def __init__(self, status: int, reason: str, code: Optional[str] = None, message: Optional[str] = None):
+        super().__init__(f"{status} {reason}" + (f": {code}" if code else "") + (f" ({message})" if message else ""))
+        self.status = status
+        self.reason = reason
+        self.code = code
+        self.message = message
+
+    @classmethod
+    def from_response(cls, response: "Response") -> "ApiError":
+        try:
+            error = response.json() if response.content else {}
+        except ValueError:
+            error = {}
+        error = error if isinstance(error, dict) else {}
+        return cls(response.status_code, response.reason, error.get("errorCode"), error.get("errorMessage"))
+
+
+class TransportError(OSError):
+    """A call failed on the network; kind names the underlying error, e.g. TimeoutError."""
+
+    def __init__(self, message, kind="TransportError"):
+        super().__init__(f"{kind}: {message}")
+        self.kind = kind
+
+    @classmethod
+    def wrap(cls, e):
+        return cls(str(e) or "no details", type(e).__name__)
+
+
+def api_url(host: str) -> str:
+    """Turn a host[:port] or a full URL into the API endpoint, defaulting to the game port."""
+    if "://" in host:
+        return host
+    if ":" not in host:
+        host = f"{host}:7777"
+    return f"https://{host}/api/v1"
+
+
+def insecure_context() -> ssl.SSLContext:
+    """TLS context that accepts the self-signed certificates dedicated servers use."""
+    import ssl
+
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    return context
+
+
+class Headers(dict):
+    """Response header names and values; names are looked up without regard to case."""
+
+    def __init__(self, items=()):
+        super().__init__((name.lower(), value) for name, value in dict(items).items())
+
+    def __getitem__(self, name):
+        return super().__getitem__(name.lower())
+
+    def __contains__(self, name):
+        return super().__contains__(name.lower())
+
+    def get(self, name, default=None):
+        return super().get(name.lower(), default)
+
+
+class Response:
+    """Status, headers and body of one HTTP response, with the parts of the requests API the CLIs use."""
+
+    def __init__(self, status_code: int, reason: str, content: Optional[bytes] = b"", headers=None):
+        self.status_code = status_code
+        self.reason = reason
+        self._content = content
+        self.headers = headers if isinstance(headers, Headers) else Headers(headers or {})
+
+    @property
+    def content(self) -> bytes:
+        return self._content
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", "replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def iter_content(self, size: int = PIECE_SIZE):
+        content = self.content
+        for start in range(0, len(content), size):
+            yield content[start:start + size]
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class CachedResponse(Response):
+    """Response served from the response cache."""
+
+    def __init__(self, entry):
+        super().__init__(entry["status"], "OK", entry["body"].encode())
+        self.age = time.time() - entry["stored"]
+
+
+class AsyncResponse(Response):
+    """A response whose body is read on demand with read().
+
+    The connection and its slot in the per-host limit stay taken until the
+    body has been read to the end or close() is called.
+    """
+
+    def __init__(self, status_code, reason, headers, body, read_timeout, release):
+        super().__init__(status_code, reason, None, headers)
+        self.body = body
+        self.read_timeout = read_timeout
+        self.release = release
+
+    async def read(self, size: int = PIECE_SIZE) -> bytes:
+        """Return the next piece of the body, at most size bytes, or b"" at its end."""
+        import asyncio
+
+        if self.release is None:
+            return b""
+        try:
+            data = await asyncio.wait_for(self.body.read(size), self.read_timeout)
+        except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, ValueError) as e:
+            self.close()
+            raise TransportError.wrap(e) from e
+        except BaseException:
+            self.close()
+            raise
+        if self.body.done:
+            self.close()
+        return data
+
+    async def read_all(self) -> bytes:
+        parts = []
+        while True:
+            data = await self.read()
+            if not data:
+                self._content = b"".join(parts)
+                return self._content
+            parts.append(data)
+
+    def close(self):
+        if self.release is not None:
+            release, self.release = self.release, None
+            release(self.body.done)
+
+
+class ResponseCache:
+    """On-disk cache of read-only API responses, one file per url + privilege + function + payload.
+
+    Entries expire after the per-function TTL in CACHE_TTLS (or max_age when
+    given) and the least recently used ones are evicted past max_entries. A
+    hit reads only its own file and moves its access time forward, so lookups
+    never rewrite a body. A mutating call to a host drops every entry for that
+    host, even when the cache is disabled, so later invocations never see
+    pre-save data.
+    """
+
+    def __init__(self, path, max_entries=CACHE_MAX_ENTRIES, max_age=None, enabled=True, privilege="Administrator"):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.enabled = enabled
+        self.privilege = privilege
+        self.lock = threading.Lock()
+
+    def entry_path(self, url, funcName, data):
+        # the host prefix lets a mutating call drop a host's entries without opening them
+        host = hashlib.sha1(url.encode()).hexdigest()[:16]
+        raw = json.dumps([url, self.privilege, funcName, data], sort_keys=True)
+        return os.path.join(self.path, f"{host}-{hashlib.sha1(raw.encode()).hexdigest()}.json")
+
+    def ttl(self, funcName):
+        ttl = CACHE_TTLS.get(funcName)
+        if ttl is not None and self.max_age is not None:
+            ttl = self.max_age
+        return ttl
+
+    def lookup(self, url, funcName, data):
+        """Return a CachedResponse if a fresh entry exists, otherwise None."""
+        ttl = self.ttl(funcName)
+        if not self.enabled or not ttl:
+            return None
+        path = self.entry_path(url, funcName, data)
+        try:
+            stored = os.stat(path).st_mtime
+            if time.time() - stored > ttl:
+                return None
+            with open(path) as f:
+                entry = json.load(f)
+            # the access time orders entries for eviction; the modification time stays the store time
+            os.utime(path, (time.time(), stored))
+        except (OSError, ValueError):
+            return None
+        return CachedResponse(entry)
+
+    def record(self, url, funcName, data, response):
+        """Store a successful read-only response, or invalidate the host after a mutating one."""
+        if funcName in CACHE_PASSTHROUGH:
+            return
+        with self.lock:
+            try:
+                if funcName not in CACHE_TTLS:
+                    self._drop(url)
+                elif self.enabled and response.status_code == 200:
+                    self._store(self.entry_path(url, funcName, data), response)
+            except OSError:
+                pass
+
+    def _store(self, path, response):
+        os.makedirs(self.path, exist_ok=True)
+        now = time.time()
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"status": response.status_code, "body": response.text, "stored": now}, f)
+        os.utime(tmp, (now, now))
+        os.replace(tmp, path)
+        names = [name for name in os.listdir(self.path) if name.endswith(".json")]
+        if len(names) > self.max_entries:
+            used = {name: os.stat(os.path.join(self.path, name)).st_atime for name in names}
+            for name in sorted(names, key=used.get)[:len(names) - self.max_entries]:
+                os.remove(os.path.join(self.path, name))
+
+    def _drop(self, url):
+        prefix = hashlib.sha1(url.encode()).hexdigest()[:16] + "-"
+        for name in os.listdir(self.path):
+            if name.startswith(prefix):
+                try:
+                    os.remove(os.path.join(self.path, name))
+                except FileNotFoundError:
+                    pass
+
+
+SESSIONS_ARRAY = re.compile(r'"sessions"\s*:\s*\[')
+CURRENT_SESSION_INDEX = re.compile(r'"currentSessionIndex"\s*:\s*(-?\d+)')
+
+
+class SessionStream:
+    """Decode an EnumerateSessions body one session at a time.
+
+    Iterating yields each session dict as soon as it is complete in the body,
+    so large responses are never held in memory as a whole. current_index is
+    set as soon as currentSessionIndex has been seen, which is usually before
+    the session list but may only be after the last session. A body that ends
+    inside the session list raises TransportError.
+    """
+
+    def __init__(self, chunks):
+        import codecs
+
+        self.chunks = iter(chunks)
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.current_index = None
+
+    def _read(self):
+        for chunk in self.chunks:
+            text = self.decoder.decode(chunk)
+            if text:
+                return text
+        return None
+
+    def _scan(self, text):
+        if self.current_index is None:
+            match = CURRENT_SESSION_INDEX.search(text)
+            if match:
+                self.current_index = int(match.group(1))
+
+    def __iter__(self):
+        decoder = json.JSONDecoder()
+        buf = ""
+        while True:
+            match = SESSIONS_ARRAY.search(buf)
+            if match:
+                break
+            more = self._read()
+            if more is None:
+                self._scan(buf)
+                return
+            buf += more
+        self._scan(buf[:match.start()])
+
+        buf = buf[match.end():]
+        pos = 0
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos == len(buf):
+                more = self._read()
+                if more is None:
+                    raise TransportError("EnumerateSessions response ended inside the session list", "IncompleteRead")
+                buf, pos = more, 0
+                continue
+            if buf[pos] == "]":
+                break
+            try:
+                session, end = decoder.raw_decode(buf, pos)
+            except ValueError:
+                # the session is not complete yet: collect pieces until the text has at least doubled
+                # before decoding again, so a session spread over many pieces is decoded a few times, not once per piece
+                parts = [buf[pos:]]
+                size = pending = len(parts[0])
+                while size < 2 * pending:
+                    more = self._read()
+                    if more is None:
+                        break
+                    parts.append(more)
+                    size += len(more)
+                if size == pending:
+                    raise TransportError("EnumerateSessions response ended inside a session", "IncompleteRead")
+                buf, pos = "".join(parts), 0
+                continue
+            yield session
+            pos = end
+
+        rest = buf[pos + 1:]
+        while self.current_index is None:
+            self._scan(rest)
+            more = self._read()
+            if more is None:
+                break
+            rest = rest[-64:] + more
+
+
+class MultipartBody:
+    """File-like multipart/form-data body for UploadSaveGame that reads the save from disk as it is sent.
+
+    It has a length, so it goes out with a Content-Length instead of chunked
+    encoding, and only one piece of the file is held in memory at a time.
+    on_read, if given, is called with the size of every piece of the file.
+    """
+
+    def __init__(self, request: dict, path: str, piece_size: int = PIECE_SIZE,
+                 on_read: Optional[Callable[[int], Any]] = None):
+        import uuid
+
+        boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={boundary}"
+        self.head = (
+            f"--{boundary}\r\n"
+            'Content-Disposition: form-data; name="data"\r\n'
+            "Content-Type: application/json\r\n\r\n"
+            f"{json.dumps(request)}\r\n"
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="saveGameFile"; filename="{os.path.basename(path)}"\r\n'
+            "Content-Type: application/octet-stream\r\n\r\n"
+        ).encode()
+        self.tail = f"\r\n--{boundary}--\r\n".encode()
+        self.size = os.path.getsize(path)
+        self.file = open(path, "rb")
+        self.sha256 = hashlib.sha256()
+        self.piece_size = piece_size
+        self.on_read = on_read
+        self.parts = [self.head]
+
+    def __len__(self):
+        return len(self.head) + self.size + len(self.tail)
+
+    def read(self, size=-1):
+        if self.parts:
+            return self.parts.pop(0)
+        if self.file is None:
+            return b""
+        chunk = self.file.read(self.piece_size if size is None or size < 0 else max(size, self.piece_size))
+        if chunk:
+            self.sha256.update(chunk)
+            if self.on_read:
+                self.on_read(len(chunk))
+            return chunk
+        self.file.close()
+        self.file = None
+        return self.tail
+
+    def close(self):
+        if self.file:
+            self.file.close()
+
+
+class Body:
+    """Reads one response body in pieces: by Content-Length, chunked, or until the server closes."""
+
+    def __init__(self, reader: asyncio.StreamReader, status: int, headers: Headers):
+        self.reader = reader
+        self.chunked = "chunked" in headers.get("transfer-encoding", "").lower()
+        # bytes left in the body (or, chunked, in the current chunk); None reads until the server closes
+        if self.chunked:
+            self.left = 0
+        elif "content-length" in headers:
+            self.left = int(headers["content-length"])
+        elif status in (204, 304) or 100 <= status < 200:
+            self.left = 0
+        else:
+            self.left = None
+        self.done = self.left == 0 and not self.chunked
+
+    async def read(self, size: int = PIECE_SIZE) -> bytes:
+        """Return up to size bytes of the body, or b"" once all of it has been read."""
+        import asyncio
+
+        if self.done:
+            return b""
+        if self.chunked and self.left == 0:
+            self.left = int((await self.reader.readline()).split(b";", 1)[0], 16)
+            if self.left == 0:
+                # skip trailers
+                while (await self.reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                self.done = True
+                return b""
+        data = await self.reader.read(size if self.left is None else min(size, self.left))
+        if self.left is None:
+            self.done = not data
+            return data
+        if not data:
+            raise asyncio.IncompleteReadError(b"", self.left)
+        self.left -= len(data)
+        if self.left == 0:
+            if self.chunked:
+                await self.reader.readexactly(2)
+            else:
+                self.done = True
+        return data
+
+    async def read_all(self) -> bytes:
+        parts = []
+        while not self.done:
+            parts.append(await self.read())
+        return b"".join(parts)
+
+
+class Connection:
+    """One HTTP/1.1 keep-alive connection."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    def closed(self) -> bool:
+        """True when the server closed the connection, e.g. while it sat idle."""
+        return self.reader.at_eof() or self.writer.is_closing()
+
+    async def send(self, netloc: str, path: str, headers: Dict[str, str], body, timeout: float):
+        """Write one POST; body is bytes or a file-like object with a length, which is sent in pieces."""
+        import asyncio
+
+        head = f"POST {path} HTTP/1.1\r\nHost: {netloc}\r\nContent-Length: {len(body)}\r\n"
+        head += "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+        if isinstance(body, (bytes, bytearray)):
+            self.writer.write(head.encode("latin-1") + b"\r\n" + body)
+            await asyncio.wait_for(self.writer.drain(), timeout)
+            return
+        self.writer.write(head.encode("latin-1") + b"\r\n")
+        while True:
+            piece = body.read(PIECE_SIZE)
+            if not piece:
+                break
+            self.writer.write(piece)
+            # a slow link gets the timeout for every piece, not for the whole upload
+            await asyncio.wait_for(self.writer.drain(), timeout)
+
+    async def read_head(self):
+        """Read the status line and headers; return (status, reason, headers, keep_alive)."""
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError("connection closed before a response")
+        version, status, reason = (status_line.decode("latin-1").rstrip("\r\n").split(" ", 2) + [""])[:3]
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip()] = value.strip()
+        headers = Headers(headers)
+        keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+        return int(status), reason, headers, keep_alive
+
+    def close(self):
+        self.writer.close()
+
+
+TRACE_LOCAL = threading.local()
+TRACE_PHASES = ("dns", "connect", "tls", "ttfb", "transfer", "backoff", "total")
+
+# a Tracer counts every call, but its percentiles and call list only cover this many recent ones
+TRACE_KEEP = 10000
+
+
+class CallTrace:
+    """Phase timings of one API call, filled in by the client while the call runs."""
+
+    def __init__(self, funcName, url):
+        self.function = funcName
+        self.url = url
+        self.phases = {}
+        self.status = None
+        self.cached = False
+        self.error = None
+        self.attempts = 0
+        self.hedged = False
+        self.hedge_won = False
+
+    def add(self, phase, seconds):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def as_dict(self):
+        return {"function": self.function, "url": self.url, "status": self.status, "cached": self.cached,
+                "error": self.error, "attempts": self.attempts, "hedged": self.hedged, "hedge_won": self.hedge_won,
+                "ms": {phase: round(value * 1000, 3) for phase, value in self.phases.items()}}
+
+
+def current_trace():
+    """The CallTrace of the call running on this thread, if tracing is on."""
+    return getattr(TRACE_LOCAL, "current", None)
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    return values[min(len(values) - 1, max(0, int(round(fraction * len(values) + 0.5)) - 1))]
+
+
+class Tracer:
+    """Collects CallTraces and summarises them per API function.
+
+    Counts are kept for every call; phase timings and the traces themselves
+    only for the last keep calls, so a long --watch or exporter run does not
+    grow without bound.
+    """
+
+    def __init__(self, keep=TRACE_KEEP):
+        self.keep = keep
+        self.calls = collections.deque(maxlen=keep)
+        self.functions = {}
+        self.lock = threading.Lock()
+
+    def start(self, funcName, url):
+        trace = CallTrace(funcName, url)
+        TRACE_LOCAL.current = trace
+        return trace
+
+    def finish(self, trace):
+        TRACE_LOCAL.current = None
+        with self.lock:
+            self.calls.append(trace)
+            entry = self.functions.get(trace.function)
+            if entry is None:
+                entry = self.functions[trace.function] = {
+                    "calls": 0, "cached": 0, "errors": 0, "retries": 0, "hedged": 0, "circuit_open": 0, "phases": {}}
+            entry["calls"] += 1
+            entry["cached"] += trace.cached
+            entry["errors"] += bool(trace.error or (trace.status or 0) >= 400)
+            entry["retries"] += max(trace.attempts - 1, 0)
+            entry["hedged"] += trace.hedged
+            entry["circuit_open"] += trace.error == "CircuitOpen"
+            for phase, seconds in trace.phases.items():
+                samples = entry["phases"].get(phase)
+                if samples is None:
+                    samples = entry["phases"][phase] = collections.deque(maxlen=self.keep)
+                samples.append(seconds * 1000)
+
+    def summary(self):
+        """Return {function: {"calls", "cached", "errors", "retries", "hedged", "circuit_open",
+        phase: {min, p50, p95, max}}} with the phases in milliseconds."""
+        summary = {}
+        with self.lock:
+            for funcName, counts in self.functions.items():
+                entry = {key: value for key, value in counts.items() if key != "phases"}
+                for phase in TRACE_PHASES:
+                    values = sorted(counts["phases"].get(phase, ()))
+                    if values:
+                        entry[phase] = {"min": round(values[0], 3), "p50": round(percentile(values, 0.5), 3),
+                                        "p95": round(percentile(values, 0.95), 3), "max": round(values[-1], 3)}
+                summary[funcName] = entry
+        return summary
+
+    def report(self, as_json=False, out=None):
+        """Print the collected timings to out, stderr by default."""
+        out = out or sys.stderr
+        if as_json:
+            print(json.dumps({"calls": [t.as_dict() for t in list(self.calls)], "summary": self.summary()}), file=out)
+            return
+        for funcName, entry in self.summary().items():
+            print(f"{funcName}: {entry['calls']} call(s), {entry['cached']} cached, {entry['errors']} failed, "
+                  f"{entry['retries']} retried, {entry['hedged']} hedged, {entry['circuit_open']} circuit-open",
+                  file=out)
+            for phase in TRACE_PHASES:
+                if phase in entry:
+                    stats = entry[phase]
+                    print(f"  {phase:<9} min {stats['min']:9.2f}  p50 {stats['p50']:9.2f}  "
+                          f"p95 {stats['p95']:9.2f}  max {stats['max']:9.2f} ms", file=out)
+
+
+class AsyncApiClient:
+    """Connection pool and per-host concurrency limit shared by every Server made from it."""
+
+    def __init__(self, limit_per_host: int = LIMIT_PER_HOST, connect_timeout: float = CONNECT_TIMEOUT,
+                 read_timeout: float = READ_TIMEOUT, ssl_context: Optional[ssl.SSLContext] = None,
+                 check_certificate: Optional[Callable[[str, bytes], Any]] = None):
+        """check_certificate(netloc, der) is called for every new TLS connection and may raise
+        ssl.SSLCertVerificationError, e.g. to pin self-signed certificates."""
+        self.limit_per_host = limit_per_host
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.ssl_context = ssl_context
+        self.check_certificate = check_certificate
+        self.idle = {}
+        self.limits = {}
+        self.num_requests = 0
+        self.num_connections = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def server(self, host: str, token: Optional[str] = None, password: Optional[str] = None,
+               privilege: str = "Administrator", on_login: Optional[Callable[[str], Any]] = None) -> "Server":
+        """Return a Server for host[:port] or an API URL, sharing this client's connections."""
+        return Server(self, api_url(host), token, password, privilege, on_login)
+
+    async def connect(self, scheme: str, netloc: str, trace=None) -> Connection:
+        import asyncio
+
+        return await asyncio.wait_for(self._connect(scheme, netloc, trace), self.connect_timeout)
+
+    async def _connect(self, scheme, netloc, trace):
+        import asyncio
+        import socket
+
+        parts = urlsplit(f"{scheme}://{netloc}")
+        port = parts.port or (443 if scheme == "https" else 80)
+        if scheme == "https" and self.ssl_context is None:
+            self.ssl_context = insecure_context()
+        context = self.ssl_context if scheme == "https" else None
+        loop = asyncio.get_running_loop()
+        # resolve, connect and handshake one after another so each step can be timed
+        start = time.perf_counter()
+        family, kind, proto, _, address = (await loop.getaddrinfo(parts.hostname, port, type=socket.SOCK_STREAM))[0]
+        resolved = time.perf_counter()
+        sock = socket.socket(family, kind, proto)
+        try:
+            sock.setblocking(False)
+            await loop.sock_connect(sock, address)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            connected = time.perf_counter()
+            reader, writer = await asyncio.open_connection(
+                sock=sock, ssl=context, server_hostname=parts.hostname if context else None)
+        except BaseException:
+            sock.close()
+            raise
+        if context is not None and self.check_certificate is not None:
+            try:
+                self.check_certificate(netloc, writer.get_extra_info("ssl_object").getpeercert(binary_form=True))
+            except BaseException:
+                writer.close()
+                raise
+        if trace is not None:
+            trace.add("dns", resolved - start)
+            trace.add("connect", connected - resolved)
+            if context is not None:
+                trace.add("tls", time.perf_counter() - connected)
+        if LOG:
+            LOG.debug("new connection to %s://%s (%s)", scheme, netloc, address[0])
+        self.num_connections += 1
+        return Connection(reader, writer)
+
+    async def call(self, url: str, function: str, data: Optional[dict] = None,
+                   token: Optional[str] = None) -> Optional[dict]:
+        """Run one API function and return the parsed response body (None when it is empty).
+
+        Raises ApiError for an error status and TransportError for network
+        errors and timeouts.
+        """
+        request = {"function": function}
+        if data:
+            request["data"] = data
+        headers = {"Content-Type": "application/json"}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        response = await self.request(url, json.dumps(request).encode(), headers, function=function)
+        if not 200 <= response.status_code < 300:
+            raise ApiError.from_response(response)
+        return response.json() if response.content else None
+
+    async def request(self, url: str, body, headers: Optional[Dict[str, str]] = None, *,
+                      function: Optional[str] = None, stream: bool = False, trace=None) -> Response:
+        """POST body (bytes, or a file-like object with a length) to url and return the Response.
+
+        function names the API function in the body, if any. A request that
+        fails on a reused connection is only sent again on a new one when the
+        function is in READ_ONLY_FUNCTIONS, since the server may already have
+        acted on it. With stream=True the body is left unread: the returned
+        AsyncResponse holds the connection until it has been read or closed.
+        trace, if given, gets add(phase, seconds) calls for dns, connect, tls,
+        ttfb and transfer.
+        """
+        import asyncio
+
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        limit = self.limits.get(key)
+        if limit is None:
+            limit = self.limits[key] = asyncio.Semaphore(self.limit_per_host)
+        await limit.acquire()
+        try:
+            return await self.send(key, parts.path or "/", headers or {}, body, function in READ_ONLY_FUNCTIONS,
+                                   stream, trace, limit.release)
+        except BaseException:
+            limit.release()
+            raise
+
+    async def idle_connection(self, key) -> Optional[Connection]:
+        """Take an idle connection to the host, skipping ones the server has closed meanwhile."""
+        import asyncio
+
+        idle = self.idle.get(key)
+        if not idle:
+            return None
+        # give the loop a turn to notice a close that has already arrived
+        await asyncio.sleep(0)
+        while idle:
+            conn = idle.pop()
+            if not conn.closed():
+                return conn
+            conn.close()
+        return None
+
+    async def send(self, key, path, headers, body, read_only, stream, trace, done):
+        import asyncio
+
+        while True:
+            conn = await self.idle_connection(key)
+            reused = conn is not None
+            try:
+                if conn is None:
+                    conn = await self.connect(*key, trace=trace)
+                sent = time.perf_counter()
+                await conn.send(key[1], path, headers, body, self.read_timeout)
+                status, reason, response_headers, keep_alive = await asyncio.wait_for(
+                    conn.read_head(), self.read_timeout)
+                received = time.perf_counter()
+                reader = Body(conn.reader, status, response_headers)
+                content = None if stream else await asyncio.wait_for(reader.read_all(), self.read_timeout)
+            except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, ValueError) as e:
+                if conn is not None:
+                    conn.close()
+                if reused and read_only and not isinstance(e, asyncio.TimeoutError):
+                    # the server closed a kept-alive connection under the call; asking again is harmless
+                    continue
+                raise TransportError.wrap(e) from e
+            except BaseException:
+                # cancelled half way through a request: the connection is in an unknown state
+                if conn is not None:
+                    conn.close()
+                raise
+            self.num_requests += 1
+            if LOG:
+                LOG.debug("POST %s://%s%s -> %d %s (%s connection)", key[0], key[1], path, status, reason,
+                          "reused" if reused else "new")
+            if trace is not None:
+                trace.add("ttfb", received - sent)
+
+            def release(finished):
+                if keep_alive and finished and reader.left is not None:
+                    self.idle.setdefault(key, []).append(conn)
+                else:
+                    conn.close()
+                done()
+
+            if stream:
+                response = AsyncResponse(status, reason, response_headers, reader, self.read_timeout, release)
+                if reader.done:
+                    response.close()
+                return response
+            if trace is not None:
+                trace.add("transfer", time.perf_counter() - received)
+            release(True)
+            return Response(status, reason, content, response_headers)
+
+    def stats(self):
+        """Return (requests, new connections, reused connections) over all hosts."""
+        return self.num_requests, self.num_connections, self.num_requests - self.num_connections
+
+    async def close(self):
+        for conns in self.idle.values():
+            for conn in conns:
+                conn.close()
+        self.idle.clear()
+
+
+class BlockingApiClient:
+    """AsyncApiClient for code that is not async, with a requests-style post().
+
+    The async client runs on an event loop in a daemon thread, started on
+    first use. Any number of threads may post at the same time; they share
+    its connections and per-host limit. cache, if given, is a ResponseCache
+    for the caller to consult, as post() does not use it itself.
+    """
+
+    def __init__(self, limit_per_host: int = LIMIT_PER_HOST, connect_timeout: float = CONNECT_TIMEOUT,
+                 read_timeout: float = READ_TIMEOUT, ssl_context: Optional[ssl.SSLContext] = None,
+                 check_certificate: Optional[Callable[[str, bytes], Any]] = None,
+                 cache: Optional[ResponseCache] = None):
+        self.client = AsyncApiClient(limit_per_host, connect_timeout, read_timeout, ssl_context, check_certificate)
+        self.cache = cache
+        self.loop = None
+        self.lock = threading.Lock()
+
+    def run(self, coroutine):
+        """Run a coroutine on the client's event loop and return its result."""
+        import asyncio
+
+        with self.lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                threading.Thread(target=self.loop.run_forever, name="satisfactory-api", daemon=True).start()
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def post(self, url: str, headers: Optional[Dict[str, str]] = None, json: Any = None, data=None,
+             stream: bool = False, trace=None) -> Response:
+        """POST json (encoded) or data (bytes, or a file-like object with a length) to url.
+
+        With stream=True the body is read through iter_content(), and the
+        response has to be read to the end or closed to free its connection.
+        """
+        headers = dict(headers or {})
+        function = None
+        if json is not None:
+            data = encode_json(json)
+            headers.setdefault("Content-Type", "application/json")
+            function = json.get("function") if isinstance(json, dict) else None
+        response = self.run(self.client.request(url, data if data is not None else b"", headers, function=function,
+                                                stream=stream, trace=trace))
+        return BlockingResponse(self, response) if stream else response
+
+    def stats(self):
+        """Return (requests, new connections, reused connections) over all hosts."""
+        return self.client.stats()
+
+    def close(self):
+        if self.loop is not None:
+            self.run(self.client.close())
+
+
+def encode_json(value) -> bytes:
+    return json.dumps(value).encode()
+
+
+class BlockingResponse(Response):
+    """A streamed response from BlockingApiClient; its body is read through the client's event loop."""
+
+    def __init__(self, client: BlockingApiClient, response: AsyncResponse):
+        super().__init__(response.status_code, response.reason, None, response.headers)
+        self.client = client
+        self.response = response
+
+    @property
+    def content(self) -> bytes:
+        if self._content is None:
+            self._content = self.client.run(self.response.read_all())
+        return self._content
+
+    def iter_content(self, size: int = PIECE_SIZE):
+        if self._content is not None:
+            yield from super().iter_content(size)
+            return
+        while True:
+            data = self.client.run(self.response.read(size))
+            if not data:
+                return
+            yield data
+
+    def close(self):
+        async def close():
+            self.response.close()
+
+        if self.response.release is not None:
+            self.client.run(close())
+
+
+class Server:
+    """The API of one server, with a method per API function.
+
+    With a password, a missing token is fetched with PasswordLogin before the
+    first call and a rejected one is replaced once; on_login is called with
+    every new token, e.g. to store it.
+    """
+
+    def __init__(self, client: AsyncApiClient, url: str, token: Optional[str] = None, password: Optional[str] = None,
+                 privilege: str = "Administrator", on_login: Optional[Callable[[str], Any]] = None):
+        self.client = client
+        self.url = url
+        self.token = token
+        self.password = password
+        self.privilege = privilege
+        self.on_login = on_login
+        self.login_lock = None
+
+    async def call(self, function: str, data: Optional[dict] = None) -> Optional[dict]:
+        """Run any API function and return the "data" member of its response."""
+        if function not in LOGIN_FUNCTIONS and not self.token and self.password:
+            await self.login(None)
+        try:
+            result = await self.client.call(self.url, function, data, self.token)
+        except ApiError as e:
+            if e.status != 401 or function in LOGIN_FUNCTIONS or not self.password:
+                raise
+            await self.login(self.token)
+            result = await self.client.call(self.url, function, data, self.token)
+        return result.get("data") if isinstance(result, dict) else result
+
+    async def open(self, function: str, data: Optional[dict] = None, body=None,
+                   headers: Optional[Dict[str, str]] = None) -> AsyncResponse:
+        """Start a call whose response body is streamed, logging in like call() does.
+
+        body replaces the JSON request, e.g. with a MultipartBody. Raises
+        ApiError for an error status; otherwise the caller reads and closes
+        the returned AsyncResponse.
+        """
+        if not self.token and self.password:
+            await self.login(None)
+        for attempt in range(2):
+            request_headers = dict(headers or {})
+            if body is None:
+                request = {"function": function, "data": data or {}}
+                payload = encode_json(request)
+                request_headers["Content-Type"] = "application/json"
+            else:
+                payload = body
+            if self.token:
+                request_headers["Authorization"] = f"Bearer {self.token}"
+            response = await self.client.request(self.url, payload, request_headers, function=function, stream=True)
+            if 200 <= response.status_code < 300:
+                return response
+            await response.read_all()
+            if response.status_code == 401 and attempt == 0 and self.password and body is None:
+                await self.login(self.token)
+                continue
+            raise ApiError.from_response(response)
+
+    async def login(self, rejected: Optional[str]):
+        import asyncio
+
+        if self.login_lock is None:
+            self.login_lock = asyncio.Lock()
+        async with self.login_lock:
+            # another call may have logged in again while this one waited
+            if self.token and self.token != rejected:
+                return
+            await self.password_login(self.password, self.privilege)
+
+    # authentication
+
+    async def password_login(self, password: str, privilege: str = "Administrator") -> str:
+        data = await self.call("PasswordLogin", {"Password": password, "MinimumPrivilegeLevel": privilege})
+        self.token = data["authenticationToken"]
+        if self.on_login:
+            self.on_login(self.token)
+        return self.token
+
+    async def passwordless_login(self, privilege: str = "Client") -> str:
+        data = await self.call("PasswordlessLogin", {"MinimumPrivilegeLevel": privilege})
+        self.token = data["authenticationToken"]
+        if self.on_login:
+            self.on_login(self.token)
+        return self.token
+
+    async def verify_authentication_token(self) -> bool:
+        try:
+            await self.call("VerifyAuthenticationToken")
+        except ApiError as e:
+            if e.status == 401:
+                return False
+            raise
+        return True
+
+    # queries
+
+    async def health_check(self, client_custom_data: str = "") -> dict:
+        return await self.call("HealthCheck", {"ClientCustomData": client_custom_data})
+
+    async def query_server_state(self) -> dict:
+        return await self.call("QueryServerState")
+
+    async def get_server_options(self) -> dict:
+        return await self.call("GetServerOptions")
+
+    async def get_advanced_game_settings(self) -> dict:
+        return await self.call("GetAdvancedGameSettings")
+
+    async def enumerate_sessions(self) -> dict:
+        return await self.call("EnumerateSessions")
+
+    async def stream_sessions(self) -> AsyncResponse:
+        """Start EnumerateSessions with the body left unread, e.g. to feed a SessionStream piece by piece."""
+        return await self.open("EnumerateSessions")
+
+    # save files
+
+    async def download_save_game(self, save_name: str, offset: int = 0) -> AsyncResponse:
+        """Start downloading a save; read() the returned response in pieces.
+
+        With an offset only the rest of the file is asked for, which the server
+        answers with 206, or with 200 and the whole file.
+        """
+        headers = {"Range": f"bytes={offset}-"} if offset else None
+        return await self.open("DownloadSaveGame", {"SaveName": save_name}, headers=headers)
+
+    async def upload_save_game(self, save_name: str, path: str, load: bool = False,
+                               enable_advanced_game_settings: bool = False) -> str:
+        """Upload a save file without reading it into memory at once and return its sha256."""
+        request = {"function": "UploadSaveGame", "data": {"SaveName": save_name, "LoadSaveGame": load,
+                                                           "EnableAdvancedGameSettings": enable_advanced_game_settings}}
+        body = MultipartBody(request, path)
+        try:
+            response = await self.open("UploadSaveGame", body=body, headers={"Content-Type": body.content_type})
+            await response.read_all()
+        finally:
+            body.close()
+        return body.sha256.hexdigest()
+
+    # changes
+
+    async def apply_server_options(self, options: Dict[str, str]) -> None:
+        await self.call("ApplyServerOptions", {"UpdatedServerOptions": options})
+
+    async def apply_advanced_game_settings(self, settings: Dict[str, str]) -> None:
+        await self.call("ApplyAdvancedGameSettings", {"AppliedAdvancedGameSettings": settings})
+
+    async def rename_server(self, name: str) -> None:
+        await self.call("RenameServer", {"ServerName": name})
+
+    async def set_client_password(self, password: str) -> None:
+        await self.call("SetClientPassword", {"Password": password})
+
+    async def set_admin_password(self, password: str, token: str) -> None:
+        await self.call("SetAdminPassword", {"Password": password, "AuthenticationToken": token})
+
+    async def set_auto_load_session_name(self, session_name: str) -> None:
+        await self.call("SetAutoLoadSessionName", {"SessionName": session_name})
+
+    async def run_command(self, command: str) -> dict:
+        return await self.call("RunCommand", {"Command": command})
+
+    async def shutdown(self) -> None:
+        await self.call("Shutdown")
+
+    async def save_game(self, save_name: str) -> None:
+        await self.call("SaveGame", {"SaveName": save_name})
+
+    async def load_game(self, save_name: str, enable_advanced_game_settings: bool = False) -> None:
+        await self.call("LoadGame", {"SaveName": save_name, "EnableAdvancedGameSettings": enable_advanced_game_settings})
+
+    async def delete_save_file(self, save_name: str) -> None:
+        await self.call("DeleteSaveFile", {"SaveName": save_name})
+
+    async def delete_save_session(self, session_name: str) -> None:
+        await self.call("DeleteSaveSession", {"SessionName": session_name})
+
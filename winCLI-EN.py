@@ -1,37 +1,93 @@
 #!/usr/bin/env python3
+import atexit
 import click
-import requests
-from requests.auth import HTTPBasicAuth
+import codecs
 import json
-import warnings
-import logging
 import configparser
 import os
+import sys
+import shutil
 import platform
+import time
+import random
+import re
+import threading
 
-from requests.packages import urllib3
-
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-
-logging.basicConfig()
-logging.getLogger().setLevel(logging.DEBUG)
-requests_log = logging.getLogger("requests.packages.urllib3")
-requests_log.setLevel(logging.DEBUG)
-requests_log.propagate = True
+from satisfactory_api import (READ_ONLY_FUNCTIONS, BlockingApiClient, CachedResponse, ResponseCache, SessionStream,
+                              Tracer, TransportError, api_url)
 
 CONFIGFILE = os.path.join(os.environ['APPDATA'], 'satisfactory-cli.ini')
+CACHEDIR = os.path.join(os.environ['APPDATA'], 'satisfactory-cli-cache')
 
 # Global variable for server URL
 SERVER_URL = None
 
+# Connection settings for the shared client, overridable from the command line
+POOL_SIZE = 4
+CONNECT_TIMEOUT = 5.0
+READ_TIMEOUT = 30.0
+
+# One client per process, created on first use by get_client()
+CLIENT = None
+
+# Collects per-call timings when --trace is given
+TRACER = None
+
+# Read-only calls are retried after a network error or a busy server; the n-th retry
+# waits a random time of up to RETRY_BACKOFF * 2**n seconds
+RETRIES = 2
+RETRY_BACKOFF = 0.5
+RETRY_STATUSES = {429, 502, 503, 504}
+
+# Privilege the menu logs in with; its token is stored under this name in the host's section
+PRIVILEGE = "Administrator"
+
+
+def get_client():
+    global CLIENT
+    if CLIENT is None:
+        CLIENT = BlockingApiClient()
+    return CLIENT
+
+
+def enable_debug_logging():
+    """Log every request and every new connection to stderr."""
+    import logging
+    import satisfactory_api
+
+    satisfactory_api.enable_debug_logging()
+    logging.getLogger().setLevel(logging.DEBUG)
+
+
+# Set by cli(): whether the console understands ANSI escape sequences
+ANSI = False
+
+
+def enable_ansi():
+    """Turn on ANSI escape sequences in the Windows console (Windows 10 and later)."""
+    if platform.system() != 'Windows':
+        return True
+    import ctypes
+
+    kernel32 = ctypes.windll.kernel32
+    handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+    mode = ctypes.c_uint32()
+    if not kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+        return False
+    return bool(kernel32.SetConsoleMode(handle, mode.value | 0x0004))  # ENABLE_VIRTUAL_TERMINAL_PROCESSING
+
 
 def clear_screen():
-    os.system('cls' if platform.system() == 'Windows' else 'clear')
+    if ANSI:
+        sys.stdout.write("\x1b[H\x1b[2J\x1b[3J")
+        sys.stdout.flush()
+    else:
+        os.system('cls' if platform.system() == 'Windows' else 'clear')
 
 
 def authenticate(password):
     """Authenticate to the server and obtain a Bearer token."""
-    response = send_command(None, "PasswordLogin", {"Password": password, "MinimumPrivilegeLevel": "Administrator"})
+    response = send_command(None, "PasswordLogin", {"Password": password, "MinimumPrivilegeLevel": PRIVILEGE})
     if response:
         token_data = response.json()
         return token_data.get("data").get('authenticationToken')
@@ -98,46 +154,63 @@ def get_server_status(token):
         click.echo("\nStatus query completed.")
 
 
+def response_chunks(response, size=64 * 1024):
+    """Iterate over a response body without reading it all at once."""
+    if hasattr(response, "iter_content"):
+        return response.iter_content(size)
+    return [response.text.encode()]
+
+
 def enumerate_sessions(token):
     """List available sessions."""
-    response = send_command(token, "EnumerateSessions")
+    response = send_command(token, "EnumerateSessions", stream=True)
     if response:
-        sessions_data = response.json().get("data", {}).get("sessions", [])
-        current_session_index = response.json().get("data", {}).get("currentSessionIndex", None)
-
-        if not sessions_data:
-            click.echo("No available sessions.")
-            return
-
-        click.echo("Available Sessions:\n")
-        for idx, session in enumerate(sessions_data):
-            session_name = session.get("sessionName", "Unknown session")
-            click.echo(f"Session {idx + 1}: {session_name}")
-
-            save_headers = session.get("saveHeaders", [])
-            if not save_headers:
-                click.echo("  No saves for this session.")
-            else:
+        stream = SessionStream(response_chunks(response))
+        found = False
+        unmarked = set()
+        try:
+            for idx, session in enumerate(stream):
+                if not found:
+                    click.echo("Available Sessions:\n")
+                    found = True
+
+                session_name = session.get("sessionName", "Unknown session")
+                lines = [f"Session {idx + 1}: {session_name}"]
+
+                save_headers = session.get("saveHeaders", [])
+                if not save_headers:
+                    lines.append("  No saves for this session.")
                 for save_idx, save in enumerate(save_headers):
                     save_name = save.get("saveName", "Unknown save")
                     save_version = save.get("saveVersion", "Unknown version")
-                    build_version = save.get("buildVersion", "Unknown version")
-                    map_name = save.get("mapName", "Unknown map")
                     play_duration = save.get("playDurationSeconds", 0)
                     save_time = save.get("saveDateTime", "Unknown date")
-                    is_modded = "Yes" if save.get("isModdedSave", False) else "No"
 
                     hours, remainder = divmod(play_duration, 3600)
                     minutes, seconds = divmod(remainder, 60)
 
-                    click.echo(f"  Save {save_idx + 1}: {save_name}")
-                    click.echo(f"    Save version: {save_version}")
-                    click.echo(f"    Play time: {hours}h {minutes}m {seconds}s")
-                    click.echo(f"    Save date: {save_time}")
-            
-            if idx == current_session_index:
-                click.echo(f"  * This is the current active session.")
+                    lines.append(f"  Save {save_idx + 1}: {save_name}")
+                    lines.append(f"    Save version: {save_version}")
+                    lines.append(f"    Play time: {hours}h {minutes}m {seconds}s")
+                    lines.append(f"    Save date: {save_time}")
+
+                if stream.current_index is None:
+                    unmarked.add(idx)
+                elif idx == stream.current_index:
+                    lines.append("  * This is the current active session.")
+                # One write per session instead of one per field
+                click.echo("\n".join(lines))
+        except TransportError as e:
+            click.echo(f"\nThe session list was cut off: {e}")
+            return
+
+        if not found:
+            click.echo("No available sessions.")
+            return
 
+        # The server sent currentSessionIndex after the sessions
+        if stream.current_index in unmarked:
+            click.echo(f"\n* Session {stream.current_index + 1} is the current active session.")
         click.echo("\nEnumeration completed.")
 
 
@@ -154,11 +227,93 @@ def read_config():
 
 
 def save_config(config):
-    with open(CONFIGFILE, "w+") as f:
+    """Write the config to a temporary file and rename it over the old one."""
+    os.makedirs(os.path.dirname(CONFIGFILE), exist_ok=True)
+    tmp = f"{CONFIGFILE}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
         config.write(f)
+    os.replace(tmp, CONFIGFILE)
+
+
+class ConfigLock:
+    """Exclusive lock on the config file so concurrent invocations don't lose each other's writes."""
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(CONFIGFILE), exist_ok=True)
+        self.file = open(f"{CONFIGFILE}.lock", "a")
+        if platform.system() == "Windows":
+            import msvcrt
+            self.file.seek(0)
+            # LK_LOCK retries for about ten seconds before giving up
+            msvcrt.locking(self.file.fileno(), msvcrt.LK_LOCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(self.file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if platform.system() == "Windows":
+            import msvcrt
+            self.file.seek(0)
+            msvcrt.locking(self.file.fileno(), msvcrt.LK_UNLCK, 1)
+        self.file.close()
+
+
+def update_config(change):
+    """Re-read the config under the lock, apply change(config) and save it."""
+    with ConfigLock():
+        config = read_config()
+        change(config)
+        save_config(config)
+
+
+def token_section():
+    from urllib.parse import urlsplit
+
+    return f"host {urlsplit(SERVER_URL).netloc}"
+
+
+def stored_token(config):
+    """Return the token stored for this host and privilege, falling back to the old '[server] token'."""
+    token = config.get(token_section(), PRIVILEGE.lower(), fallback="")
+    return token or config.get("server", "token", fallback="")
 
 
-def send_command(token, funcName, data=None):
+def store_token(token):
+    """Save token in the host's section, the same place cli.py keeps it."""
+    section, key, now = token_section(), PRIVILEGE.lower(), str(time.time())
+
+    def change(config):
+        if not config.has_section(section):
+            config.add_section(section)
+        config.set(section, key, token)
+        config.set(section, f"{key}.verified", now)
+
+    update_config(change)
+
+
+def send_command(token, funcName, data=None, stream=False):
+    """Send one API call, printing its outcome. With --trace its timings are recorded."""
+    if TRACER is None:
+        return _send_command(token, funcName, data, stream, None)
+
+    trace = TRACER.start(funcName, SERVER_URL)
+    start = time.perf_counter()
+    try:
+        response = _send_command(token, funcName, data, stream, trace)
+        if isinstance(response, CachedResponse):
+            trace.cached = True
+            trace.status = response.status_code
+        return response
+    except TransportError as e:
+        trace.error = e.kind
+        raise
+    finally:
+        trace.add("total", time.perf_counter() - start)
+        TRACER.finish(trace)
+
+
+def _send_command(token, funcName, data, stream, trace):
     try:
         headers = {}
         if token:
@@ -172,8 +327,36 @@ def send_command(token, funcName, data=None):
         if data:
             jsonreq["data"] = data
 
-        response = requests.post(SERVER_URL, headers=headers, verify=False, json=jsonreq)
-
+        client = get_client()
+        if client.cache:
+            cached = client.cache.lookup(SERVER_URL, funcName, data)
+            if cached:
+                click.echo(f"Command executed successfully: {cached.status_code} (cached {cached.age:.0f}s ago)")
+                return cached
+
+        retries = RETRIES if funcName in READ_ONLY_FUNCTIONS else 0
+        for attempt in range(retries + 1):
+            if trace is not None:
+                trace.attempts = attempt + 1
+            try:
+                response = client.post(SERVER_URL, headers=headers, json=jsonreq, stream=stream, trace=trace)
+            except TransportError:
+                if attempt == retries:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == retries:
+                    break
+                response.close()
+            delay = random.uniform(0, RETRY_BACKOFF * 2 ** attempt)
+            click.echo(f"Server did not answer, retrying in {delay:.1f}s...")
+            if trace is not None:
+                trace.add("backoff", delay)
+            time.sleep(delay)
+        if client.cache and not stream:
+            client.cache.record(SERVER_URL, funcName, data, response)
+
+        if trace is not None:
+            trace.status = response.status_code
         if response.status_code >= 200 and response.status_code < 300:
             click.echo(f"Command executed successfully: {response.status_code}")
             return response
@@ -181,11 +364,212 @@ def send_command(token, funcName, data=None):
             click.echo(f"Failed to execute command: {response.status_code} {response.reason}")
             click.echo(response.text)
             return None
-    except requests.exceptions.RequestException as e:
+    except TransportError as e:
         click.echo(f"An error occurred: {e}")
         raise e
 
 
+class Dashboard:
+    """Server status and sessions kept fresh by a background thread for the live dashboard.
+
+    Status is fetched every `interval` seconds and the session list every
+    `sessions_interval` seconds, straight from the server (not from the
+    cache). The UI thread only reads the latest results.
+    """
+
+    def __init__(self, token, interval=2.0, sessions_interval=30.0):
+        self.token = token
+        self.interval = interval
+        self.sessions_interval = sessions_interval
+        self.lock = threading.Lock()
+        self.results = {}
+        self.updated = {}
+        self.latency = {}
+        self.error = None
+        self.wake = threading.Event()
+        self.stopped = threading.Event()
+        self.next_sessions = 0.0
+
+    def fetch(self, funcName):
+        start = time.perf_counter()
+        response = get_client().post(SERVER_URL, headers={'Authorization': f'Bearer {self.token}'},
+                                     json={"function": funcName})
+        latency = time.perf_counter() - start
+        if not 200 <= response.status_code < 300:
+            raise ValueError(f"{funcName}: {response.status_code} {response.reason}")
+        data = response.json().get("data", {})
+        with self.lock:
+            self.results[funcName] = data
+            self.updated[funcName] = time.monotonic()
+            self.latency[funcName] = latency
+
+    def run(self):
+        while not self.stopped.is_set():
+            try:
+                self.fetch("QueryServerState")
+                if time.monotonic() >= self.next_sessions:
+                    self.fetch("EnumerateSessions")
+                    self.next_sessions = time.monotonic() + self.sessions_interval
+                self.error = None
+            except (TransportError, ValueError) as e:
+                self.error = str(e)
+            self.wake.wait(self.interval)
+            self.wake.clear()
+
+    def refresh(self):
+        """Fetch status and sessions now instead of at the next interval."""
+        self.next_sessions = 0.0
+        self.wake.set()
+
+    def stop(self):
+        self.stopped.set()
+        self.wake.set()
+
+    def age(self, funcName):
+        if funcName not in self.updated:
+            return "waiting for the first answer"
+        return (f"updated {time.monotonic() - self.updated[funcName]:.0f}s ago, "
+                f"latency {self.latency[funcName] * 1000:.0f} ms")
+
+    def lines(self):
+        """The dashboard as a list of screen lines."""
+        with self.lock:
+            state = self.results.get("QueryServerState", {}).get("serverGameState", {})
+            sessions = self.results.get("EnumerateSessions", {}).get("sessions", [])
+            lines = [f"Live dashboard: {SERVER_URL}", "[r] refresh now   [q] back to the menu", "",
+                     f"Server status ({self.age('QueryServerState')})"]
+            if state:
+                hours, remainder = divmod(state.get('totalGameDuration', 0), 3600)
+                lines += [
+                    f"  Active session: {state.get('activeSessionName', 'No active session')}",
+                    f"  Connected players: {state.get('numConnectedPlayers', 0)} of {state.get('playerLimit', 'unknown')}",
+                    f"  Tech tier: {state.get('techTier', 'unknown')}",
+                    f"  Average tick rate: {state.get('averageTickRate', 'unknown')} FPS",
+                    f"  Game running: {'Yes' if state.get('isGameRunning') else 'No'}, "
+                    f"paused: {'Yes' if state.get('isGamePaused') else 'No'}",
+                    f"  Total game duration: {hours}h {remainder // 60}m",
+                ]
+            lines += ["", f"Sessions ({self.age('EnumerateSessions')})"]
+            for session in sessions:
+                saves = session.get("saveHeaders", [])
+                latest = max(saves, key=lambda save: save.get("saveDateTime", ""), default={})
+                lines.append(f"  {session.get('sessionName', 'Unknown session')}: {len(saves)} saves, "
+                             f"latest {latest.get('saveName', '-')} ({latest.get('saveDateTime', '-')})")
+            if self.error:
+                lines += ["", f"Last refresh failed: {self.error}"]
+        return lines
+
+
+# Seconds to wait for the rest of an escape sequence after an Esc byte; terminals send
+# arrow and function keys as one burst, so a lone Esc is a real Esc key press
+ESCAPE_WAIT = 0.05
+# one key of terminal input: a CSI or SS3 sequence, Alt+key, or a lone Esc
+ESCAPE_SEQUENCE = re.compile(r"\x1b(?:\[[0-?]*[ -/]*[@-~]|O.|.)?", re.S)
+
+
+class KeyReader:
+    """Single key presses without waiting for Enter: msvcrt on Windows, cbreak mode elsewhere."""
+
+    def __enter__(self):
+        self.saved = None
+        self.pending = ""
+        if platform.system() != 'Windows' and sys.stdin.isatty():
+            import termios
+            import tty
+
+            self.saved = termios.tcgetattr(sys.stdin)
+            tty.setcbreak(sys.stdin)
+            self.decoder = codecs.getincrementaldecoder(sys.stdin.encoding or "utf-8")("replace")
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.saved is not None:
+            import termios
+
+            termios.tcsetattr(sys.stdin, termios.TCSADRAIN, self.saved)
+
+    def get(self, timeout):
+        """Return the key pressed within timeout seconds, or None.
+
+        Arrow and function keys are returned whole, as one string, so only a
+        bare Esc press is '\x1b'.
+        """
+        if platform.system() == 'Windows':
+            import msvcrt
+
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
+                if msvcrt.kbhit():
+                    key = msvcrt.getwch()
+                        # arrow and function keys come as a prefix and a scan code
+                    return key + msvcrt.getwch() if key in ('\x00', '\xe0') else key
+                time.sleep(0.02)
+            return None
+        import select
+
+        if not self.pending:
+            ready, _, _ = select.select([sys.stdin], [], [], timeout)
+            if not ready:
+                return None
+            self.pending = self.read()
+            if not self.pending:
+                # an empty read means stdin was closed, which ends the dashboard like q
+                return 'q'
+        if self.pending == '\x1b':
+            # an Esc on its own, or the first byte of a sequence whose rest is on its way
+            if select.select([sys.stdin], [], [], ESCAPE_WAIT)[0]:
+                self.pending += self.read()
+        size = ESCAPE_SEQUENCE.match(self.pending).end() if self.pending.startswith('\x1b') else 1
+        key, self.pending = self.pending[:size], self.pending[size:]
+        return key
+
+    def read(self):
+        """Read what is waiting on stdin, bypassing Python's buffer so select() stays accurate."""
+        if self.saved is None:
+            return sys.stdin.read(1)
+        return self.decoder.decode(os.read(sys.stdin.fileno(), 64))
+
+def redraw(shown, lines):
+    """Rewrite only the screen lines that differ from what is shown."""
+    width = shutil.get_terminal_size().columns - 1
+    lines = [line[:width] for line in lines]
+    out = []
+    for row, line in enumerate(lines):
+        if row >= len(shown) or shown[row] != line:
+            out.append(f"\x1b[{row + 1};1H{line}\x1b[K")
+    for row in range(len(lines), len(shown)):
+        out.append(f"\x1b[{row + 1};1H\x1b[K")
+    if out:
+        sys.stdout.write("".join(out))
+        sys.stdout.flush()
+    return lines
+
+
+def live_dashboard(token, interval):
+    """Show status and sessions, refreshed in the background, until q is pressed."""
+    if not ANSI:
+        click.echo("This console cannot show the live dashboard.")
+        return
+    dashboard = Dashboard(token, interval)
+    threading.Thread(target=dashboard.run, daemon=True).start()
+    shown = []
+    # hide the cursor while drawing
+    sys.stdout.write("\x1b[?25l\x1b[H\x1b[2J")
+    try:
+        with KeyReader() as keys:
+            while True:
+                shown = redraw(shown, dashboard.lines())
+                key = keys.get(0.25)
+                if key in ('q', 'Q', '\x1b'):
+                    break
+                if key in ('r', 'R'):
+                    dashboard.refresh()
+    finally:
+        dashboard.stop()
+        sys.stdout.write("\x1b[?25h")
+        clear_screen()
+
+
 def display_menu():
     """Display menu for command selection."""
     click.echo("\nSelect a command:")
@@ -194,21 +578,39 @@ def display_menu():
     click.echo("3. Shut down server")
     click.echo("4. List sessions")
     click.echo("5. Show server options")
-    click.echo("6. Exit\n")
+    click.echo("6. Exit")
+    click.echo("7. Live dashboard\n")
 
 
 @click.command()
 @click.option('--host', 'host', default="localhost:7777", help='Host:port to connect to')
 @click.option('--password', hide_input=True, help='Password for server authentication.')
-@click.option('--command', type=click.Choice(['status', 'save', 'shutdown', 'sessions', 'options'], case_sensitive=False), help='Execute a specific command.')
+@click.option('--command', type=click.Choice(['status', 'save', 'shutdown', 'sessions', 'options', 'dashboard'], case_sensitive=False), help='Execute a specific command.')
 @click.option('--save_name', default=None, help='Save name for the "save" command.')
-def cli(host, password, command, save_name):
+@click.option('--pool-size', default=POOL_SIZE, show_default=True, help='Keep-alive connections kept per host.')
+@click.option('--connect-timeout', default=CONNECT_TIMEOUT, show_default=True, help='Seconds to wait for a connection.')
+@click.option('--read-timeout', default=READ_TIMEOUT, show_default=True, help='Seconds to wait for a response.')
+@click.option('--no-cache', is_flag=True, help='Always ask the server instead of using cached responses.')
+@click.option('--retries', default=RETRIES, show_default=True, help='Retries for read-only calls after a network error or a busy server.')
+@click.option('--refresh-interval', default=2.0, show_default=True, help='Seconds between dashboard refreshes.')
+@click.option('--debug', is_flag=True, help='Log every HTTP request to stderr.')
+@click.option('--trace', is_flag=True, help="Print each API function's call timings to stderr on exit.")
+def cli(host, password, command, save_name, pool_size, connect_timeout, read_timeout, no_cache, retries, refresh_interval, debug, trace):
     """CLI tool for server authentication and interaction with the Satisfactory dedicated server API."""
-    global SERVER_URL  # We need to use the global variable
-    SERVER_URL = f'https://{host}/api/v1'  # Update the global SERVER_URL variable
+    global SERVER_URL, CLIENT, TRACER, RETRIES, ANSI  # We need to use the global variable
+    SERVER_URL = api_url(host)  # Update the global SERVER_URL variable
+    RETRIES = retries
+    ANSI = enable_ansi()
+    if debug:
+        enable_debug_logging()
+    if trace:
+        TRACER = Tracer()
+        atexit.register(TRACER.report)
+    CLIENT = BlockingApiClient(pool_size, connect_timeout, read_timeout,
+                               cache=ResponseCache(CACHEDIR, enabled=not no_cache))
 
     config = read_config()
-    token = config.get("server", "token")
+    token = stored_token(config)
 
     if not token:
         # If no token is present, prompt for password
@@ -217,8 +619,7 @@ def cli(host, password, command, save_name):
         click.echo("Authenticating...")
         token = authenticate(password)
         if token:
-            config['server']['token'] = token
-            save_config(config)
+            store_token(token)
         else:
             click.echo("Authentication failed.")
             return
@@ -238,6 +639,8 @@ def cli(host, password, command, save_name):
             enumerate_sessions(token)
         elif command == 'options':
             get_server_options(token)
+        elif command == 'dashboard':
+            live_dashboard(token, refresh_interval)
     else:
         # Enter interactive menu
         while True:
@@ -246,23 +649,30 @@ def cli(host, password, command, save_name):
 
             clear_screen()
 
-            if choice == 1:
-                get_server_status(token)
-            elif choice == 2:
-                save_name = click.prompt("Enter a save name")
-                save_game(token, save_name)
-            elif choice == 3:
-                if click.confirm("Are you sure you want to shut down the server?", default=False):
-                    shutdown_server(token)
-            elif choice == 4:
-                enumerate_sessions(token)
-            elif choice == 5:
-                get_server_options(token)
-            elif choice == 6:
-                click.echo("Exiting the program.")
-                break
-            else:
-                click.echo("Invalid choice, please try again.")
+            try:
+                if choice == 1:
+                    get_server_status(token)
+                elif choice == 2:
+                    save_name = click.prompt("Enter a save name")
+                    save_game(token, save_name)
+                elif choice == 3:
+                    if click.confirm("Are you sure you want to shut down the server?", default=False):
+                        shutdown_server(token)
+                elif choice == 4:
+                    enumerate_sessions(token)
+                elif choice == 5:
+                    get_server_options(token)
+                elif choice == 6:
+                    click.echo("Exiting the program.")
+                    num_requests, num_connections, reused = CLIENT.stats()
+                    click.echo(f"Connections: {num_requests} requests, {num_connections} opened, {reused} reused")
+                    break
+                elif choice == 7:
+                    live_dashboard(token, refresh_interval)
+                else:
+                    click.echo("Invalid choice, please try again.")
+            except TransportError:
+                click.echo("The server could not be reached, try again.")
 
 
 if __name__ == '__main__':
@@ -1,37 +1,93 @@
 #!/usr/bin/env python3
+import atexit
 import click
-import requests
-from requests.auth import HTTPBasicAuth
+import codecs
 import json
-import warnings
-import logging
 import configparser
 import os
+import sys
+import shutil
 import platform
+import time
+import random
+import re
+import threading
 
-from requests.packages import urllib3
-
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-
-logging.basicConfig()
-logging.getLogger().setLevel(logging.DEBUG)
-requests_log = logging.getLogger("requests.packages.urllib3")
-requests_log.setLevel(logging.DEBUG)
-requests_log.propagate = True
+from satisfactory_api import (READ_ONLY_FUNCTIONS, BlockingApiClient, CachedResponse, ResponseCache, SessionStream,
+                              Tracer, TransportError, api_url)
 
 CONFIGFILE = os.path.join(os.environ['APPDATA'], 'satisfactory-cli.ini')
+CACHEDIR = os.path.join(os.environ['APPDATA'], 'satisfactory-cli-cache')
 
 # Глобальная переменная для URL сервера
 SERVER_URL = None
 
+# Параметры соединения общего клиента, можно переопределить из командной строки
+POOL_SIZE = 4
+CONNECT_TIMEOUT = 5.0
+READ_TIMEOUT = 30.0
+
+# Один клиент на процесс, создается при первом вызове get_client()
+CLIENT = None
+
+# Собирает тайминги вызовов, если задан --trace
+TRACER = None
+
+# Вызовы только для чтения повторяются после сетевой ошибки или занятого сервера;
+# n-я попытка ждет случайное время до RETRY_BACKOFF * 2**n секунд
+RETRIES = 2
+RETRY_BACKOFF = 0.5
+RETRY_STATUSES = {429, 502, 503, 504}
+
+# Уровень привилегий, с которым входит меню; токен хранится под этим именем в секции хоста
+PRIVILEGE = "Administrator"
+
+
+def get_client():
+    global CLIENT
+    if CLIENT is None:
+        CLIENT = BlockingApiClient()
+    return CLIENT
+
+
+def enable_debug_logging():
+    """Писать каждый HTTP-запрос и каждое новое соединение в stderr."""
+    import logging
+    import satisfactory_api
+
+    satisfactory_api.enable_debug_logging()
+    logging.getLogger().setLevel(logging.DEBUG)
+
+
+# Устанавливается в cli(): понимает ли консоль ANSI-последовательности
+ANSI = False
+
+
+def enable_ansi():
+    """Включить ANSI-последовательности в консоли Windows (Windows 10 и новее)."""
+    if platform.system() != 'Windows':
+        return True
+    import ctypes
+
+    kernel32 = ctypes.windll.kernel32
+    handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+    mode = ctypes.c_uint32()
+    if not kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+        return False
+    return bool(kernel32.SetConsoleMode(handle, mode.value | 0x0004))  # ENABLE_VIRTUAL_TERMINAL_PROCESSING
+
 
 def clear_screen():
-    os.system('cls' if platform.system() == 'Windows' else 'clear')
+    if ANSI:
+        sys.stdout.write("\x1b[H\x1b[2J\x1b[3J")
+        sys.stdout.flush()
+    else:
+        os.system('cls' if platform.system() == 'Windows' else 'clear')
 
 
 def authenticate(password):
     """Аутентификация на сервере и получение токена Bearer."""
-    response = send_command(None, "PasswordLogin", {"Password": password, "MinimumPrivilegeLevel": "Administrator"})
+    response = send_command(None, "PasswordLogin", {"Password": password, "MinimumPrivilegeLevel": PRIVILEGE})
     if response:
         token_data = response.json()
         return token_data.get("data").get('authenticationToken')
@@ -98,46 +154,63 @@ def get_server_status(token):
         click.echo("\nЗапрос статуса завершен.")
 
 
+def response_chunks(response, size=64 * 1024):
+    """Перебрать тело ответа частями, не читая его целиком."""
+    if hasattr(response, "iter_content"):
+        return response.iter_content(size)
+    return [response.text.encode()]
+
+
 def enumerate_sessions(token):
     """Перечислить сессии."""
-    response = send_command(token, "EnumerateSessions")
+    response = send_command(token, "EnumerateSessions", stream=True)
     if response:
-        sessions_data = response.json().get("data", {}).get("sessions", [])
-        current_session_index = response.json().get("data", {}).get("currentSessionIndex", None)
-
-        if not sessions_data:
-            click.echo("Доступных сессий нет.")
-            return
-
-        click.echo("Доступные сессии:\n")
-        for idx, session in enumerate(sessions_data):
-            session_name = session.get("sessionName", "Неизвестная сессия")
-            click.echo(f"Сессия {idx + 1}: {session_name}")
-
-            save_headers = session.get("saveHeaders", [])
-            if not save_headers:
-                click.echo("  Сохранений для этой сессии нет.")
-            else:
+        stream = SessionStream(response_chunks(response))
+        found = False
+        unmarked = set()
+        try:
+            for idx, session in enumerate(stream):
+                if not found:
+                    click.echo("Доступные сессии:\n")
+                    found = True
+
+                session_name = session.get("sessionName", "Неизвестная сессия")
+                lines = [f"Сессия {idx + 1}: {session_name}"]
+
+                save_headers = session.get("saveHeaders", [])
+                if not save_headers:
+                    lines.append("  Сохранений для этой сессии нет.")
                 for save_idx, save in enumerate(save_headers):
                     save_name = save.get("saveName", "Неизвестное сохранение")
                     save_version = save.get("saveVersion", "Неизвестная версия")
-                    build_version = save.get("buildVersion", "Неизвестная версия")
-                    map_name = save.get("mapName", "Неизвестная карта")
                     play_duration = save.get("playDurationSeconds", 0)
                     save_time = save.get("saveDateTime", "Неизвестная дата")
-                    is_modded = "Да" if save.get("isModdedSave", False) else "Нет"
 
                     hours, remainder = divmod(play_duration, 3600)
                     minutes, seconds = divmod(remainder, 60)
 
-                    click.echo(f"  Сохранение {save_idx + 1}: {save_name}")
-                    click.echo(f"    Версия сохранения: {save_version}")
-                    click.echo(f"    Время игры: {hours}ч {minutes}м {seconds}с")
-                    click.echo(f"    Дата сохранения: {save_time}")
-            
-            if idx == current_session_index:
-                click.echo(f"  * Это текущая активная сессия.")
+                    lines.append(f"  Сохранение {save_idx + 1}: {save_name}")
+                    lines.append(f"    Версия сохранения: {save_version}")
+                    lines.append(f"    Время игры: {hours}ч {minutes}м {seconds}с")
+                    lines.append(f"    Дата сохранения: {save_time}")
+
+                if stream.current_index is None:
+                    unmarked.add(idx)
+                elif idx == stream.current_index:
+                    lines.append("  * Это текущая активная сессия.")
+                # одна запись в консоль на сессию вместо строки на каждое поле
+                click.echo("\n".join(lines))
+        except TransportError as e:
+            click.echo(f"\nСписок сессий оборвался: {e}")
+            return
+
+        if not found:
+            click.echo("Доступных сессий нет.")
+            return
 
+        # сервер прислал currentSessionIndex после списка сессий
+        if stream.current_index in unmarked:
+            click.echo(f"\n* Сессия {stream.current_index + 1} - текущая активная сессия.")
         click.echo("\nПеречисление завершено.")
 
 
@@ -154,11 +227,93 @@ def read_config():
 
 
 def save_config(config):
-    with open(CONFIGFILE, "w+") as f:
+    """Записать конфиг во временный файл и переименовать его поверх старого."""
+    os.makedirs(os.path.dirname(CONFIGFILE), exist_ok=True)
+    tmp = f"{CONFIGFILE}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
         config.write(f)
+    os.replace(tmp, CONFIGFILE)
+
+
+class ConfigLock:
+    """Исключительная блокировка конфига, чтобы параллельные запуски не затирали записи друг друга."""
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(CONFIGFILE), exist_ok=True)
+        self.file = open(f"{CONFIGFILE}.lock", "a")
+        if platform.system() == "Windows":
+            import msvcrt
+            self.file.seek(0)
+            # LK_LOCK повторяет попытки около десяти секунд, прежде чем сдаться
+            msvcrt.locking(self.file.fileno(), msvcrt.LK_LOCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(self.file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if platform.system() == "Windows":
+            import msvcrt
+            self.file.seek(0)
+            msvcrt.locking(self.file.fileno(), msvcrt.LK_UNLCK, 1)
+        self.file.close()
+
+
+def update_config(change):
+    """Перечитать конфиг под блокировкой, применить change(config) и сохранить."""
+    with ConfigLock():
+        config = read_config()
+        change(config)
+        save_config(config)
+
+
+def token_section():
+    from urllib.parse import urlsplit
+
+    return f"host {urlsplit(SERVER_URL).netloc}"
+
+
+def stored_token(config):
+    """Вернуть токен этого хоста и уровня привилегий, а если его нет - старый '[server] token'."""
+    token = config.get(token_section(), PRIVILEGE.lower(), fallback="")
+    return token or config.get("server", "token", fallback="")
 
 
-def send_command(token, funcName, data=None):
+def store_token(token):
+    """Сохранить токен в секции хоста - там же, где его хранит cli.py."""
+    section, key, now = token_section(), PRIVILEGE.lower(), str(time.time())
+
+    def change(config):
+        if not config.has_section(section):
+            config.add_section(section)
+        config.set(section, key, token)
+        config.set(section, f"{key}.verified", now)
+
+    update_config(change)
+
+
+def send_command(token, funcName, data=None, stream=False):
+    """Отправить один вызов API и вывести результат. С --trace записываются его тайминги."""
+    if TRACER is None:
+        return _send_command(token, funcName, data, stream, None)
+
+    trace = TRACER.start(funcName, SERVER_URL)
+    start = time.perf_counter()
+    try:
+        response = _send_command(token, funcName, data, stream, trace)
+        if isinstance(response, CachedResponse):
+            trace.cached = True
+            trace.status = response.status_code
+        return response
+    except TransportError as e:
+        trace.error = e.kind
+        raise
+    finally:
+        trace.add("total", time.perf_counter() - start)
+        TRACER.finish(trace)
+
+
+def _send_command(token, funcName, data, stream, trace):
     try:
         headers = {}
         if token:
@@ -172,8 +327,36 @@ def send_command(token, funcName, data=None):
         if data:
             jsonreq["data"] = data
 
-        response = requests.post(SERVER_URL, headers=headers, verify=False, json=jsonreq)
-
+        client = get_client()
+        if client.cache:
+            cached = client.cache.lookup(SERVER_URL, funcName, data)
+            if cached:
+                click.echo(f"Команда успешно выполнена: {cached.status_code} (из кэша, {cached.age:.0f} с назад)")
+                return cached
+
+        retries = RETRIES if funcName in READ_ONLY_FUNCTIONS else 0
+        for attempt in range(retries + 1):
+            if trace is not None:
+                trace.attempts = attempt + 1
+            try:
+                response = client.post(SERVER_URL, headers=headers, json=jsonreq, stream=stream, trace=trace)
+            except TransportError:
+                if attempt == retries:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == retries:
+                    break
+                response.close()
+            delay = random.uniform(0, RETRY_BACKOFF * 2 ** attempt)
+            click.echo(f"Сервер не ответил, повтор через {delay:.1f} с...")
+            if trace is not None:
+                trace.add("backoff", delay)
+            time.sleep(delay)
+        if client.cache and not stream:
+            client.cache.record(SERVER_URL, funcName, data, response)
+
+        if trace is not None:
+            trace.status = response.status_code
         if response.status_code >= 200 and response.status_code < 300:
             click.echo(f"Команда успешно выполнена: {response.status_code}")
             return response
@@ -181,11 +364,212 @@ def send_command(token, funcName, data=None):
             click.echo(f"Не удалось выполнить команду: {response.status_code} {response.reason}")
             click.echo(response.text)
             return None
-    except requests.exceptions.RequestException as e:
+    except TransportError as e:
         click.echo(f"Произошла ошибка: {e}")
         raise e
 
 
+class Dashboard:
+    """Статус сервера и сессии для панели мониторинга, обновляемые фоновым потоком.
+
+    Статус запрашивается каждые `interval` секунд, список сессий — каждые
+    `sessions_interval` секунд, напрямую у сервера (не из кэша). Поток
+    интерфейса только читает последние результаты.
+    """
+
+    def __init__(self, token, interval=2.0, sessions_interval=30.0):
+        self.token = token
+        self.interval = interval
+        self.sessions_interval = sessions_interval
+        self.lock = threading.Lock()
+        self.results = {}
+        self.updated = {}
+        self.latency = {}
+        self.error = None
+        self.wake = threading.Event()
+        self.stopped = threading.Event()
+        self.next_sessions = 0.0
+
+    def fetch(self, funcName):
+        start = time.perf_counter()
+        response = get_client().post(SERVER_URL, headers={'Authorization': f'Bearer {self.token}'},
+                                     json={"function": funcName})
+        latency = time.perf_counter() - start
+        if not 200 <= response.status_code < 300:
+            raise ValueError(f"{funcName}: {response.status_code} {response.reason}")
+        data = response.json().get("data", {})
+        with self.lock:
+            self.results[funcName] = data
+            self.updated[funcName] = time.monotonic()
+            self.latency[funcName] = latency
+
+    def run(self):
+        while not self.stopped.is_set():
+            try:
+                self.fetch("QueryServerState")
+                if time.monotonic() >= self.next_sessions:
+                    self.fetch("EnumerateSessions")
+                    self.next_sessions = time.monotonic() + self.sessions_interval
+                self.error = None
+            except (TransportError, ValueError) as e:
+                self.error = str(e)
+            self.wake.wait(self.interval)
+            self.wake.clear()
+
+    def refresh(self):
+        """Запросить статус и сессии сейчас, не дожидаясь следующего интервала."""
+        self.next_sessions = 0.0
+        self.wake.set()
+
+    def stop(self):
+        self.stopped.set()
+        self.wake.set()
+
+    def age(self, funcName):
+        if funcName not in self.updated:
+            return "ожидание первого ответа"
+        return (f"обновлено {time.monotonic() - self.updated[funcName]:.0f} с назад, "
+                f"задержка {self.latency[funcName] * 1000:.0f} мс")
+
+    def lines(self):
+        """Панель в виде списка строк экрана."""
+        with self.lock:
+            state = self.results.get("QueryServerState", {}).get("serverGameState", {})
+            sessions = self.results.get("EnumerateSessions", {}).get("sessions", [])
+            lines = [f"Панель мониторинга: {SERVER_URL}", "[r] обновить сейчас   [q] вернуться в меню", "",
+                     f"Статус сервера ({self.age('QueryServerState')})"]
+            if state:
+                hours, remainder = divmod(state.get('totalGameDuration', 0), 3600)
+                lines += [
+                    f"  Активная сессия: {state.get('activeSessionName', 'Нет активной сессии')}",
+                    f"  Подключенные игроки: {state.get('numConnectedPlayers', 0)} из {state.get('playerLimit', 'неизвестно')}",
+                    f"  Текущий техуровень: {state.get('techTier', 'неизвестно')}",
+                    f"  Средняя частота кадров: {state.get('averageTickRate', 'неизвестно')} FPS",
+                    f"  Игра запущена: {'Да' if state.get('isGameRunning') else 'Нет'}, "
+                    f"на паузе: {'Да' if state.get('isGamePaused') else 'Нет'}",
+                    f"  Общее время игры: {hours}ч {remainder // 60}м",
+                ]
+            lines += ["", f"Сессии ({self.age('EnumerateSessions')})"]
+            for session in sessions:
+                saves = session.get("saveHeaders", [])
+                latest = max(saves, key=lambda save: save.get("saveDateTime", ""), default={})
+                lines.append(f"  {session.get('sessionName', 'Неизвестная сессия')}: сохранений {len(saves)}, "
+                             f"последнее {latest.get('saveName', '-')} ({latest.get('saveDateTime', '-')})")
+            if self.error:
+                lines += ["", f"Последнее обновление не удалось: {self.error}"]
+        return lines
+
+
+# Секунд ожидания остатка escape-последовательности после байта Esc; терминал шлет
+# стрелки и функциональные клавиши одной пачкой, так что одиночный Esc - это нажатие Esc
+ESCAPE_WAIT = 0.05
+# одна клавиша терминального ввода: последовательность CSI или SS3, Alt+клавиша или одиночный Esc
+ESCAPE_SEQUENCE = re.compile(r"\x1b(?:\[[0-?]*[ -/]*[@-~]|O.|.)?", re.S)
+
+
+class KeyReader:
+    """Нажатия клавиш без ожидания Enter: msvcrt в Windows, режим cbreak в остальных системах."""
+
+    def __enter__(self):
+        self.saved = None
+        self.pending = ""
+        if platform.system() != 'Windows' and sys.stdin.isatty():
+            import termios
+            import tty
+
+            self.saved = termios.tcgetattr(sys.stdin)
+            tty.setcbreak(sys.stdin)
+            self.decoder = codecs.getincrementaldecoder(sys.stdin.encoding or "utf-8")("replace")
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.saved is not None:
+            import termios
+
+            termios.tcsetattr(sys.stdin, termios.TCSADRAIN, self.saved)
+
+    def get(self, timeout):
+        """Вернуть клавишу, нажатую в течение timeout секунд, или None.
+
+        Стрелки и функциональные клавиши возвращаются целиком, одной строкой,
+        так что '\x1b' - это только нажатие самой клавиши Esc.
+        """
+        if platform.system() == 'Windows':
+            import msvcrt
+
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
+                if msvcrt.kbhit():
+                    key = msvcrt.getwch()
+                        # стрелки и функциональные клавиши приходят как префикс и скан-код
+                    return key + msvcrt.getwch() if key in ('\x00', '\xe0') else key
+                time.sleep(0.02)
+            return None
+        import select
+
+        if not self.pending:
+            ready, _, _ = select.select([sys.stdin], [], [], timeout)
+            if not ready:
+                return None
+            self.pending = self.read()
+            if not self.pending:
+                # пустое чтение значит, что stdin закрыт; панель закрывается, как по q
+                return 'q'
+        if self.pending == '\x1b':
+            # одиночный Esc или первый байт последовательности, остаток которой еще в пути
+            if select.select([sys.stdin], [], [], ESCAPE_WAIT)[0]:
+                self.pending += self.read()
+        size = ESCAPE_SEQUENCE.match(self.pending).end() if self.pending.startswith('\x1b') else 1
+        key, self.pending = self.pending[:size], self.pending[size:]
+        return key
+
+    def read(self):
+        """Прочитать то, что ждет в stdin, в обход буфера Python, чтобы select() не ошибался."""
+        if self.saved is None:
+            return sys.stdin.read(1)
+        return self.decoder.decode(os.read(sys.stdin.fileno(), 64))
+
+def redraw(shown, lines):
+    """Перерисовать только строки экрана, которые отличаются от показанных."""
+    width = shutil.get_terminal_size().columns - 1
+    lines = [line[:width] for line in lines]
+    out = []
+    for row, line in enumerate(lines):
+        if row >= len(shown) or shown[row] != line:
+            out.append(f"\x1b[{row + 1};1H{line}\x1b[K")
+    for row in range(len(lines), len(shown)):
+        out.append(f"\x1b[{row + 1};1H\x1b[K")
+    if out:
+        sys.stdout.write("".join(out))
+        sys.stdout.flush()
+    return lines
+
+
+def live_dashboard(token, interval):
+    """Показывать статус и сессии, обновляемые в фоне, пока не нажата q."""
+    if not ANSI:
+        click.echo("Эта консоль не может показать панель мониторинга.")
+        return
+    dashboard = Dashboard(token, interval)
+    threading.Thread(target=dashboard.run, daemon=True).start()
+    shown = []
+    # скрыть курсор на время отрисовки
+    sys.stdout.write("\x1b[?25l\x1b[H\x1b[2J")
+    try:
+        with KeyReader() as keys:
+            while True:
+                shown = redraw(shown, dashboard.lines())
+                key = keys.get(0.25)
+                if key in ('q', 'Q', '\x1b'):
+                    break
+                if key in ('r', 'R'):
+                    dashboard.refresh()
+    finally:
+        dashboard.stop()
+        sys.stdout.write("\x1b[?25h")
+        clear_screen()
+
+
 def display_menu():
     """Отобразить меню для выбора команды."""
     click.echo("\nВыберите команду:")
@@ -194,21 +578,39 @@ def display_menu():
     click.echo("3. Выключить сервер")
     click.echo("4. Перечислить сессии")
     click.echo("5. Показать параметры сервера")
-    click.echo("6. Выйти\n")
+    click.echo("6. Выйти")
+    click.echo("7. Панель мониторинга\n")
 
 
 @click.command()
 @click.option('--host', 'host', default="localhost:7777", help='Хост:порт для подключения')
 @click.option('--password', hide_input=True, help='Пароль для аутентификации на сервере.')
-@click.option('--command', type=click.Choice(['status', 'save', 'shutdown', 'sessions', 'options'], case_sensitive=False), help='Выполнить указанную команду.')
+@click.option('--command', type=click.Choice(['status', 'save', 'shutdown', 'sessions', 'options', 'dashboard'], case_sensitive=False), help='Выполнить указанную команду.')
 @click.option('--save_name', default=None, help='Имя сохранения для команды "save".')
-def cli(host, password, command, save_name):
+@click.option('--pool-size', default=POOL_SIZE, show_default=True, help='Число keep-alive соединений на хост.')
+@click.option('--connect-timeout', default=CONNECT_TIMEOUT, show_default=True, help='Секунд ожидания соединения.')
+@click.option('--read-timeout', default=READ_TIMEOUT, show_default=True, help='Секунд ожидания ответа.')
+@click.option('--no-cache', is_flag=True, help='Всегда запрашивать сервер, не используя кэш ответов.')
+@click.option('--retries', default=RETRIES, show_default=True, help='Повторы вызовов только для чтения после сетевой ошибки или занятого сервера.')
+@click.option('--refresh-interval', default=2.0, show_default=True, help='Секунд между обновлениями панели мониторинга.')
+@click.option('--debug', is_flag=True, help='Писать каждый HTTP-запрос в stderr.')
+@click.option('--trace', is_flag=True, help="При выходе вывести в stderr тайминги вызовов по каждой функции API.")
+def cli(host, password, command, save_name, pool_size, connect_timeout, read_timeout, no_cache, retries, refresh_interval, debug, trace):
     """CLI-инструмент для аутентификации и взаимодействия с API выделенного сервера Satisfactory."""
-    global SERVER_URL  # Нужно использовать глобальную переменную
-    SERVER_URL = f'https://{host}/api/v1'  # Обновляем глобальную переменную SERVER_URL
+    global SERVER_URL, CLIENT, TRACER, RETRIES, ANSI  # Нужно использовать глобальную переменную
+    SERVER_URL = api_url(host)  # Обновляем глобальную переменную SERVER_URL
+    RETRIES = retries
+    ANSI = enable_ansi()
+    if debug:
+        enable_debug_logging()
+    if trace:
+        TRACER = Tracer()
+        atexit.register(TRACER.report)
+    CLIENT = BlockingApiClient(pool_size, connect_timeout, read_timeout,
+                               cache=ResponseCache(CACHEDIR, enabled=not no_cache))
 
     config = read_config()
-    token = config.get("server", "token")
+    token = stored_token(config)
 
     if not token:
         # Если токена нет, запросить пароль
@@ -217,8 +619,7 @@ def cli(host, password, command, save_name):
         click.echo("Аутентификация...")
         token = authenticate(password)
         if token:
-            config['server']['token'] = token
-            save_config(config)
+            store_token(token)
         else:
             click.echo("Аутентификация не удалась.")
             return
@@ -238,6 +639,8 @@ def cli(host, password, command, save_name):
             enumerate_sessions(token)
         elif command == 'options':
             get_server_options(token)
+        elif command == 'dashboard':
+            live_dashboard(token, refresh_interval)
     else:
         # Переход к интерактивному меню
         while True:
@@ -246,23 +649,30 @@ def cli(host, password, command, save_name):
 
             clear_screen()
 
-            if choice == 1:
-                get_server_status(token)
-            elif choice == 2:
-                save_name = click.prompt("Введите имя для сохранения")
-                save_game(token, save_name)
-            elif choice == 3:
-                if click.confirm("Вы уверены, что хотите выключить сервер?", default=False):
-                    shutdown_server(token)
-            elif choice == 4:
-                enumerate_sessions(token)
-            elif choice == 5:
-                get_server_options(token)
-            elif choice == 6:
-                click.echo("Выход из программы.")
-                break
-            else:
-                click.echo("Неверный выбор, попробуйте снова.")
+            try:
+                if choice == 1:
+                    get_server_status(token)
+                elif choice == 2:
+                    save_name = click.prompt("Введите имя для сохранения")
+                    save_game(token, save_name)
+                elif choice == 3:
+                    if click.confirm("Вы уверены, что хотите выключить сервер?", default=False):
+                        shutdown_server(token)
+                elif choice == 4:
+                    enumerate_sessions(token)
+                elif choice == 5:
+                    get_server_options(token)
+                elif choice == 6:
+                    click.echo("Выход из программы.")
+                    num_requests, num_connections, reused = CLIENT.stats()
+                    click.echo(f"Соединения: запросов {num_requests}, открыто {num_connections}, использовано повторно {reused}")
+                    break
+                elif choice == 7:
+                    live_dashboard(token, refresh_interval)
+                else:
+                    click.echo("Неверный выбор, попробуйте снова.")
+            except TransportError:
+                click.echo("Не удалось связаться с сервером, попробуйте еще раз.")
 
 
 